@@ -7,12 +7,26 @@ Runs app an instance of Flask.
 from dotenv import load_dotenv
 from flask_bcrypt import Bcrypt  # type: ignore
 from flask_cors import CORS
-from flask import Flask, g, request, abort
+from flask import Flask, Response, g, request, abort
 from typing import Optional
+from werkzeug.middleware.proxy_fix import ProxyFix
+import logging
 import os
+import re
+import time
+import uuid
 
 from api.v1.views import app_views
+from api.v1.auth.password_hashing import password_hasher
 from api.v1.auth.session_db_auth import SessionDBAuth
+from api.v1.auth.signed_token_auth import SignedTokenAuth, TokenUser
+from api.v1.utils.compression import compress_response
+from api.v1.utils.events import event_gauges
+from api.v1.utils.json_provider import JSONProvider
+from api.v1.utils.maintenance import start_maintenance_worker
+from api.v1.utils.metrics import metrics
+from api.v1.utils.outbox import start_outbox_dispatcher
+from api.v1.utils.utility import UserDisplineHandler
 from api.v1.utils.error_handlers import (
     bad_request,
     not_found,
@@ -22,6 +36,8 @@ from api.v1.utils.error_handlers import (
     forbidden,
     unauthorized,
     server_error,
+    service_unavailable,
+    too_many_requests,
 )
 from models import storage
 from models.user import User
@@ -29,7 +45,14 @@ from models.user import User
 
 load_dotenv()
 bcrypt = Bcrypt()
-auth = SessionDBAuth()
+auth: SessionDBAuth | SignedTokenAuth
+if os.getenv("AUTH_TYPE") == "signed_token":
+    auth = SignedTokenAuth()
+else:
+    auth = SessionDBAuth()
+performance_logger = logging.getLogger("api.performance")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))
+REQUEST_ID_PATTERN = re.compile(r"^[\w\-]{1,64}$")
 
 
 def verify_auth():
@@ -44,7 +67,8 @@ def verify_auth():
             "/api/v1/register/",
             "/api/v1/auth_session/login/",
             "/api/v1/departments/",
-            "/api/v1/levels/"
+            "/api/v1/levels/",
+            "/api/v1/metrics/",
         ],
     ):
         return
@@ -57,11 +81,134 @@ def verify_auth():
         abort(401)
     g.current_user = user
 
+    if request.method not in ("GET", "HEAD"):
+        # a token outlives the deletion or suspension of its user, so
+        # writes load the user and check it may still write
+        if isinstance(user, TokenUser):
+            user = user.get_user()
+        if not UserDisplineHandler().active_user(user):
+            abort(401)
+
+
+def assign_request_id() -> None:
+    """
+    Set the correlation id attached to this request's log records,
+    reusing a well-formed X-Request-ID header when the client sends one.
+    """
+    request_id = request.headers.get("X-Request-ID", "")
+    if not REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex
+    g.request_id = request_id
+
+
+def add_request_id(response: Response) -> Response:
+    """
+    Return the correlation id to the client.
+    """
+    request_id = g.get("request_id")
+    if request_id:
+        response.headers["X-Request-ID"] = request_id
+    return response
+
+
+def start_query_scope() -> None:
+    """
+    Start counting and timing the SQL statements executed by this request.
+    """
+    g.request_start_time = time.perf_counter()
+    g.query_scope = storage.query_stats.start()
+
+
+def add_server_timing(response: Response) -> Response:
+    """
+    Report the request's query count, database time and slowest statement
+    in the Server-Timing header and log requests slower than
+    SLOW_REQUEST_MS.
+    """
+    query_scope = g.get("query_scope")
+    start_time = g.get("request_start_time")
+    if not query_scope or start_time is None:
+        return response
+
+    total_ms = (time.perf_counter() - start_time) * 1000
+    db_ms = query_scope.total_time * 1000
+    slowest_ms = query_scope.slowest_time * 1000
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={db_ms:.2f};desc="{query_scope.count} queries"'
+    )
+    response.headers.add("Server-Timing", f"db-slowest;dur={slowest_ms:.2f}")
+    response.headers.add("Server-Timing", f"app;dur={total_ms:.2f}")
+
+    if total_ms > SLOW_REQUEST_MS:
+        slowest_statement = " ".join(
+            (query_scope.slowest_statement or "").split()
+        )
+        performance_logger.warning(
+            f"Slow request {request.method} {request.path}"
+            f" - {response.status_code} - {total_ms:.2f}ms total"
+            f" - {query_scope.count} queries in {db_ms:.2f}ms"
+            f" - slowest {slowest_ms:.2f}ms: {slowest_statement}"
+        )
+    return response
+
+
+def record_request_metrics(response: Response) -> Response:
+    """
+    Count the request and record its latency and database usage
+    under its route pattern.
+    """
+    start_time = g.get("request_start_time")
+    if start_time is None:
+        return response
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.inc(
+        "http_requests_total",
+        route=route,
+        method=request.method,
+        status=response.status_code,
+    )
+    metrics.observe(
+        "http_request_duration_seconds",
+        time.perf_counter() - start_time,
+        route=route,
+        method=request.method,
+    )
+
+    query_scope = g.get("query_scope")
+    if query_scope:
+        metrics.inc(
+            "http_request_db_queries_total", query_scope.count, route=route
+        )
+        metrics.inc(
+            "http_request_db_seconds_total",
+            query_scope.total_time,
+            route=route,
+        )
+
+    metrics.maybe_flush()
+    return response
+
+
+def db_pool_gauges() -> list[tuple[str, dict[str, str], float]]:
+    """
+    Returns the database pool usage as metrics gauges.
+    """
+    return [
+        ("db_pool_connections", {"state": state}, count)
+        for state, count in storage.pool_status().items()
+    ]
+
 
 def close_db(exception: Optional[BaseException]) -> None:
     """
     Close database after request.
     """
+    query_scope = g.pop("query_scope", None)
+    if query_scope:
+        storage.query_stats.stop(query_scope)
     storage.close()
 
 
@@ -70,6 +217,14 @@ def create_app(config_name: str | None = None) -> Flask:
     Creates and returns a Flask instance app.
     """
     app = Flask(__name__)
+    app.json = JSONProvider(app)
+    # behind TRUSTED_PROXY_HOPS reverse proxies, remote_addr is the
+    # client address they add to X-Forwarded-For, not the last proxy's
+    trusted_proxy_hops = int(os.getenv("TRUSTED_PROXY_HOPS", 1))
+    if trusted_proxy_hops > 0:
+        app.wsgi_app = ProxyFix(  # type: ignore[method-assign]
+            app.wsgi_app, x_for=trusted_proxy_hops
+        )
 
     if config_name == "test":
         app.config.from_mapping(TESTING=True)
@@ -77,6 +232,7 @@ def create_app(config_name: str | None = None) -> Flask:
         app.config.from_mapping(TESTING=False)
 
     app.config["MAX_CONTENT_LENGTH"] = 1 * 1024 * 1024 * 1024
+    app.config["BCRYPT_LOG_ROUNDS"] = password_hasher.rounds
     bcrypt.init_app(app)  # type: ignore
     CORS(
         app,
@@ -89,7 +245,14 @@ def create_app(config_name: str | None = None) -> Flask:
         supports_credentials=True,
     )
     app.register_blueprint(app_views)
+    app.before_request(assign_request_id)
+    app.before_request(start_query_scope)
     app.before_request(verify_auth)
+    # after_request functions run in reverse, so this one runs last
+    app.after_request(compress_response)
+    app.after_request(add_server_timing)
+    app.after_request(record_request_metrics)
+    app.after_request(add_request_id)
     app.teardown_appcontext(close_db)
     app.register_error_handler(400, bad_request)
     app.register_error_handler(401, unauthorized)
@@ -98,11 +261,17 @@ def create_app(config_name: str | None = None) -> Flask:
     app.register_error_handler(405, method_not_allowed)
     app.register_error_handler(409, conflict_error)
     app.register_error_handler(413, large_request_error)
+    app.register_error_handler(429, too_many_requests)
     app.register_error_handler(500, server_error)
+    app.register_error_handler(503, service_unavailable)
 
     return app
 
 
+metrics.register_gauges(db_pool_gauges)
+metrics.register_gauges(event_gauges)
+start_maintenance_worker()
+start_outbox_dispatcher()
 config_name = os.getenv("FLASK_ENV", "development")
 app = create_app(config_name)
 
@@ -8,10 +8,13 @@
 from dotenv import load_dotenv
 from flask import abort, request
 from typing import cast
+from werkzeug.exceptions import HTTPException
 import logging
 import os
 
-from api.v1.utils.utility import UserDisplineHandler
+from api.v1.auth.password_hashing import password_hasher
+from api.v1.auth.rate_limit import login_rate_limiter
+from api.v1.utils.utility import UserDisplineHandler, DatabaseOp
 from api.v1.utils.data_validations import UserLogin, validate_request_data
 from models import storage
 from models.user import User
@@ -66,18 +69,25 @@ class LoginAuth:
     def authenticate_user(self, email: str, password: str) -> User:
         """
         Authenticate a user by email and password.
+        Upgrades the stored hash when the configured bcrypt cost changed.
+        Emails recently found not to exist are rejected without a lookup.
         """
-        from api.v1.app import bcrypt
+        if login_rate_limiter.is_unknown_email(email):
+            abort(404, description="Invalid email")
 
         user = storage.search_email(email)
         if not user:
+            login_rate_limiter.remember_unknown_email(email)
             abort(404, description="Invalid email")
 
-        if not bcrypt.check_password_hash(  # type: ignore
-            user.password, password
-        ):
+        if not password_hasher.check_password_hash(user.password, password):
             abort(401, description="wrong password")
 
+        if password_hasher.needs_rehash(user.password):
+            user.password = password_hasher.generate_password_hash(password)
+            db = DatabaseOp()
+            db.save(user)
+
         return user
 
     def create_user_session(self, user: User) -> tuple[str, str]:
@@ -113,6 +123,7 @@ class LoginAuth:
         """
         Handles the full user login process:
             - Validates request data.
+            - Rejects clients and emails with too many failed attempts.
             - Authenticates credentials.
             - Reuses or creates a session.
         """
@@ -126,7 +137,13 @@ class LoginAuth:
         if not password:
             abort(400, description="Password required")
 
-        user = self.authenticate_user(email, password)
+        login_rate_limiter.check(request.remote_addr, email)
+        try:
+            user = self.authenticate_user(email, password)
+        except HTTPException as e:
+            if e.code in (401, 404):
+                login_rate_limiter.record_failure(request.remote_addr, email)
+            raise
 
         self.ensure_user_is_active(user)
         existing_session = self.get_user_session(user)
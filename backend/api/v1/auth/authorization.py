@@ -8,20 +8,33 @@ from typing import Callable, Any, TypeVar, cast
 import functools
 import logging
 
+from api.v1.auth.signed_token_auth import TokenUser
+from api.v1.utils.utility import UserDisplineHandler
+
 
 logger = logging.getLogger(__name__)
 F = TypeVar("F", bound=Callable[..., Any])
 
 
+def is_admin() -> bool:
+    """Return True if the current user is an active admin."""
+    user = getattr(g, "current_user", None)
+    if not user:
+        return False
+    if isinstance(user, TokenUser):
+        # the admin flag of a token is the one it was issued with,
+        # the user may have been demoted, suspended or deleted since
+        user = user.get_user()
+        if not UserDisplineHandler().active_user(user):
+            return False
+    return bool(user.is_admin)
+
+
 def admin_only(func: F) -> F:
     @functools.wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
         """ """
-        user = getattr(g, "current_user", None)
-        if not user:
-            abort(403)
-        user = g.current_user
-        if not user.is_admin:
+        if not is_admin():
             abort(403)
         return func(*args, **kwargs)
 
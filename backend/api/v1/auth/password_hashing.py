@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+Hashes and checks passwords with bcrypt in a bounded process pool.
+
+bcrypt is deliberately CPU-heavy. Running it in worker processes keeps
+request threads responsive, and bounding the number of pending hashes
+makes a burst of logins fail fast with 503 instead of queueing until
+every request times out. Bulk hashing holds at most half of the slots,
+one per hash, so logins keep interleaving with a large batch.
+
+The pool is started with "forkserver" (or "spawn") rather than "fork":
+it is created lazily from a request thread, and forking a multithreaded
+worker can deadlock the child on a lock held by another thread. The
+pool only runs bcrypt's own functions, so its processes never need
+to import the API.
+
+Environment variables:
+    BCRYPT_LOG_ROUNDS: bcrypt cost factor (default 12). Hashes with a
+        different cost are upgraded on the next successful login.
+    BCRYPT_POOL_SIZE: worker processes (default: number of CPUs).
+        0 hashes on the request thread.
+    BCRYPT_MAX_PENDING: hashes allowed to run or wait at once
+        (default: 4 per worker process).
+    BCRYPT_QUEUE_TIMEOUT: seconds to wait for a free slot before
+        answering 503 (default 5).
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from dotenv import load_dotenv
+from flask import abort
+from typing import Any, Callable, Iterable, TypeVar
+import bcrypt
+import logging
+import multiprocessing
+import os
+import threading
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+R = TypeVar("R")
+
+
+class PasswordHasher:
+    """
+    Offloads bcrypt hashing to a bounded pool of worker processes.
+    """
+
+    def __init__(
+        self,
+        rounds: int | None = None,
+        pool_size: int | None = None,
+        max_pending: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> None:
+        """Read the configuration, the pool is created on first use."""
+        self.rounds = rounds or int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+        if pool_size is None:
+            pool_size = int(
+                os.getenv("BCRYPT_POOL_SIZE", os.cpu_count() or 1)
+            )
+        self.pool_size = pool_size
+        self.max_pending = max_pending or int(
+            os.getenv("BCRYPT_MAX_PENDING", max(pool_size, 1) * 4)
+        )
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None
+            else float(os.getenv("BCRYPT_QUEUE_TIMEOUT", 5))
+        )
+        self.__slots = threading.BoundedSemaphore(self.max_pending)
+        self.__pool: ProcessPoolExecutor | None = None
+        self.__pool_pid: int | None = None
+        self.__pool_lock = threading.Lock()
+
+    def __get_pool(self) -> ProcessPoolExecutor:
+        """
+        Return the process pool of the current process, creating it
+        lazily so every gunicorn worker gets its own.
+        """
+        with self.__pool_lock:
+            if self.__pool is None or self.__pool_pid != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                if context.get_start_method() == "forkserver":
+                    context.set_forkserver_preload(["bcrypt"])
+                self.__pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size, mp_context=context
+                )
+                self.__pool_pid = os.getpid()
+            return self.__pool
+
+    def __submit(self, func: Callable[..., R], *args: Any) -> Future[R]:
+        """
+        Submit func to the pool once a slot is free, the slot is
+        released when func completes. Aborts with 503 when no slot
+        frees up within queue_timeout.
+        """
+        if not self.__slots.acquire(timeout=self.queue_timeout):
+            logger.warning("Password hashing pool saturated")
+            abort(503, description="Server busy. Try again shortly.")
+
+        try:
+            future: Future[R] = self.__get_pool().submit(func, *args)
+        except BaseException:
+            self.__slots.release()
+            raise
+        future.add_done_callback(lambda _: self.__slots.release())
+        return future
+
+    def __run(self, func: Callable[..., R], *args: Any) -> R:
+        """Run func in the pool, or inline when the pool is disabled."""
+        if self.pool_size <= 0:
+            return func(*args)
+        return self.__submit(func, *args).result()
+
+    def generate_password_hash(self, password: str) -> str:
+        """Return the bcrypt hash of password using the configured cost."""
+        pw_hash = self.__run(
+            bcrypt.hashpw,
+            password.encode("utf-8"),
+            bcrypt.gensalt(self.rounds),
+        )
+        return pw_hash.decode("utf-8")
+
+    def generate_password_hashes(self, passwords: Iterable[str]) -> list[str]:
+        """
+        Return the bcrypt hashes of many passwords, spreading them
+        across all worker processes. At most half of the slots are held
+        by the batch, so logins wait behind a few hashes rather than
+        the whole batch.
+        """
+        encoded = [password.encode("utf-8") for password in passwords]
+        if self.pool_size <= 0:
+            return [
+                bcrypt.hashpw(password, bcrypt.gensalt(self.rounds))
+                .decode("utf-8")
+                for password in encoded
+            ]
+
+        batch_slots = threading.BoundedSemaphore(
+            max(1, self.max_pending // 2)
+        )
+        futures: list[Future[bytes]] = []
+        for password in encoded:
+            batch_slots.acquire()
+            try:
+                future = self.__submit(
+                    bcrypt.hashpw, password, bcrypt.gensalt(self.rounds)
+                )
+            except BaseException:
+                batch_slots.release()
+                raise
+            future.add_done_callback(lambda _: batch_slots.release())
+            futures.append(future)
+        return [future.result().decode("utf-8") for future in futures]
+
+    def check_password_hash(self, pw_hash: str, password: str) -> bool:
+        """Return True if password matches pw_hash."""
+        try:
+            return self.__run(
+                bcrypt.checkpw,
+                password.encode("utf-8"),
+                pw_hash.encode("utf-8"),
+            )
+        except ValueError:
+            return False
+
+    def needs_rehash(self, pw_hash: str) -> bool:
+        """
+        Return True if pw_hash was created with a different cost than
+        the configured one. Hashes look like $2b$<cost>$<salt+hash>.
+        """
+        try:
+            return int(pw_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+"""
+Rate limits login attempts and caches lookups of unknown emails.
+
+Failed login attempts are counted in token buckets keyed by client IP
+and by email. A bucket holds up to `capacity` tokens and regains them at
+`capacity / period` tokens per second, so the odd typo goes unnoticed
+while credential stuffing empties the bucket. Once it is empty, further
+attempts are rejected with 429 before they cost a database round trip
+or a bcrypt hash. Successful logins are never counted, so users sharing
+a campus NAT are not locked out by each other.
+
+Emails that do not belong to any user are remembered for a short time,
+so repeated attempts against them skip the database. This is only done
+with the shared backend by default: with the memory backend, register
+would clear the email in the worker handling it only, and the others
+would keep rejecting the new user's logins until the entry expires.
+
+Environment variables:
+    RATE_LIMIT_BACKEND: "memory" keeps the state in the worker process,
+        "shared" keeps it in a memory-mapped file shared by all workers
+        on the host (default "memory").
+    RATE_LIMIT_FILE: file used by the shared backend
+        (default "/tmp/unibenengvault_rate_limit").
+    RATE_LIMIT_SLOTS: number of keys the shared backend can hold
+        (default 65536).
+    LOGIN_RATE_LIMIT_IP: failed attempts per period allowed from one IP,
+        as "<attempts>/<seconds>" (default "20/60"). The IP is the
+        client's, as forwarded by TRUSTED_PROXY_HOPS proxies, see
+        api.v1.app.create_app.
+    LOGIN_RATE_LIMIT_EMAIL: failed attempts per period allowed against
+        one email (default "5/60").
+    UNKNOWN_EMAIL_TTL: seconds an unknown email is remembered
+        (default 30 with the shared backend, 0 otherwise). 0 disables
+        the cache.
+"""
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Any, Callable
+from werkzeug.exceptions import TooManyRequests
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+from api.v1.utils.metrics import metrics
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+SlotUpdate = Callable[
+    [bool, float, float], tuple[Any, tuple[float, float] | None]
+]
+
+
+def parse_rate(rate: str) -> tuple[float, float]:
+    """
+    Parse "<attempts>/<seconds>" into a bucket capacity and a refill
+    rate in tokens per second.
+    """
+    try:
+        attempts, seconds = rate.split("/")
+        capacity = float(attempts)
+        refill_rate = capacity / float(seconds)
+    except (ValueError, ZeroDivisionError):
+        raise ValueError(
+            f"Invalid rate {rate!r}, expected <attempts>/<seconds>"
+        )
+    return capacity, refill_rate
+
+
+def refill(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    capacity: float,
+    refill_rate: float,
+) -> float:
+    """Return the tokens of a bucket after refilling it up to now."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+
+class MemoryBackend:
+    """
+    Keeps buckets and remembered keys in the current process.
+    The least recently used keys are evicted beyond max_keys.
+    """
+
+    def __init__(self, max_keys: int = 65536) -> None:
+        """Initialize empty stores."""
+        self.max_keys = max_keys
+        self.__buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.__expiries: OrderedDict[str, float] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def consume(
+        self, key: str, capacity: float, refill_rate: float, cost: float = 1
+    ) -> float:
+        """
+        Take cost tokens from the bucket of key. Returns 0 when a token
+        was available, else the seconds until the next one is.
+        A cost of 0 only checks the bucket.
+        """
+        now = time.time()
+        with self.__lock:
+            tokens, updated_at = self.__buckets.pop(key, (capacity, now))
+            tokens = refill(tokens, updated_at, now, capacity, refill_rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens = max(0.0, tokens - cost)
+            else:
+                retry_after = (1 - tokens) / refill_rate
+            self.__buckets[key] = (tokens, now)
+            if len(self.__buckets) > self.max_keys:
+                self.__buckets.popitem(last=False)
+        return retry_after
+
+    def remember(self, key: str, ttl: float) -> None:
+        """Remember key for ttl seconds."""
+        with self.__lock:
+            self.__expiries.pop(key, None)
+            self.__expiries[key] = time.time() + ttl
+            if len(self.__expiries) > self.max_keys:
+                self.__expiries.popitem(last=False)
+
+    def recall(self, key: str) -> bool:
+        """Return True if key is remembered and not expired."""
+        with self.__lock:
+            expires_at = self.__expiries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self.__expiries[key]
+                return False
+            return True
+
+    def forget(self, key: str) -> None:
+        """Forget key."""
+        with self.__lock:
+            self.__expiries.pop(key, None)
+
+
+class SharedBackend:
+    """
+    Keeps buckets and remembered keys in a memory-mapped file so every
+    worker process on the host sees the same state.
+
+    The file is a fixed table of slots addressed by a hash of the key.
+    Each slot holds the key hash and two floats: the tokens and the last
+    refill time of a bucket, or the expiry time of a remembered key.
+    A key whose slot is taken by another key simply replaces it, which
+    at worst resets a bucket to full. Accesses are serialized with an
+    exclusive flock on the file.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, path: str, slots: int = 65536) -> None:
+        """Remember the file location, it is mapped on first use."""
+        if fcntl is None:
+            raise RuntimeError("The shared rate limit backend needs fcntl")
+        self.path = path
+        self.slots = slots
+        self.__file = None
+        self.__map: mmap.mmap | None = None
+        self.__pid: int | None = None
+        self.__lock = threading.Lock()
+
+    def __mapping(self) -> mmap.mmap:
+        """
+        Return the mapped file of the current process. Every forked
+        worker opens the file itself, since flock does not exclude
+        processes sharing an inherited file descriptor.
+        """
+        if self.__map is None or self.__pid != os.getpid():
+            size = self.slots * self.SLOT.size
+            self.__file = open(self.path, "a+b")
+            if os.fstat(self.__file.fileno()).st_size < size:
+                self.__file.truncate(size)
+            self.__map = mmap.mmap(self.__file.fileno(), size)
+            self.__pid = os.getpid()
+        return self.__map
+
+    def __locate(self, key: str) -> tuple[int, int]:
+        """Return the key hash and the offset of its slot."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little") or 1
+        return key_hash, (key_hash % self.slots) * self.SLOT.size
+
+    def __update(self, key: str, update: SlotUpdate) -> Any:
+        """
+        Call update(found, first, second) with the slot of key while
+        holding the lock, and store the (first, second) it returns
+        along with its result.
+        """
+        key_hash, offset = self.__locate(key)
+        with self.__lock:
+            mapping = self.__mapping()
+            fcntl.flock(self.__file, fcntl.LOCK_EX)
+            try:
+                stored_hash, first, second = self.SLOT.unpack_from(
+                    mapping, offset
+                )
+                result, values = update(stored_hash == key_hash, first, second)
+                if values is not None:
+                    self.SLOT.pack_into(mapping, offset, key_hash, *values)
+                return result
+            finally:
+                fcntl.flock(self.__file, fcntl.LOCK_UN)
+
+    def consume(
+        self, key: str, capacity: float, refill_rate: float, cost: float = 1
+    ) -> float:
+        """
+        Take cost tokens from the bucket of key. Returns 0 when a token
+        was available, else the seconds until the next one is.
+        A cost of 0 only checks the bucket.
+        """
+        now = time.time()
+
+        def take(
+            found: bool, tokens: float, updated_at: float
+        ) -> tuple[float, tuple[float, float]]:
+            if not found:
+                tokens, updated_at = capacity, now
+            tokens = refill(tokens, updated_at, now, capacity, refill_rate)
+            if tokens >= 1:
+                return 0.0, (max(0.0, tokens - cost), now)
+            return (1 - tokens) / refill_rate, (tokens, now)
+
+        return self.__update(key, take)
+
+    def remember(self, key: str, ttl: float) -> None:
+        """Remember key for ttl seconds."""
+        expires_at = time.time() + ttl
+        self.__update(key, lambda *_: (None, (expires_at, 0.0)))
+
+    def recall(self, key: str) -> bool:
+        """Return True if key is remembered and not expired."""
+        now = time.time()
+        return self.__update(
+            key,
+            lambda found, expires_at, _: (found and expires_at > now, None),
+        )
+
+    def forget(self, key: str) -> None:
+        """Forget key."""
+        self.__update(
+            key,
+            lambda found, *_: (None, (0.0, 0.0) if found else None),
+        )
+
+
+class LoginRateLimiter:
+    """
+    Applies the login rate limits and the unknown email cache.
+    """
+
+    def __init__(
+        self,
+        backend: MemoryBackend | SharedBackend | None = None,
+        ip_rate: str | None = None,
+        email_rate: str | None = None,
+        unknown_email_ttl: float | None = None,
+    ) -> None:
+        """Read the configuration."""
+        self.backend = backend or self.__create_backend()
+        self.ip_capacity, self.ip_refill_rate = parse_rate(
+            ip_rate or os.getenv("LOGIN_RATE_LIMIT_IP", "20/60")
+        )
+        self.email_capacity, self.email_refill_rate = parse_rate(
+            email_rate or os.getenv("LOGIN_RATE_LIMIT_EMAIL", "5/60")
+        )
+        self.unknown_email_ttl = (
+            unknown_email_ttl if unknown_email_ttl is not None
+            else float(os.getenv(
+                "UNKNOWN_EMAIL_TTL",
+                30 if isinstance(self.backend, SharedBackend) else 0,
+            ))
+        )
+
+    def __create_backend(self) -> MemoryBackend | SharedBackend:
+        """Return the backend selected by RATE_LIMIT_BACKEND."""
+        name = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        if name == "shared":
+            if fcntl is not None:
+                return SharedBackend(
+                    os.getenv(
+                        "RATE_LIMIT_FILE", "/tmp/unibenengvault_rate_limit"
+                    ),
+                    int(os.getenv("RATE_LIMIT_SLOTS", 65536)),
+                )
+            logger.warning(
+                "Shared rate limit backend unavailable, using memory backend"
+            )
+        elif name != "memory":
+            logger.warning(
+                f"Unknown RATE_LIMIT_BACKEND {name!r}, using memory backend"
+            )
+        return MemoryBackend()
+
+    def __reject(self, limit: str, retry_after: float) -> None:
+        """Abort with 429 telling the client when to retry."""
+        metrics.inc("login_rate_limited_total", limit=limit)
+        raise TooManyRequests(
+            description="Too many login attempts. Try again later.",
+            retry_after=math.ceil(retry_after),
+        )
+
+    def __keys(self, ip: str | None, email: str) -> list[tuple]:
+        """Return the limit name, bucket key, capacity and refill rate."""
+        return [
+            (
+                "ip",
+                f"login:ip:{ip or 'unknown'}",
+                self.ip_capacity,
+                self.ip_refill_rate,
+            ),
+            (
+                "email",
+                f"login:email:{email.lower()}",
+                self.email_capacity,
+                self.email_refill_rate,
+            ),
+        ]
+
+    def check(self, ip: str | None, email: str) -> None:
+        """
+        Abort with 429 when too many attempts failed recently from ip
+        or against email.
+        """
+        for limit, key, capacity, refill_rate in self.__keys(ip, email):
+            retry_after = self.backend.consume(key, capacity, refill_rate, 0)
+            if retry_after:
+                self.__reject(limit, retry_after)
+
+    def record_failure(self, ip: str | None, email: str) -> None:
+        """Count a failed attempt from ip against email."""
+        for _, key, capacity, refill_rate in self.__keys(ip, email):
+            self.backend.consume(key, capacity, refill_rate)
+
+    def is_unknown_email(self, email: str) -> bool:
+        """Return True if email recently did not match any user."""
+        if self.unknown_email_ttl <= 0:
+            return False
+
+        if self.backend.recall(f"unknown_email:{email.lower()}"):
+            metrics.cache_hit("unknown_email")
+            return True
+        metrics.cache_miss("unknown_email")
+        return False
+
+    def remember_unknown_email(self, email: str) -> None:
+        """Remember that email does not match any user."""
+        if self.unknown_email_ttl > 0:
+            self.backend.remember(
+                f"unknown_email:{email.lower()}", self.unknown_email_ttl
+            )
+
+    def forget_unknown_email(self, email: str) -> None:
+        """Forget that email did not match any user, e.g. on register."""
+        if self.unknown_email_ttl > 0:
+            self.backend.forget(f"unknown_email:{email.lower()}")
+
+
+login_rate_limiter = LoginRateLimiter()
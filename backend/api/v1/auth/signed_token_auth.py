@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Implements stateless session authentication with signed tokens.
+
+The session cookie holds a token signed with SECRET_KEY that carries the
+user id, the admin flag and a token id (jti). Authenticating a request
+only verifies the signature and the age of the token, so it needs no
+database query. Logging out records the jti in a small deny-list which
+every worker reloads at most every REVOKED_TOKENS_REFRESH seconds.
+
+Select it with AUTH_TYPE=signed_token.
+"""
+
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from flask import abort
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from typing import Any, cast
+from uuid import uuid4
+import logging
+import os
+import threading
+import time
+
+from api.v1.auth.authentication import BaseAuth
+from api.v1.utils.utility import get_obj, DatabaseOp
+from models import storage
+from models.revoked_token import RevokedToken
+from models.user import User
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class TokenUser:
+    """
+    The user a token was issued to.
+
+    id and is_admin are read from the token. Any other attribute loads
+    the user from the database on first access and is read from it.
+    admin_only checks is_admin against the database, so demoting,
+    suspending or deleting an admin takes effect immediately. Writes
+    load the user too, so a deleted or suspended user cannot write.
+    """
+
+    def __init__(self, user_id: str, is_admin: bool) -> None:
+        """Initialize the user from the token claims."""
+        self.id = user_id
+        self.is_admin = is_admin
+        self.__user: User | None = None
+
+    def get_user(self) -> User:
+        """Return the database user, loading it on first use."""
+        if self.__user is None:
+            user = get_obj(User, self.id)
+            if not user:
+                abort(401)
+            self.__user = user
+        return self.__user
+
+    def __getattr__(self, name: str) -> Any:
+        """Read attributes missing from the token from the user."""
+        return getattr(self.get_user(), name)
+
+
+class SignedTokenAuth(BaseAuth):
+    """
+    Authenticates requests with signed, expiring session tokens.
+    """
+
+    def __init__(self) -> None:
+        """Read the configuration."""
+        self.session_duration = int(os.getenv("SESSION_DURATION", 0))
+        self.refresh_interval = float(
+            os.getenv("REVOKED_TOKENS_REFRESH", 30)
+        )
+        self.secret_key = os.getenv("SECRET_KEY")
+        if not self.secret_key:
+            logger.error("SECRET_KEY environment variable not set")
+        self.serializer = URLSafeTimedSerializer(
+            self.secret_key or "", salt="session-token"
+        )
+        self.__revoked: set[str] = set()
+        self.__revoked_loaded_at = float("-inf")
+        self.__revoked_lock = threading.Lock()
+
+    def create_session(self, user_id: str | None = None) -> str | None:
+        """
+        Returns a signed token for the user. The user was just
+        authenticated, so it is read from the session's identity map.
+        """
+        if not user_id or not isinstance(user_id, str):  # type: ignore
+            return
+
+        if not self.secret_key:
+            abort(500)
+
+        user = get_obj(User, user_id)
+        if not user:
+            return
+
+        return self.serializer.dumps(
+            {"uid": user.id, "adm": bool(user.is_admin), "jti": uuid4().hex}
+        )
+
+    def get_session(self, user: User) -> str | None:
+        """
+        Tokens are not stored, so every login issues a new one.
+        """
+        return
+
+    def current_user(self) -> User | None:
+        """
+        Returns the user of a valid, unrevoked token in the session cookie.
+        """
+        claims = self.__claims()
+        if not claims:
+            return
+
+        # TokenUser stands in for the User until more than id and
+        # is_admin are needed.
+        return cast(User, TokenUser(claims["uid"], claims["adm"]))
+
+    def destroy_session(self) -> bool | None:
+        """
+        Revokes the token in the session cookie.
+        """
+        claims = self.__claims()
+        if not claims:
+            return False
+
+        revoked_token = RevokedToken(
+            jti=claims["jti"],
+            user_id=claims["uid"],
+            expires_at=(
+                datetime.now() + timedelta(seconds=self.session_duration)
+            ),
+        )
+        db = DatabaseOp()
+        db.save(revoked_token)
+
+        with self.__revoked_lock:
+            self.__revoked.add(claims["jti"])
+        return True
+
+    def __claims(self) -> dict[str, Any] | None:
+        """
+        Returns the claims of the token in the session cookie, or None
+        if it is missing, tampered with, expired or revoked.
+        """
+        token = self.session_cookie()
+        if not token or not self.secret_key:
+            return
+
+        try:
+            claims = self.serializer.loads(
+                token, max_age=self.session_duration
+            )
+        except BadSignature:
+            return
+
+        if not isinstance(claims, dict) or self.is_revoked(claims["jti"]):
+            return
+        return cast(dict[str, Any], claims)
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Returns True if the token was logged out. The deny-list is
+        reloaded from the database at most every refresh_interval seconds.
+        """
+        with self.__revoked_lock:
+            now = time.monotonic()
+            if now - self.__revoked_loaded_at >= self.refresh_interval:
+                try:
+                    self.__revoked = storage.revoked_token_ids()
+                    self.__revoked_loaded_at = now
+                except Exception as e:
+                    logger.error(f"Failed to load revoked tokens: {e}")
+            return jti in self.__revoked
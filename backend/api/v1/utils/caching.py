@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+"""
+Caches serialized responses of read-heavy routes.
+
+Entries hold the JSON body as bytes and its ETag, so a hit costs neither
+a database query nor serialization, and a client holding the current
+ETag gets an empty 304. Compressed variants of the body are kept with
+it, so a hit is not compressed again.
+
+Writes invalidate a cache by bumping its version. The version is kept in
+this process and in the modification time of a file, so an invalidation
+in one gunicorn worker also discards the entries of the others on their
+next lookup. Entries also expire after a TTL, which bounds staleness
+from writes that do not invalidate the cache.
+
+Read routes wrapped in conditional_get send an ETag and Cache-Control
+and answer a matching If-None-Match with 304. The ETag is derived from
+the versions of the tables the response is built from when the route
+names them, so a 304 is answered after a primary key lookup, before the
+view queries or serializes anything, or else from a hash of the body.
+The versions count the commits writing to each table, including bulk
+statements, and are bumped in the committing transaction, see
+DBStorage.bump_table_versions.
+
+Environment variables:
+    PUBLIC_CACHE_MAX_AGE: seconds shared caches and browsers may reuse
+        responses of public routes without revalidating (default 60).
+    CATALOGUE_CACHE_TTL: seconds a catalogue entry is served
+        (default 300). 0 disables the cache.
+    CATALOGUE_CACHE_SIZE: maximum number of catalogue entries
+        (default 1024).
+    CATALOGUE_CACHE_FILE: file whose modification time is the version
+        shared by the workers (default "/tmp/unibenengvault_catalogue").
+"""
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+from flask import Response, g, make_response, request
+from functools import wraps
+from typing import Any, Callable, Hashable, NamedTuple, Type
+from sqlalchemy import Table
+from werkzeug.http import is_resource_modified
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from api.v1.utils.compression import (
+    compress, negotiate_encoding, set_encoded_body
+)
+from api.v1.utils.metrics import metrics
+from models import storage
+from models.basemodel import BaseModel
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+PUBLIC_CACHE_MAX_AGE = int(os.getenv("PUBLIC_CACHE_MAX_AGE", 60))
+
+Version = tuple[int, int]
+
+
+class CachedResponse(NamedTuple):
+    """A cached response body and its validators."""
+
+    body: bytes
+    etag: str
+    version: Version
+    expires_at: float
+    # compressed bodies by content encoding
+    encoded: dict[str, bytes]
+
+    def encode(self, encoding: str) -> bytes:
+        """Return the body compressed with encoding."""
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = compress(self.body, encoding, cached=True)
+            self.encoded[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """
+    Keeps the serialized responses of a route, least recently used
+    entries are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 1024,
+        version_file: str | None = None,
+    ) -> None:
+        """Initialize an empty cache reported as name in the metrics."""
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_file = version_file
+        self.__generation = 0
+        self.__entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def version(self) -> Version:
+        """
+        Return the current version. Read it before querying the data
+        to cache, so a write committed meanwhile discards the entry.
+        """
+        shared = 0
+        if self.version_file:
+            try:
+                shared = os.stat(self.version_file).st_mtime_ns
+            except OSError:
+                pass
+        return self.__generation, shared
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        """Return the entry of key if it is current, else None."""
+        if self.ttl <= 0:
+            return None
+
+        version = self.version()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and (
+                entry.version != version or entry.expires_at <= time.time()
+            ):
+                del self.__entries[key]
+                entry = None
+            if entry is not None:
+                self.__entries.move_to_end(key)
+
+        if entry is None:
+            metrics.cache_miss(self.name)
+        else:
+            metrics.cache_hit(self.name)
+        return entry
+
+    def set(
+        self, key: Hashable, body: bytes, version: Version
+    ) -> CachedResponse:
+        """
+        Store body under key as of version and return the entry.
+        """
+        entry = CachedResponse(
+            body=body,
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            version=version,
+            expires_at=time.time() + self.ttl,
+            encoded={},
+        )
+        if self.ttl <= 0 or version != self.version():
+            return entry
+
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+        return entry
+
+    def invalidate(self) -> None:
+        """Discard every entry, in every worker."""
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+
+        if self.version_file:
+            try:
+                with open(self.version_file, "a"):
+                    pass
+                os.utime(self.version_file, ns=(time.time_ns(),) * 2)
+            except OSError as e:
+                logger.error(f"Could not invalidate {self.name} cache: {e}")
+
+    def clear(self) -> None:
+        """Discard the entries of this process."""
+        with self.__lock:
+            self.__entries.clear()
+
+
+def cached_response(entry: CachedResponse, status: int = 200) -> Response:
+    """
+    Return a JSON response of the entry, compressed if the client
+    accepts it, or an empty 304 when the client already holds it.
+    """
+    response = Response(status=status, mimetype="application/json")
+    response.set_etag(entry.etag)
+    # clients must revalidate, which is cheap thanks to the ETag
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+
+    if not is_resource_modified(request.environ, etag=entry.etag):
+        response.status_code = 304
+        return response
+
+    encoding = negotiate_encoding(len(entry.body))
+    if encoding:
+        set_encoded_body(response, entry.encode(encoding), encoding)
+    else:
+        response.set_data(entry.body)
+    return response
+
+
+def set_cache_control(response: Response, public: bool = False) -> None:
+    """
+    Let shared caches keep responses of public routes for a while,
+    and make browsers revalidate responses of private ones.
+    """
+    if public:
+        response.cache_control.public = True
+        response.cache_control.max_age = PUBLIC_CACHE_MAX_AGE
+    else:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+
+def conditional_get(
+    *classes: Type[BaseModel] | Table, public: bool = False
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorates a GET route to send validators and answer conditional
+    requests with 304.
+
+    classes are the models, or tables, the response is built from.
+    The versions of
+    their tables and the times of their last writes are fetched with
+    one query before the view runs, and with the URL they make up the
+    ETag and Last-Modified. The ETag of a private route also depends
+    on the current user.
+    Without classes the ETag is a hash of the body. public routes may
+    be stored by shared caches.
+
+        @conditional_get(Level, Course, User, public=True)
+        def get_all_levels():
+    """
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Response:
+            etag = last_modified = None
+            if classes:
+                fingerprint = storage.fingerprint(*classes)
+                # private responses may depend on who asks, and a
+                # browser shared by two accounts must not mix them up
+                viewer = (
+                    "" if public
+                    else getattr(g.get("current_user"), "id", "")
+                )
+                etag = hashlib.blake2b(
+                    f"{request.full_path}|{viewer}|{fingerprint}"
+                    .encode("utf-8"),
+                    digest_size=16,
+                ).hexdigest()
+                last_modified = max(
+                    (updated_at for _, updated_at in fingerprint
+                     if updated_at),
+                    default=None,
+                )
+                if not is_resource_modified(
+                    request.environ, etag=etag, last_modified=last_modified
+                ):
+                    response = Response(status=304)
+                    response.set_etag(etag)
+                    response.last_modified = last_modified
+                    set_cache_control(response, public)
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            if etag:
+                response.set_etag(etag)
+                response.last_modified = last_modified
+            elif not response.get_etag()[0]:
+                response.add_etag()
+            set_cache_control(response, public)
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
+
+
+catalogue_cache = ResponseCache(
+    "catalogue",
+    ttl=float(os.getenv("CATALOGUE_CACHE_TTL", 300)),
+    max_entries=int(os.getenv("CATALOGUE_CACHE_SIZE", 1024)),
+    version_file=os.getenv(
+        "CATALOGUE_CACHE_FILE", "/tmp/unibenengvault_catalogue"
+    ),
+)
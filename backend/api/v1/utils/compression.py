@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""
+Compresses responses with gzip or, when the brotli package is
+installed, brotli, as negotiated with the client's Accept-Encoding.
+
+Only text and JSON bodies of at least COMPRESSION_MIN_SIZE bytes are
+compressed; below that the saving does not pay for the CPU time.
+Compressed responses get a weak ETag, since their bytes differ from the
+identity encoding, which keeps If-None-Match working either way.
+
+Cached responses keep their compressed variants, so a hit is compressed
+once per encoding rather than on every request.
+
+Environment variables:
+    COMPRESSION_MIN_SIZE: smallest body compressed, in bytes
+        (default 1024). 0 compresses every body.
+    GZIP_LEVEL: gzip compression level (default 6).
+    BROTLI_QUALITY: brotli quality of responses compressed per request
+        (default 4).
+    CACHED_BROTLI_QUALITY: brotli quality of cached responses, which
+        are compressed once (default 9).
+"""
+
+from dotenv import load_dotenv
+from flask import Response, request
+import gzip
+import logging
+import os
+import time
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+from api.v1.utils.metrics import metrics
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+CACHED_BROTLI_QUALITY = int(os.getenv("CACHED_BROTLI_QUALITY", 9))
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return the encodings available, preferred first."""
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(size: int) -> str | None:
+    """
+    Return the encoding to send a body of size bytes in,
+    or None to send it as is.
+    """
+    if size < COMPRESSION_MIN_SIZE:
+        return None
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress body with encoding. Cached bodies are compressed harder,
+    since that is done once.
+    """
+    start = time.perf_counter()
+    if encoding == "br":
+        quality = CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY
+        compressed = brotli.compress(body, quality=quality)
+    else:
+        # mtime=0 keeps the output, and so cached variants, deterministic
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    metrics.inc(
+        "compression_seconds_total",
+        time.perf_counter() - start,
+        encoding=encoding,
+    )
+    metrics.inc("compression_input_bytes_total", len(body), encoding=encoding)
+    metrics.inc(
+        "compression_output_bytes_total", len(compressed), encoding=encoding
+    )
+    return compressed
+
+
+def set_encoded_body(response: Response, body: bytes, encoding: str) -> None:
+    """
+    Set the compressed body of response along with its headers.
+    """
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def is_compressible(response: Response) -> bool:
+    """Return True if the body of response may be compressed."""
+    return (
+        response.mimetype in COMPRESSIBLE_MIMETYPES
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and not response.cache_control.no_transform
+    )
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress the body of response if the client accepts it.
+    """
+    if response.status_code == 304 or is_compressible(response):
+        response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or not is_compressible(response)
+    ):
+        return response
+
+    encoding = negotiate_encoding(response.calculate_content_length() or 0)
+    if encoding:
+        set_encoded_body(
+            response, compress(response.get_data(), encoding), encoding
+        )
+    return response
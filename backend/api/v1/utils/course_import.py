@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+"""
+Implements bulk import of departments, courses and the departments
+offering each course.
+
+The import accepts either:
+    - a JSON array of course rows,
+    - a JSON object {"departments": [...], "courses": [...]},
+    - a CSV file uploaded as "file" (or a text/csv body) of course rows.
+
+A course row holds the CourseCreate fields. Its level is given either
+as "level_id" or as "level" (the level name, e.g. 100), and its
+departments as "departments": a list of department codes or ids, or in
+CSV a single column separated by ";".
+
+Every row is validated before anything is written. Levels, departments
+and existing course codes are each resolved with one query, and all rows
+are inserted with executemany statements in one transaction.
+"""
+
+from flask import abort, request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Type
+from uuid import uuid4
+import csv
+import io
+import logging
+
+from api.v1.utils.data_validations import (
+    CourseCreate,
+    DepartmentCreate,
+    get_request_data,
+)
+from models import storage
+from models.course import Course, course_departments
+from models.department import Department
+from models.level import Level
+
+
+logger = logging.getLogger(__name__)
+MAX_IMPORT_ROWS = 5000
+CSV_LIST_SEPARATOR = ";"
+
+
+class CourseImport:
+    """
+    Validates and inserts a batch of departments and courses.
+    """
+
+    def __init__(self, admin_id: str) -> None:
+        """Initialize an empty import by the given admin."""
+        self.admin_id = admin_id
+        self.errors: list[dict[str, Any]] = []
+
+    def read_rows(self) -> tuple[list[Any], list[Any]]:
+        """
+        Returns the department and course rows of the request.
+        """
+        file_obj = request.files.get("file")
+        if file_obj:
+            text = io.TextIOWrapper(file_obj.stream, encoding="utf-8-sig")
+            return [], self.read_csv(text)
+
+        if request.mimetype == "text/csv":
+            text = io.StringIO(request.get_data(as_text=True))
+            return [], self.read_csv(text)
+
+        data = get_request_data()
+        if isinstance(data, list):
+            return [], data
+        if isinstance(data, dict):
+            departments = data.get("departments") or []
+            courses = data.get("courses") or []
+            if isinstance(departments, list) and isinstance(courses, list):
+                return departments, courses
+
+        abort(
+            400,
+            description=(
+                "Expected a list of courses, an object with departments"
+                " and courses lists, or a CSV file."
+            ),
+        )
+
+    def read_csv(self, text: io.TextIOBase) -> list[dict[str, Any]]:
+        """
+        Returns the course rows of a CSV file. Empty cells are left out
+        so optional fields take their defaults.
+        """
+        rows: list[dict[str, Any]] = []
+        try:
+            for csv_row in csv.DictReader(text):
+                row: dict[str, Any] = {
+                    key.strip(): value.strip()
+                    for key, value in csv_row.items()
+                    if key and isinstance(value, str) and value.strip()
+                }
+                if "departments" in row:
+                    row["departments"] = [
+                        ref.strip()
+                        for ref in row["departments"].split(
+                            CSV_LIST_SEPARATOR
+                        )
+                        if ref.strip()
+                    ]
+                if "is_active" in row:
+                    row["is_active"] = (
+                        row["is_active"].lower() in ("1", "true", "yes")
+                    )
+                rows.append(row)
+        except (csv.Error, UnicodeDecodeError) as e:
+            abort(400, description=f"Invalid CSV file: {e}")
+        return rows
+
+    def add_error(self, section: str, row: int, errors: Any) -> None:
+        """Record the errors of a row, numbered from 1."""
+        self.errors.append({"section": section, "row": row, "errors": errors})
+
+    def validate(
+        self, validation_cls: Type[BaseModel], data: Any
+    ) -> dict[str, Any] | list[Any]:
+        """
+        Returns the validated row, or the validation errors.
+        """
+        if not isinstance(data, dict):
+            return ["Row must be an object."]
+        try:
+            return validation_cls.model_validate(data).model_dump(
+                mode="json"
+            )
+        except ValidationError as e:
+            return e.errors(include_url=False, include_context=False)
+
+    def validate_departments(
+        self, rows: list[Any]
+    ) -> list[dict[str, Any]]:
+        """
+        Returns the valid department rows that do not exist yet.
+        Departments that already exist with the same code are reused.
+        """
+        valid_rows: list[dict[str, Any]] = []
+        for index, row in enumerate(rows, start=1):
+            valid = self.validate(DepartmentCreate, row)
+            if isinstance(valid, list):
+                self.add_error("departments", index, valid)
+            else:
+                valid_rows.append(valid)
+
+        existing_codes = {
+            department.dept_code
+            for department in storage.get_by_values(
+                Department,
+                dept_code=[row["dept_code"] for row in valid_rows],
+            )
+        }
+        new_rows: dict[str, dict[str, Any]] = {}
+        for row in valid_rows:
+            if row["dept_code"] not in existing_codes:
+                # the id is set up front so course rows can link to it
+                new_rows.setdefault(
+                    row["dept_code"], dict(row, id=str(uuid4()))
+                )
+        return list(new_rows.values())
+
+    def validate_courses(
+        self, rows: list[Any], new_departments: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[list[str]]]:
+        """
+        Returns the valid course rows and, for each, the ids of the
+        departments offering it.
+        """
+        level_ids: set[str] = set()
+        level_names: set[int] = set()
+        department_refs: set[str] = set()
+        course_codes: set[str] = set()
+
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            if row.get("level_id"):
+                level_ids.add(str(row["level_id"]).strip())
+            elif str(row.get("level", "")).strip().isdigit():
+                level_names.add(int(str(row["level"]).strip()))
+            refs = row.get("departments") or []
+            if isinstance(refs, list):
+                department_refs.update(
+                    str(ref).strip().lower() for ref in refs
+                )
+            if isinstance(row.get("course_code"), str):
+                course_codes.add(row["course_code"].strip().lower())
+
+        levels = storage.get_by_values(
+            Level, id=level_ids, level_name=level_names
+        )
+        level_by_ref: dict[str, str] = {}
+        for level in levels:
+            level_by_ref[level.id] = level.id
+            level_by_ref[str(level.level_name)] = level.id
+
+        departments = storage.get_by_values(
+            Department, id=department_refs, dept_code=department_refs
+        )
+        department_by_ref: dict[str, str] = {}
+        for department in departments:
+            department_by_ref[department.id] = department.id
+            department_by_ref[department.dept_code] = department.id
+        for department_row in new_departments:
+            department_by_ref[department_row["dept_code"]] = (
+                department_row["id"]
+            )
+
+        taken_codes = {
+            course.course_code
+            for course in storage.get_by_values(
+                Course, course_code=course_codes
+            )
+        }
+
+        valid_rows: list[dict[str, Any]] = []
+        department_ids: list[list[str]] = []
+        for index, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                self.add_error("courses", index, ["Row must be an object."])
+                continue
+
+            row = dict(row)
+            errors: list[Any] = []
+
+            level_name = row.pop("level", None)
+            level_ref = str(row.get("level_id") or level_name or "").strip()
+            if level_ref in level_by_ref:
+                row["level_id"] = level_by_ref[level_ref]
+            else:
+                errors.append(f"Level {level_ref or '(missing)'} not found.")
+
+            refs = row.pop("departments", None) or []
+            if not isinstance(refs, list):
+                errors.append("departments must be a list.")
+                refs = []
+            row_department_ids: list[str] = []
+            for ref in refs:
+                ref = str(ref).strip().lower()
+                if ref not in department_by_ref:
+                    errors.append(f"Department {ref} not found.")
+                elif department_by_ref[ref] not in row_department_ids:
+                    row_department_ids.append(department_by_ref[ref])
+
+            valid = self.validate(CourseCreate, row)
+            if isinstance(valid, list):
+                errors.extend(valid)
+            elif valid["course_code"] in taken_codes:
+                errors.append(
+                    f"Course {valid['course_code'].upper()} already exists."
+                )
+
+            if errors:
+                self.add_error("courses", index, errors)
+                continue
+
+            taken_codes.add(valid["course_code"])
+            valid["admin_id"] = self.admin_id
+            valid_rows.append(valid)
+            department_ids.append(row_department_ids)
+
+        return valid_rows, department_ids
+
+    def run(self, partial: bool = False) -> dict[str, Any]:
+        """
+        Imports the rows of the request. Unless partial is True,
+        nothing is written when any row is invalid.
+        Returns the number of rows created and the row errors.
+        """
+        department_rows, course_rows = self.read_rows()
+        if len(department_rows) + len(course_rows) > MAX_IMPORT_ROWS:
+            abort(
+                400,
+                description=f"Import at most {MAX_IMPORT_ROWS} rows at once.",
+            )
+
+        new_departments = self.validate_departments(department_rows)
+        courses, department_ids = self.validate_courses(
+            course_rows, new_departments
+        )
+
+        result: dict[str, Any] = {
+            "departments_created": 0,
+            "courses_created": 0,
+            "links_created": 0,
+            "errors": self.errors,
+        }
+        if self.errors and not partial:
+            return result
+
+        try:
+            storage.bulk_insert(Department, new_departments)
+            courses = storage.bulk_insert(Course, courses)
+            links = [
+                {"course_id": course["id"], "department_id": department_id}
+                for course, ids in zip(courses, department_ids)
+                for department_id in ids
+            ]
+            storage.bulk_insert(course_departments, links)
+            storage.refresh_course_path_buckets(
+                None if new_departments else [c["id"] for c in courses]
+            )
+            storage.save()
+        except IntegrityError as e:
+            logger.error(f"Course import failed: {e}")
+            abort(409, description="Import conflicts with existing data.")
+        except Exception as e:
+            logger.error(f"Course import failed: {e}")
+            abort(500)
+
+        result["departments_created"] = len(new_departments)
+        result["courses_created"] = len(courses)
+        result["links_created"] = len(links)
+        return result
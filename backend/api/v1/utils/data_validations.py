@@ -6,6 +6,7 @@
 
 from enum import Enum
 from flask import abort, request
+from functools import lru_cache
 from pydantic import (
     BaseModel,
     ValidationError,
@@ -13,7 +14,9 @@ from pydantic import (
     StringConstraints,
     PositiveInt,
     StrictBool,
-    model_validator,
+    ConfigDict,
+    Field,
+    TypeAdapter,
     field_validator,
 )
 from typing import Annotated, Any, Optional, Type, Tuple
@@ -25,31 +28,49 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class FileStatus(str, Enum):
+class LowercaseEnum(str, Enum):
+    """
+    String enum whose values are lowercase, matching input in any case.
+    """
+
+    @classmethod
+    def _missing_(cls, value: Any) -> Any:
+        """
+        Look up value in lowercase, only called when it does not match.
+        """
+        if isinstance(value, str):
+            lowered = value.lower()
+            for member in cls:
+                if member.value == lowered:
+                    return member
+        return None
+
+
+class FileStatus(LowercaseEnum):
     pending = "pending"
     approved = "approved"
     rejected = "rejected"
 
 
-class ReportType(str, Enum):
+class ReportType(LowercaseEnum):
     file = "file"
     tutorial_link = "tutorial link"
     content = "content"
     other = "other"
 
 
-class ReportStatus(str, Enum):
+class ReportStatus(LowercaseEnum):
     pending = "pending"
     in_progress = "in progress"
     resolved = "resolved"
 
 
-class ReportPriority(str, Enum):
+class ReportPriority(LowercaseEnum):
     normal = "normal"
     high = "high"
 
 
-class Semester(str, Enum):
+class Semester(LowercaseEnum):
     first_semester = "first"
     second_semester = "second"
 
@@ -59,10 +80,12 @@ class CourseCreate(BaseModel):
     Validation class for creating courses.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     course_code: Annotated[
         str,
         StringConstraints(
-            pattern=r"^[a-z]{3}\d{3}$",
+            pattern=r"(?i)^[a-z]{3}\d{3}$",
             min_length=6,
             max_length=6,
             strip_whitespace=True,
@@ -107,28 +130,19 @@ class CourseCreate(BaseModel):
             )
         return credit_load
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Converts attributes to lower case.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class CourseUpdate(BaseModel):
     """
     Validation class for updating courses.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     course_code: Optional[
         Annotated[
             str,
             StringConstraints(
-                pattern=r"^[a-z]{3}\d{3}$",
+                pattern=r"(?i)^[a-z]{3}\d{3}$",
                 min_length=6,
                 max_length=6,
                 strip_whitespace=True,
@@ -184,27 +198,18 @@ class CourseUpdate(BaseModel):
             )
         return credit_load
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Convert attributes to lower case.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class DepartmentCreate(BaseModel):
     """
     Validation class for creating departments.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     dept_name: Annotated[
         str,
         StringConstraints(
-            pattern=r".*\bengineering$",
+            pattern=r"(?i).*\bengineering$",
             strip_whitespace=True
         )
     ]
@@ -217,28 +222,19 @@ class DepartmentCreate(BaseModel):
         )
     ]
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Convert attributes to lower case.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class DepartmentUpdate(BaseModel):
     """
     Validation class for updating department requests.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     dept_name: Optional[
         Annotated[
             str,
             StringConstraints(
-                pattern=r".*\bengineering$",
+                pattern=r"(?i).*\bengineering$",
                 strip_whitespace=True
             )
         ]
@@ -254,17 +250,6 @@ class DepartmentUpdate(BaseModel):
         ]
     ] = None
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Converts attributes to lowercase.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class FileCreate(BaseModel):
     """
@@ -402,6 +387,8 @@ class ReportCreate(BaseModel):
     Validation class for creating reports.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     report_type: ReportType
     message: Annotated[
         str,
@@ -432,23 +419,14 @@ class ReportCreate(BaseModel):
         ]
     ] = None
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Converts attributes to lowercase.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class ReportUpdate(BaseModel):
     """
     Validation class for updating reports.
     """
 
+    model_config = ConfigDict(str_to_lower=True)
+
     priority: Optional[ReportPriority] = None
     status: Optional[ReportStatus] = None
     response: Optional[
@@ -462,17 +440,6 @@ class ReportUpdate(BaseModel):
         ]
     ] = None
 
-    @model_validator(mode="before")
-    @classmethod
-    def set_to_lowercase(cls, request_data: Any):
-        """
-        Converts attributes to lowercase.
-        """
-        for attr, value in request_data.items():
-            if isinstance(value, str):
-                request_data[attr] = value.lower()
-        return request_data
-
 
 class UserLogin(BaseModel):
     """
@@ -605,6 +572,32 @@ class UserWarningCreate(BaseModel):
     ]
 
 
+class UserWarningBulkCreate(UserWarningCreate):
+    """
+    Validation class for warning many users at once.
+    """
+
+    user_ids: Annotated[
+        list[
+            Annotated[
+                str,
+                StringConstraints(
+                    min_length=36,
+                    max_length=36,
+                    strip_whitespace=True
+                )
+            ]
+        ],
+        Field(min_length=1, max_length=500),
+    ]
+
+    @field_validator("user_ids")
+    @classmethod
+    def unique_user_ids(cls, user_ids: list[str]) -> list[str]:
+        """Drop repeated ids, a user is warned once per request."""
+        return list(dict.fromkeys(user_ids))
+
+
 class UserWarningUpdate(BaseModel):
     """
     Validation class for updating user warning.
@@ -644,6 +637,61 @@ def get_request_data() -> dict[str, Any]:
     return request_data
 
 
+def validate(
+    validation_cls: Type[BaseModel], data: Any
+) -> dict[str, Any]:
+    """
+    Returns the fields of data set by the client, validated, or
+    aborts the request on validation error or when none is set.
+    """
+    try:
+        valid_data = validation_cls.model_validate(data)
+    except ValidationError as e:
+        abort(400, description=e.errors())
+
+    data = valid_data.model_dump(exclude_unset=True)
+    if all(value is None for value in data.values()):
+        abort(400, description="Request data cannot be empty.")
+    return data
+
+
+@lru_cache(maxsize=None)
+def list_adapter(validation_cls: Type[BaseModel]) -> TypeAdapter[Any]:
+    """
+    Returns the adapter validating lists of validation_cls. Building
+    it compiles a validator, so it is built once per class.
+    """
+    return TypeAdapter(list[validation_cls])  # type: ignore
+
+
+def validate_many(
+    validation_cls: Type[BaseModel],
+    records: list[Any],
+    **dump_options: Any,
+) -> tuple[dict[int, dict[str, Any]], dict[int, list[Any]]]:
+    """
+    Validates a list of records for bulk endpoints with one call into
+    pydantic, or two when some records are invalid.
+    Returns the valid records dumped with dump_options and the errors
+    of the invalid ones, both by index.
+    """
+    adapter = list_adapter(validation_cls)
+    indexes = list(range(len(records)))
+    errors: dict[int, list[Any]] = {}
+
+    try:
+        valid = adapter.validate_python(records)
+    except ValidationError as e:
+        for error in e.errors(include_url=False, include_context=False):
+            index, *loc = error["loc"]
+            errors.setdefault(index, []).append(dict(error, loc=tuple(loc)))
+        indexes = [index for index in indexes if index not in errors]
+        valid = adapter.validate_python([records[i] for i in indexes])
+
+    dumped = adapter.dump_python(valid, **dump_options)
+    return dict(zip(indexes, dumped)), errors
+
+
 def validate_form_data(
     validation_cls: Type[BaseModel],
 ) -> Tuple[dict[str, Any], FileStorage | None]:
@@ -662,13 +710,14 @@ def validate_form_data(
         file_metadata = get_request_data()
 
     try:
-        valid_data = validation_cls(**file_metadata)
+        valid_data = validation_cls.model_validate(file_metadata)
     except ValidationError as e:
         abort(400, description=e.errors())
 
-    if not valid_data.model_dump(exclude_none=True) and not file_obj:
+    data = valid_data.model_dump(exclude_unset=True)
+    if all(value is None for value in data.values()) and not file_obj:
         abort(400, description="Request data cannot be empty")
-    return valid_data.model_dump(exclude_unset=True), file_obj
+    return data, file_obj
 
 
 def validate_request_data(
@@ -684,12 +733,4 @@ def validate_request_data(
         )
         abort(500)
 
-    request_data = get_request_data()
-    try:
-        valid_data: BaseModel = validation_cls(**request_data)
-    except ValidationError as e:
-        abort(400, description=e.errors())
-
-    if not valid_data.model_dump(exclude_none=True):
-        abort(400, description="Request data cannot be empty.")
-    return valid_data.model_dump(exclude_unset=True)
+    return validate(validation_cls, get_request_data())
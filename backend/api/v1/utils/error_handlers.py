@@ -6,7 +6,11 @@ Implements custom error handlers with custom messages.
 
 
 from flask import jsonify
-from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+from werkzeug.exceptions import (
+    HTTPException,
+    RequestEntityTooLarge,
+    TooManyRequests,
+)
 import sys
 import traceback
 
@@ -47,6 +51,17 @@ def conflict_error(error: HTTPException):
     return jsonify({"error": error.description}), 409
 
 
+def too_many_requests(error: TooManyRequests):
+    """Handles 429 errors raised by rate limits"""
+    response = jsonify(
+        {"error": error.description or "Too many requests"}
+    )
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
 def server_error(error: HTTPException):
     """Handles 500 server request errors"""
 
@@ -66,6 +81,13 @@ def server_error(error: HTTPException):
     )
 
 
+def service_unavailable(error: HTTPException):
+    """Handles 503 errors raised when the server is overloaded"""
+    if error.description:
+        return jsonify({"error": error.description}), 503
+    return jsonify({"error": "Service unavailable"}), 503
+
+
 def large_request_error(error: RequestEntityTooLarge):
     """Handles files too large errors"""
     return jsonify(
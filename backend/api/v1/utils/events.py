@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+
+"""
+Publishes moderation events, such as new files and reports and file
+approvals, to the admins connected to the /events stream.
+
+Each worker keeps a broker with a bounded queue per connected admin.
+Events reach the brokers of the other gunicorn workers through a relay:
+
+    postgres: NOTIFY on EVENTS_CHANNEL, which a thread of every worker
+        with subscribers LISTENs to on a connection of its own.
+    socket: a Unix datagram socket per worker with subscribers in
+        EVENTS_SOCKET_DIR, to each of which every event is sent.
+        A stand-in for Postgres when the workers share a host.
+    local: this process only.
+
+A subscriber falling EVENTS_QUEUE_SIZE events behind is dropped, and
+its stream closed for the client to reconnect, rather than buffering
+without bound. Events are not replayed, so clients refetch what they
+display when they (re)connect.
+
+Environment variables:
+    EVENTS_RELAY: "postgres", "socket" or "local" (default "postgres"
+        on Postgres, else "local").
+    EVENTS_CHANNEL: Postgres channel (default "unibenengvault_events").
+    EVENTS_SOCKET_DIR: directory of the worker sockets
+        (default "/tmp/unibenengvault_events").
+    EVENTS_QUEUE_SIZE: events buffered per subscriber (default 100).
+    EVENTS_MAX_SUBSCRIBERS: streams open at once per worker, at most
+        and by default a quarter of GUNICORN_THREADS. A stream holds a
+        request thread for up to EVENTS_MAX_STREAM_DURATION, so the
+        other threads are left to the rest of the API, and further
+        streams are refused with 503.
+    GUNICORN_THREADS: request threads per worker, see gunicorn.conf.py
+        (default 16).
+"""
+
+from dotenv import load_dotenv
+from typing import Any, Callable, NamedTuple
+from uuid import uuid4
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import select
+import socket
+import threading
+import time
+
+from api.v1.utils.json_provider import default
+from api.v1.utils.metrics import metrics
+from models import storage
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+LISTEN_TIMEOUT = 5
+MAX_RECONNECT_DELAY = 30
+MAX_DATAGRAM_SIZE = 65536
+
+
+class Event(NamedTuple):
+    """An event published to the subscribers."""
+
+    id: str
+    name: str
+    data: dict[str, Any]
+
+    def to_json(self) -> str:
+        """Return the event as JSON, for relaying it."""
+        return json.dumps(
+            {"id": self.id, "name": self.name, "data": self.data},
+            default=default,
+        )
+
+    @classmethod
+    def from_json(cls, payload: str | bytes) -> "Event":
+        """Return the event relayed as payload."""
+        event = json.loads(payload)
+        return cls(event["id"], event["name"], event["data"])
+
+    def to_sse(self) -> str:
+        """Return the event as a Server-Sent Events message."""
+        data = json.dumps(self.data, default=default)
+        return f"id: {self.id}\nevent: {self.name}\ndata: {data}\n\n"
+
+
+Deliver = Callable[[Event], None]
+
+
+class Subscription:
+    """The queue of events of one subscriber."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty subscription."""
+        self.queue: queue.Queue[Event] = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event: Event) -> bool:
+        """
+        Queue event. Returns False, and marks the subscription
+        overflowed, if the queue is full.
+        """
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+    def get(self, timeout: float) -> Event | None:
+        """Return the next event, or None after timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalRelay:
+    """
+    Delivers events within this process. Base of the relays.
+    """
+
+    def start(self, deliver: Deliver) -> None:
+        """Start receiving the events of other processes."""
+
+    def publish(self, event: Event, deliver: Deliver) -> None:
+        """Send event to every subscriber."""
+        deliver(event)
+
+
+class PostgresRelay(LocalRelay):
+    """
+    Relays events through Postgres NOTIFY and LISTEN.
+    """
+
+    def __init__(self, channel: str) -> None:
+        """Initialize the relay of channel."""
+        if not re.match(r"^[a-z_][a-z0-9_]*$", channel):
+            raise ValueError(f"Invalid events channel: {channel}")
+        self.channel = channel
+        self.__listener: threading.Thread | None = None
+        self.__lock = threading.Lock()
+
+    def start(self, deliver: Deliver) -> None:
+        """Start the listener thread, unless it is running already."""
+        with self.__lock:
+            if self.__listener is None or not self.__listener.is_alive():
+                self.__listener = threading.Thread(
+                    target=self.listen,
+                    args=(deliver,),
+                    name="events-listener",
+                    daemon=True,
+                )
+                self.__listener.start()
+
+    def publish(self, event: Event, deliver: Deliver) -> None:
+        """
+        Notify the channel. The listener of this process delivers
+        the event too.
+        """
+        storage.notify(self.channel, event.to_json())
+
+    def listen(self, deliver: Deliver) -> None:
+        """
+        Deliver the notifications of the channel, reconnecting with
+        a growing delay when the connection fails.
+        """
+        delay = 1
+        while True:
+            connection = None
+            try:
+                connection = storage.listen_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                delay = 1
+                while True:
+                    select.select([connection], [], [], LISTEN_TIMEOUT)
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        deliver(Event.from_json(notify.payload))
+            except Exception as e:
+                logger.error(f"Events listener failed: {e}")
+                metrics.inc("events_relay_errors_total", relay="postgres")
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+class SocketRelay(LocalRelay):
+    """
+    Relays events between the processes of a host through Unix
+    datagram sockets in a shared directory.
+    """
+
+    def __init__(self, directory: str, name: str | None = None) -> None:
+        """
+        Initialize the relay. The socket of this process is named
+        after name, its pid by default.
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, f"{name or os.getpid()}.sock")
+        self.__sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # a worker not reading must not block the request publishing
+        self.__sender.setblocking(False)
+        self.__listener: threading.Thread | None = None
+        self.__lock = threading.Lock()
+
+    def start(self, deliver: Deliver) -> None:
+        """
+        Bind the socket of this process and start the listener thread,
+        unless it is running already.
+        """
+        with self.__lock:
+            if self.__listener is not None and self.__listener.is_alive():
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            receiver.bind(self.path)
+            self.__listener = threading.Thread(
+                target=self.listen,
+                args=(receiver, deliver),
+                name="events-listener",
+                daemon=True,
+            )
+            self.__listener.start()
+
+    def publish(self, event: Event, deliver: Deliver) -> None:
+        """
+        Deliver event in this process and send it to the sockets
+        of the others.
+        """
+        deliver(event)
+        payload = event.to_json().encode("utf-8")
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self.__sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # nobody is bound to it, its process has exited
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.error(f"Could not relay event to {path}: {e}")
+                metrics.inc("events_relay_errors_total", relay="socket")
+
+    def listen(self, receiver: socket.socket, deliver: Deliver) -> None:
+        """Deliver the events received on the socket of this process."""
+        while True:
+            try:
+                deliver(Event.from_json(receiver.recv(MAX_DATAGRAM_SIZE)))
+            except Exception as e:
+                logger.error(f"Events listener failed: {e}")
+                metrics.inc("events_relay_errors_total", relay="socket")
+
+
+class EventBroker:
+    """
+    Fans published events out to the subscriptions of this process.
+    """
+
+    def __init__(
+        self,
+        relay: LocalRelay | None = None,
+        queue_size: int = 100,
+        max_subscribers: int = 100,
+    ) -> None:
+        """Initialize a broker without subscribers."""
+        self.relay = relay or LocalRelay()
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.__subscriptions: set[Subscription] = set()
+        self.__lock = threading.Lock()
+
+    def subscribe(self) -> Subscription | None:
+        """
+        Returns a new subscription,
+        or None if there are max_subscribers already.
+        """
+        with self.__lock:
+            if len(self.__subscriptions) >= self.max_subscribers:
+                return None
+            subscription = Subscription(self.queue_size)
+            self.__subscriptions.add(subscription)
+
+        self.relay.start(self.deliver)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering events to subscription."""
+        with self.__lock:
+            self.__subscriptions.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        """Return the number of subscriptions."""
+        with self.__lock:
+            return len(self.__subscriptions)
+
+    def deliver(self, event: Event) -> None:
+        """Queue event on every subscription of this process."""
+        with self.__lock:
+            subscriptions = list(self.__subscriptions)
+
+        for subscription in subscriptions:
+            if not subscription.put(event):
+                self.unsubscribe(subscription)
+                metrics.inc("events_dropped_subscribers_total")
+
+    def publish(self, name: str, data: dict[str, Any]) -> Event:
+        """
+        Publishes an event to the subscribers of every process.
+        Call it once the changes it announces are committed.
+        """
+        event = Event(uuid4().hex, name, data)
+        metrics.inc("events_published_total", event=name)
+        try:
+            self.relay.publish(event, self.deliver)
+        except Exception as e:
+            # the event is lost, not the request publishing it
+            logger.error(f"Could not publish {name} event: {e}")
+            metrics.inc(
+                "events_relay_errors_total",
+                relay=type(self.relay).__name__,
+            )
+        return event
+
+
+def create_relay() -> LocalRelay:
+    """Returns the relay configured by EVENTS_RELAY."""
+    relay = os.getenv("EVENTS_RELAY")
+    if not relay:
+        relay = "postgres" if storage.dialect_name == "postgresql" else "local"
+
+    if relay == "postgres":
+        return PostgresRelay(
+            os.getenv("EVENTS_CHANNEL", "unibenengvault_events")
+        )
+    if relay == "socket":
+        return SocketRelay(
+            os.getenv("EVENTS_SOCKET_DIR", "/tmp/unibenengvault_events")
+        )
+    if relay != "local":
+        raise ValueError(f"Unknown EVENTS_RELAY: {relay}")
+    return LocalRelay()
+
+
+def event_gauges() -> list[tuple[str, dict[str, str], float]]:
+    """
+    Returns the number of event subscribers as metrics gauges.
+    """
+    return [("events_subscribers", {}, event_broker.subscriber_count())]
+
+
+def max_stream_count() -> int:
+    """
+    Returns the number of streams a worker may serve at once, a quarter
+    of its request threads unless EVENTS_MAX_SUBSCRIBERS is lower.
+    """
+    thread_budget = max(1, int(os.getenv("GUNICORN_THREADS", 16)) // 4)
+    return min(
+        int(os.getenv("EVENTS_MAX_SUBSCRIBERS", thread_budget)),
+        thread_budget,
+    )
+
+
+event_broker = EventBroker(
+    create_relay(),
+    queue_size=int(os.getenv("EVENTS_QUEUE_SIZE", 100)),
+    max_subscribers=max_stream_count(),
+)
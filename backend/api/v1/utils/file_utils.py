@@ -20,10 +20,12 @@ import logging
 import magic
 import os
 import re
+import time
 
 from api.v1.utils.data_validations import (
     FileCreate, FileUpdate, validate_form_data
 )
+from api.v1.utils.metrics import metrics
 from api.v1.utils.utility import get_obj
 from models import storage
 from models.course import Course
@@ -175,7 +177,9 @@ class FileManager:
         ):
             abort(400, "Past question(s) must have session.")
 
-        course: Course | None = get_obj(Course, valid_metadata["course_id"])
+        course: Course | None = get_obj(
+            Course, valid_metadata["course_id"], load=("level",)
+        )
         if not course:
             abort(404, description="Course not found.")
 
@@ -196,7 +200,7 @@ class FileManager:
 
         file_type = valid_metadata.get("file_type")
         session = valid_metadata.get("session")
-        course_id = valid_metadata.get("course")
+        course_id = valid_metadata.get("course_id")
         status = valid_metadata.get("status")
         rejection_reason = valid_metadata.get("rejection_reason")
 
@@ -225,16 +229,18 @@ class FileManager:
 
         return new_filename
 
-    def generate_temp_s3_filepath(
-        self,
-        new_filename: str,
-        course: Course,
-    ) -> str:
+    def get_path_bucket(self, course: Course) -> str:
         """
-        Returns a temporary file path that will be added to
-        temporary s3 bucket awaiting approval of an admin.
+        Returns the S3 prefix files of the course are uploaded under:
+        "general", "shared" or the name of its only department.
+
+        It is precomputed in course.path_bucket whenever the course's
+        departments change. Courses created before that column existed
+        are classified here and the result stored with the upload.
         """
-        semester = course.semester.value + "-semester"
+        if course.path_bucket:
+            return course.path_bucket
+
         department_count = storage.count(Department)
         course_departments_count = len(course.departments)
 
@@ -250,33 +256,36 @@ class FileManager:
                 ),
             )
 
-        file_path: str = ""
-
         # course offered by all departments.
         if course_departments_count == department_count:
-            file_path = (
-                f"temp/{course.level.level_name}/{semester}/general/"
-                f"{course.course_code.upper()}/{new_filename}"
-            )
+            path_bucket = "general"
         # course shared by some departments.
-        elif (
-            course_departments_count > 1
-            and course_departments_count < department_count  # type: ignore
-        ):
-            file_path = (
-                f"temp/{course.level.level_name}/{semester}/shared/"
-                f"{course.course_code.upper()}/{new_filename}"
-            )
+        elif course_departments_count > 1:
+            path_bucket = "shared"
         # course offered by exactly one department.
-        elif course_departments_count == 1:
+        else:
             department: Department = course.departments[0]
-            dept_name = department.dept_name.replace(" ", "-")
-            file_path = (
-                f"temp/{course.level.level_name}/{semester}/{dept_name}"
-                f"/{course.course_code.upper()}/{new_filename}"
-            )
+            path_bucket = department.dept_name.replace(" ", "-")
 
-        return file_path
+        course.path_bucket = path_bucket
+        return path_bucket
+
+    def generate_temp_s3_filepath(
+        self,
+        new_filename: str,
+        course: Course,
+    ) -> str:
+        """
+        Returns a temporary file path that will be added to
+        temporary s3 bucket awaiting approval of an admin.
+        """
+        semester = course.semester.value + "-semester"
+        path_bucket = self.get_path_bucket(course)
+
+        return (
+            f"temp/{course.level.level_name}/{semester}/{path_bucket}/"
+            f"{course.course_code.upper()}/{new_filename}"
+        )
 
     def generate_permanent_s3_filepath(
         self,
@@ -329,6 +338,34 @@ class FileManager:
         return file_data
 
 
+def start_s3_timer(context: dict[str, Any], **kwargs: Any) -> None:
+    """
+    Remember when an S3 API call started.
+    """
+    context["metrics_start_time"] = time.perf_counter()
+
+
+def record_s3_call(
+    event_name: str, context: dict[str, Any], **kwargs: Any
+) -> None:
+    """
+    Record the latency of a finished S3 API call and count it
+    as failed when S3 answered with an error status.
+    """
+    operation = event_name.split(".")[-1]
+    start_time = context.pop("metrics_start_time", None)
+    if start_time is not None:
+        metrics.observe(
+            "s3_request_duration_seconds",
+            time.perf_counter() - start_time,
+            operation=operation,
+        )
+
+    http_response = kwargs.get("http_response")
+    if http_response is None or http_response.status_code >= 300:
+        metrics.inc("s3_request_errors_total", operation=operation)
+
+
 class FileUpload:
     """ """
 
@@ -339,6 +376,9 @@ class FileUpload:
         region_name=AWS_REGION,
         config=Config(signature_version="s3v4"),
     )
+    s3.meta.events.register("before-call.s3", start_s3_timer)
+    s3.meta.events.register("after-call.s3", record_s3_call)
+    s3.meta.events.register("after-call-error.s3", record_s3_call)
 
     def get_file_and_metadata(self) -> dict[str, Any]:
         """
@@ -379,58 +419,53 @@ class FileUpload:
         try:
             head_bytes = file_obj.stream.read(2048)
             mime_type = magic.from_buffer(head_bytes, mime=True)
+            file_obj.stream.seek(0, 2)
+            size = file_obj.stream.tell()
             file_obj.stream.seek(0)
 
+            start_time = time.perf_counter()
             self.s3.upload_fileobj(
                 file_obj.stream,
                 cast(str, AWS_S3_BUCKET),
                 temp_file_path,
                 ExtraArgs={"ContentType": mime_type},
             )
+            metrics.inc("upload_bytes_total", size)
+            metrics.inc(
+                "upload_seconds_total", time.perf_counter() - start_time
+            )
 
         except Exception as e:
             logger.error(e)
             raise
             # abort(500)
 
-    def upload_file_to_s3_perm(self, temp_file_path: str) -> str | None:
+    def copy_file_to_s3_perm(self, temp_file_path: str) -> str:
         """
-        Uploads file to permanent s3 bucket.
+        Copies file to permanent s3 bucket and returns its new path.
+        The temporary file is left for the caller to delete.
         """
         file_manager = FileManager()
         perm_file_path = file_manager.generate_permanent_s3_filepath(
             temp_file_path
         )
 
+        aws_s3_bucket = cast(str, AWS_S3_BUCKET)
+        copy_source: CopySourceTypeDef = {
+            "Bucket": aws_s3_bucket,
+            "Key": temp_file_path,
+        }
         try:
-            aws_s3_bucket = cast(str, AWS_S3_BUCKET)
-            copy_source: CopySourceTypeDef = {
-                "Bucket": aws_s3_bucket,
-                "Key": temp_file_path,
-            }
             self.s3.copy_object(
                 Bucket=aws_s3_bucket,
                 CopySource=copy_source,
                 Key=perm_file_path,
                 MetadataDirective="COPY",
             )
-
-            copied_file = self.s3.head_object(
-                Bucket=aws_s3_bucket,
-                Key=perm_file_path
-            )
-            if not copied_file or "ContentLength" not in copied_file:
-                raise Exception("Copied file not found or incomplete")
-
-            self.s3.delete_object(Bucket=aws_s3_bucket, Key=temp_file_path)
-            logger.info(f"Moved file successfully.")
-            return perm_file_path
-        except ClientError as e:
-            logger.error(f"AWS ClientError while moving file: {e}")
-            return
         except Exception as e:
-            logger.error(f"Failed to move file: {e}")
-            return
+            logger.error(f"Failed to copy file: {e}")
+            raise
+        return perm_file_path
 
     def delete_file(self, file_path: str):
         """
@@ -442,3 +477,29 @@ class FileUpload:
         except Exception as e:
             logger.error(f"Failed to delete file: {e}")
             raise
+
+    def delete_files(self, file_paths: list[str]) -> dict[str, str]:
+        """
+        Deletes files from s3 bucket, up to 1000 per request.
+        Returns the error of each file that could not be deleted.
+        """
+        aws_s3_bucket = cast(str, AWS_S3_BUCKET)
+        errors: dict[str, str] = {}
+        for start in range(0, len(file_paths), 1000):
+            chunk = file_paths[start:start + 1000]
+            try:
+                response = self.s3.delete_objects(
+                    Bucket=aws_s3_bucket,
+                    Delete={
+                        "Objects": [{"Key": path} for path in chunk],
+                        "Quiet": True,
+                    },
+                )
+            except Exception as e:
+                logger.error(f"Failed to delete files: {e}")
+                errors.update((path, str(e)) for path in chunk)
+                continue
+
+            for error in response.get("Errors", []):
+                errors[error.get("Key", "")] = error.get("Message", "")
+        return errors
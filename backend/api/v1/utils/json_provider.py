@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Serializes JSON responses with orjson when it is installed.
+
+orjson encodes datetimes, enums and UUIDs natively, so model dicts can
+hold them as they are, and writes bytes directly instead of building
+a str first. Without orjson, or for values it cannot encode (such as
+integers beyond 64 bits), the stdlib encoder is used with the same
+conversions, so the output does not depend on which one ran.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+from typing import Any
+from uuid import UUID
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def default(obj: Any) -> Any:
+    """
+    Convert the values the JSON encoders do not handle natively.
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding with orjson, falling back on the
+    stdlib json module.
+    """
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        """Serialize obj as UTF-8 JSON bytes."""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=default, option=option)
+            except orjson.JSONEncodeError as e:
+                logger.debug(f"orjson could not encode, using json: {e}")
+
+        return json.dumps(
+            obj,
+            default=default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        ).encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize obj as a JSON string. Arguments for json.dumps
+        are honoured by the stdlib encoder.
+        """
+        if kwargs:
+            kwargs.setdefault("default", default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """Deserialize JSON from a string or bytes."""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serialize the arguments, as jsonify does, into a JSON response.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (
+            self.compact is None and self._app.debug
+        )
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype
+        )
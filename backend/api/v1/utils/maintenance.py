@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""
+Periodically removes expired sessions and revoked tokens and
+reactivates users whose suspensions have expired.
+
+Each task runs batched, set-based statements, so the login path does
+not have to clean up after itself and the tables stay small.
+
+It runs in every API process unless MAINTENANCE_INTERVAL is 0, or on
+its own:
+
+    python -m api.v1.utils.maintenance            # every MAINTENANCE_INTERVAL
+    python -m api.v1.utils.maintenance --once     # e.g. from cron
+
+Environment variables:
+    MAINTENANCE_INTERVAL: seconds between runs. 0 disables the worker
+        thread in the API process (default 300).
+    MAINTENANCE_BATCH_SIZE: rows per statement (default 1000).
+"""
+
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+import argparse
+import logging
+import os
+import threading
+import time
+
+from api.v1.utils.metrics import metrics
+from models import storage
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+def run_maintenance(batch_size: int | None = None) -> dict[str, int]:
+    """
+    Runs every maintenance task once.
+    Returns the number of rows processed by each task.
+    """
+    batch_size = batch_size or int(os.getenv("MAINTENANCE_BATCH_SIZE", 1000))
+    now = datetime.now()
+    session_duration = int(os.getenv("SESSION_DURATION", 0))
+
+    tasks = [
+        (
+            "expired_sessions",
+            storage.delete_expired_sessions,
+            now - timedelta(seconds=session_duration),
+        ),
+        (
+            "expired_revoked_tokens",
+            storage.delete_expired_revoked_tokens,
+            now,
+        ),
+        (
+            "expired_suspensions",
+            storage.reactivate_suspended_users,
+            now,
+        ),
+    ]
+
+    processed: dict[str, int] = {}
+    try:
+        for task, run, cutoff in tasks:
+            start_time = time.perf_counter()
+            try:
+                processed[task] = run(cutoff, batch_size)
+            except Exception as e:
+                logger.error(f"Maintenance task {task} failed: {e}")
+                metrics.inc("maintenance_errors_total", task=task)
+                continue
+
+            metrics.inc(
+                "maintenance_rows_total", processed[task], task=task
+            )
+            metrics.observe(
+                "maintenance_duration_seconds",
+                time.perf_counter() - start_time,
+                task=task,
+            )
+            if processed[task]:
+                logger.info(
+                    f"Maintenance task {task} processed"
+                    f" {processed[task]} rows"
+                )
+    finally:
+        storage.close()
+
+    return processed
+
+
+class MaintenanceWorker(threading.Thread):
+    """
+    Runs the maintenance tasks every interval seconds.
+    """
+
+    def __init__(
+        self, interval: float, batch_size: int | None = None
+    ) -> None:
+        """Initialize the worker thread."""
+        super().__init__(name="maintenance-worker", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.__stopped = threading.Event()
+
+    def run(self) -> None:
+        """Run the tasks until stopped."""
+        while not self.__stopped.wait(self.interval):
+            run_maintenance(self.batch_size)
+            metrics.maybe_flush()
+
+    def stop(self) -> None:
+        """Stop the worker after the current run."""
+        self.__stopped.set()
+
+
+maintenance_worker: MaintenanceWorker | None = None
+maintenance_lock = threading.Lock()
+
+
+def start_maintenance_worker() -> MaintenanceWorker | None:
+    """
+    Starts the maintenance worker of this process, unless
+    MAINTENANCE_INTERVAL is 0 or it is running already.
+    """
+    global maintenance_worker
+
+    interval = float(os.getenv("MAINTENANCE_INTERVAL", 300))
+    if interval <= 0:
+        return
+
+    with maintenance_lock:
+        if maintenance_worker is None or not maintenance_worker.is_alive():
+            maintenance_worker = MaintenanceWorker(interval)
+            maintenance_worker.start()
+        return maintenance_worker
+
+
+def main() -> None:
+    """Runs the maintenance tasks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--once", action="store_true", help="run the tasks once and exit"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("MAINTENANCE_INTERVAL", 300)) or 300,
+        help="seconds between runs (default MAINTENANCE_INTERVAL or 300)",
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        processed = run_maintenance(args.batch_size)
+        logger.info(
+            ", ".join(f"{task}: {rows}" for task, rows in processed.items())
+        )
+        metrics.flush()
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
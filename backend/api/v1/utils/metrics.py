@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+
+"""
+Collects application metrics and renders them in the Prometheus
+text exposition format.
+
+Every thread writes to its own shard, so recording a metric on the
+request path never takes a lock. Shards are only merged when the
+metrics are scraped.
+
+With several gunicorn workers, set METRICS_DIR to a directory shared by
+the workers. Each worker then periodically writes its merged snapshot
+there and a scrape served by any worker includes all of them.
+"""
+
+from dotenv import load_dotenv
+from typing import Any, Callable, Iterable
+import json
+import logging
+import os
+import threading
+import time
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+Labels = tuple[tuple[str, str], ...]
+MetricKey = tuple[str, Labels]
+Shard = tuple[dict[MetricKey, float], dict[MetricKey, list[float]]]
+GaugeCallback = Callable[[], Iterable[tuple[str, dict[str, Any], float]]]
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+METRICS_STALE_AFTER = float(os.getenv("METRICS_STALE_AFTER", 300))
+
+HELP_TEXT: dict[str, tuple[str, str]] = {
+    "http_requests_total": (
+        "counter", "HTTP requests by route, method and status."
+    ),
+    "http_request_duration_seconds": (
+        "histogram", "HTTP request latency by route and method."
+    ),
+    "http_request_db_queries_total": (
+        "counter", "SQL statements executed by route."
+    ),
+    "http_request_db_seconds_total": (
+        "counter", "Time spent executing SQL statements by route."
+    ),
+    "s3_request_duration_seconds": (
+        "histogram", "Latency of S3 calls by operation."
+    ),
+    "s3_request_errors_total": (
+        "counter", "Failed S3 calls by operation."
+    ),
+    "cache_requests_total": (
+        "counter", "Cache lookups by cache and result (hit or miss)."
+    ),
+    "login_rate_limited_total": (
+        "counter", "Login attempts rejected by the rate limiter by limit."
+    ),
+    "compression_input_bytes_total": (
+        "counter", "Bytes of response bodies compressed by encoding."
+    ),
+    "compression_output_bytes_total": (
+        "counter", "Bytes of compressed response bodies by encoding."
+    ),
+    "compression_seconds_total": (
+        "counter", "CPU time spent compressing responses by encoding."
+    ),
+    "upload_bytes_total": (
+        "counter", "Bytes uploaded to S3. rate() gives bytes per second."
+    ),
+    "upload_seconds_total": (
+        "counter", "Time spent uploading files to S3."
+    ),
+    "maintenance_rows_total": (
+        "counter", "Rows processed by maintenance tasks by task."
+    ),
+    "maintenance_duration_seconds": (
+        "histogram", "Duration of maintenance tasks by task."
+    ),
+    "maintenance_errors_total": (
+        "counter", "Failed maintenance task runs by task."
+    ),
+    "outbox_events_total": (
+        "counter", "Outbox events dispatched by kind and result."
+    ),
+    "outbox_dispatch_duration_seconds": (
+        "histogram", "Duration of outbox handler calls by kind."
+    ),
+    "outbox_errors_total": (
+        "counter", "Outbox batches rolled back."
+    ),
+    "events_published_total": (
+        "counter", "Events published to admins by event."
+    ),
+    "events_dropped_subscribers_total": (
+        "counter", "Event subscribers dropped for falling behind."
+    ),
+    "events_relay_errors_total": (
+        "counter", "Failures relaying events between workers by relay."
+    ),
+    "events_subscribers": (
+        "gauge", "Event streams open in this process."
+    ),
+    "db_pool_connections": (
+        "gauge", "Database pool connections by state."
+    ),
+}
+
+
+def to_labels(labels: dict[str, Any]) -> Labels:
+    """Return labels as a hashable, sorted tuple."""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """
+    Lock-free, per-thread metric aggregation.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize an empty registry."""
+        self.buckets = buckets
+        self.__local = threading.local()
+        self.__shards: list[tuple[threading.Thread, Shard]] = []
+        self.__retired: Shard = ({}, {})
+        self.__shards_lock = threading.Lock()
+        self.__gauge_callbacks: list[GaugeCallback] = []
+        self.__last_flush = 0.0
+
+    def __shard(self) -> Shard:
+        """
+        Return the counters and histograms of the current thread.
+        The lock is only taken the first time a thread records a metric.
+        """
+        shard = getattr(self.__local, "shard", None)
+        if shard is None:
+            shard = ({}, {})
+            with self.__shards_lock:
+                self.__retire_dead_shards()
+                self.__shards.append((threading.current_thread(), shard))
+            self.__local.shard = shard
+        return shard
+
+    def __retire_dead_shards(self) -> None:
+        """
+        Fold the shards of finished threads into one retired shard so
+        servers that start a thread per request do not accumulate them.
+        Must be called with the shards lock held.
+        """
+        alive: list[tuple[threading.Thread, Shard]] = []
+        for thread, shard in self.__shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self.__merge(self.__retired, shard)
+        self.__shards = alive
+
+    def __merge(self, target: Shard, source: Shard) -> None:
+        """Add the values of source to target."""
+        target_counters, target_histograms = target
+        source_counters, source_histograms = source
+
+        for key, value in self.__copy(source_counters).items():
+            target_counters[key] = target_counters.get(key, 0.0) + value
+        for key, values in self.__copy(source_histograms).items():
+            merged = target_histograms.setdefault(key, [0.0] * len(values))
+            for i, value in enumerate(list(values)):
+                merged[i] += value
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Increase a counter."""
+        counters = self.__shard()[0]
+        key = (name, to_labels(labels))
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Record value in a histogram. Bucket counts are stored
+        non-cumulative and summed up when rendered.
+        """
+        histograms = self.__shard()[1]
+        key = (name, to_labels(labels))
+        histogram = histograms.get(key)
+        if histogram is None:
+            # one slot per bucket, +Inf, sum and count
+            histogram = histograms[key] = [0.0] * (len(self.buckets) + 3)
+
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        histogram[index] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def cache_hit(self, cache: str) -> None:
+        """Count a cache hit."""
+        self.inc("cache_requests_total", cache=cache, result="hit")
+
+    def cache_miss(self, cache: str) -> None:
+        """Count a cache miss."""
+        self.inc("cache_requests_total", cache=cache, result="miss")
+
+    def register_gauges(self, callback: GaugeCallback) -> None:
+        """
+        Register a callback returning (name, labels, value) gauges
+        that are read when metrics are scraped.
+        """
+        self.__gauge_callbacks.append(callback)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Merge all thread shards of this process into a snapshot.
+        """
+        merged: Shard = ({}, {})
+
+        with self.__shards_lock:
+            self.__retire_dead_shards()
+            self.__merge(merged, self.__retired)
+            shards = [shard for _, shard in self.__shards]
+
+        for shard in shards:
+            self.__merge(merged, shard)
+        counters, histograms = merged
+
+        gauges: list[tuple[str, Labels, float]] = []
+        for callback in self.__gauge_callbacks:
+            try:
+                for name, labels, value in callback():
+                    labels = dict(labels, pid=os.getpid())
+                    gauges.append((name, to_labels(labels), float(value)))
+            except Exception as e:
+                logger.error(f"Metrics gauge callback failed: {e}")
+
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "counters": [[n, list(lb), v] for (n, lb), v in counters.items()],
+            "histograms": [
+                [n, list(lb), v] for (n, lb), v in histograms.items()
+            ],
+            "gauges": [[n, list(lb), v] for n, lb, v in gauges],
+        }
+
+    def __copy(self, data: dict[MetricKey, Any]) -> dict[MetricKey, Any]:
+        """
+        Copy a shard owned by another thread. The owner may add a key
+        while the copy runs, in which case the copy is retried.
+        """
+        while True:
+            try:
+                return dict(data)
+            except RuntimeError:
+                continue
+
+    def maybe_flush(self) -> None:
+        """
+        Write this process' snapshot to METRICS_DIR at most once every
+        METRICS_FLUSH_INTERVAL seconds.
+        """
+        if not METRICS_DIR:
+            return
+
+        now = time.monotonic()
+        if now - self.__last_flush < METRICS_FLUSH_INTERVAL:
+            return
+        self.__last_flush = now
+        self.flush()
+
+    def flush(self) -> None:
+        """Write this process' snapshot to METRICS_DIR."""
+        if not METRICS_DIR:
+            return
+
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f"metrics_{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics snapshot: {e}")
+
+    def collect(self) -> list[dict[str, Any]]:
+        """
+        Return the snapshots of this process and, when METRICS_DIR
+        is set, of the other workers.
+        """
+        snapshots = [self.snapshot()]
+        if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+            return snapshots
+
+        own_file = f"metrics_{os.getpid()}.json"
+        for filename in os.listdir(METRICS_DIR):
+            if not filename.endswith(".json") or filename == own_file:
+                continue
+            path = os.path.join(METRICS_DIR, filename)
+            try:
+                if time.time() - os.path.getmtime(path) > METRICS_STALE_AFTER:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read metrics snapshot {path}: {e}")
+
+        return snapshots
+
+    def render(self) -> str:
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        counters: dict[MetricKey, float] = {}
+        histograms: dict[MetricKey, list[float]] = {}
+        gauges: dict[MetricKey, float] = {}
+
+        for snapshot in self.collect():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0.0) + value
+            for name, labels, values in snapshot["histograms"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                merged = histograms.setdefault(key, [0.0] * len(values))
+                for i, value in enumerate(values):
+                    merged[i] += value
+            for name, labels, value in snapshot["gauges"]:
+                gauges[(name, tuple(tuple(label) for label in labels))] = value
+
+        lines: list[str] = []
+        names = sorted(
+            {name for name, _ in counters}
+            | {name for name, _ in histograms}
+            | {name for name, _ in gauges}
+        )
+        for name in names:
+            metric_type, help_text = HELP_TEXT.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{name}{self.__format(labels)} {value}")
+
+            for (key_name, labels), value in sorted(gauges.items()):
+                if key_name == name:
+                    lines.append(f"{name}{self.__format(labels)} {value}")
+
+            for (key_name, labels), values in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                cumulative = 0.0
+                bounds = [str(b) for b in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, values):
+                    cumulative += count
+                    bucket_labels = labels + (("le", bound),)
+                    lines.append(
+                        f"{name}_bucket{self.__format(bucket_labels)}"
+                        f" {cumulative}"
+                    )
+                lines.append(f"{name}_sum{self.__format(labels)} {values[-2]}")
+                lines.append(
+                    f"{name}_count{self.__format(labels)} {values[-1]}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def __format(self, labels: Labels) -> str:
+        """Format labels as {key="value",...}."""
+        if not labels:
+            return ""
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace('"', '\\"'))
+            for key, value in labels
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+metrics = Metrics()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Implements notifications sent to admins.
+
+Every admin receives every notification. Rather than counting unread
+notifications through notification_reads on each request, every admin
+keeps an unread_notifications counter that is incremented for all
+admins with one UPDATE when a notification is created, and decremented
+when the admin marks notifications read.
+
+Notifications are recorded in the outbox with the change causing them,
+see api.v1.utils.outbox.record_notification. Connected admins are also
+sent the notification as an event, see api.v1.utils.events.
+"""
+
+from datetime import datetime
+from typing import Any
+import logging
+
+from api.v1.utils.events import event_broker
+from models.notification import Notification
+
+
+logger = logging.getLogger(__name__)
+
+
+def publish_notification(
+    notification: Notification,
+    event: str,
+    data: dict[str, Any] | None = None,
+) -> None:
+    """
+    Publishes a committed notification as event with data
+    to the connected admins.
+    """
+    event_broker.publish(event, {
+        "notification_id": notification.id,
+        "message": notification.message,
+        **(data or {}),
+    })
+
+
+def get_notification_dict(
+    notification: Notification, read_at: datetime | None
+) -> dict[str, Any]:
+    """
+    Returns a json serializable dict of the notification
+    as seen by an admin.
+    """
+    notification_dict = notification.to_dict()
+    notification_dict["read"] = read_at is not None
+    notification_dict["read_at"] = read_at
+    notification_dict.pop("__class__", None)
+    return notification_dict
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+
+"""
+Carries out the side effects recorded in the outbox_events table.
+
+Requests record side effects, such as notifying admins or moving an
+approved file to the permanent S3 prefix, as OutboxEvent rows in the
+transaction of the change causing them. They commit or roll back with
+it, and the request does not wait for them. The dispatcher carries them
+out in batches, one handler call per kind, and deletes the rows in the
+transaction of the database changes the handlers make. Failed events,
+including all events of a handler that raises, are retried with
+exponential backoff up to OUTBOX_MAX_ATTEMPTS times, then kept with
+their last error for inspection.
+
+Handlers must be idempotent, since an event is carried out again when
+the dispatcher fails to commit after its S3 calls.
+
+The dispatcher runs in a thread of the API process, woken as soon as a
+request records events, or on its own:
+
+    python -m api.v1.utils.outbox            # every OUTBOX_INTERVAL
+    python -m api.v1.utils.outbox --once     # e.g. from cron
+
+Environment variables:
+    OUTBOX_INTERVAL: seconds between runs when not woken. 0 disables
+        the dispatcher thread in the API process (default 5).
+    OUTBOX_BATCH_SIZE: events per transaction (default 100).
+    OUTBOX_MAX_ATTEMPTS: attempts before an event is given up
+        (default 10).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from functools import partial
+from typing import Any, Callable, Sequence
+import argparse
+import logging
+import os
+import threading
+import time
+
+from api.v1.utils.file_utils import FileManager, FileUpload
+from api.v1.utils.metrics import metrics
+from api.v1.utils.notifications import publish_notification
+from models import storage
+from models.file import File
+from models.notification import Notification
+from models.outbox_event import OutboxEvent
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+MAX_RETRY_DELAY = 3600
+
+NOTIFY = "notify"
+S3_MOVE = "s3_move"
+S3_DELETE = "s3_delete"
+
+Callback = Callable[[], None]
+Handler = Callable[[Sequence[OutboxEvent], list[Callback]], dict[str, str]]
+
+
+def record(kind: str, **payload: Any) -> OutboxEvent:
+    """
+    Records a side effect in the current transaction.
+    Call wake_outbox_dispatcher once it is committed.
+    """
+    return OutboxEvent(kind=kind, payload=payload)
+
+
+def record_notification(
+    message: str, event: str, data: dict[str, Any] | None = None
+) -> OutboxEvent:
+    """
+    Records a notification of all admins, published as event with data
+    to the connected admins.
+    """
+    return record(NOTIFY, message=message, event=event, data=data or {})
+
+
+def send_notifications(
+    events: Sequence[OutboxEvent], on_commit: list[Callback]
+) -> dict[str, str]:
+    """
+    Creates the notifications, counting them unread for every admin
+    with one UPDATE, and publishes them once committed.
+    """
+    for event in events:
+        notification = Notification(message=event.payload["message"])
+        on_commit.append(partial(
+            publish_notification,
+            notification,
+            event.payload["event"],
+            event.payload.get("data"),
+        ))
+    storage.add_unread_notification(len(events))
+    return {}
+
+
+def move_files(
+    events: Sequence[OutboxEvent], on_commit: list[Callback]
+) -> dict[str, str]:
+    """
+    Copies approved files to the permanent S3 prefix and records the
+    deletion of their temporary copies.
+
+    The files are locked until the batch commits, so a file rejected or
+    deleted meanwhile waits for its move, and is then deleted from both
+    paths. A file already gone may have been copied by an attempt that
+    failed to commit, so the deletion of its permanent path is recorded.
+    """
+    files = storage.prefetch(
+        File, (event.payload["file_id"] for event in events), lock=True
+    )
+    file_manager = FileManager()
+    uploader = FileUpload()
+    failures: dict[str, str] = {}
+    moved: list[str] = []
+    orphaned: list[str] = []
+
+    for event in events:
+        file = files.get(event.payload["file_id"])
+        if file is not None and file.permanent_filepath:
+            continue
+        # deleted or no longer approved
+        if file is None or file.status != "approved":
+            temp_filepath = event.payload.get("temp_filepath")
+            if temp_filepath:
+                orphaned.append(
+                    file_manager.generate_permanent_s3_filepath(
+                        temp_filepath
+                    )
+                )
+            continue
+        try:
+            file.permanent_filepath = uploader.copy_file_to_s3_perm(
+                file.temp_filepath
+            )
+        except Exception as e:
+            failures[event.id] = str(e)
+            continue
+        moved.append(file.temp_filepath)
+
+    if moved or orphaned:
+        record(S3_DELETE, paths=moved + orphaned)
+    return failures
+
+
+def delete_files(
+    events: Sequence[OutboxEvent], on_commit: list[Callback]
+) -> dict[str, str]:
+    """
+    Deletes the files of all events from S3 with batched requests.
+    """
+    paths = sorted({
+        path for event in events for path in event.payload["paths"]
+    })
+    errors = FileUpload().delete_files(paths)
+
+    failures: dict[str, str] = {}
+    for event in events:
+        event_errors = [
+            f"{path}: {errors[path]}"
+            for path in event.payload["paths"] if path in errors
+        ]
+        if event_errors:
+            failures[event.id] = "; ".join(event_errors)
+    return failures
+
+
+HANDLERS: dict[str, Handler] = {
+    NOTIFY: send_notifications,
+    S3_MOVE: move_files,
+    S3_DELETE: delete_files,
+}
+
+
+def dispatch_outbox(
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+) -> int:
+    """
+    Carries out one batch of due events in one transaction.
+    Returns the number of events claimed.
+    """
+    now = datetime.now()
+    on_commit: list[Callback] = []
+    try:
+        events = storage.claim_outbox_events(now, max_attempts, batch_size)
+        events_by_kind: defaultdict[str, list[OutboxEvent]] = defaultdict(
+            list
+        )
+        for event in events:
+            events_by_kind[event.kind].append(event)
+
+        failures: dict[str, str] = {}
+        for kind, kind_events in events_by_kind.items():
+            handler = HANDLERS.get(kind)
+            if handler is None:
+                failures.update(
+                    (event.id, f"Unknown kind: {kind}")
+                    for event in kind_events
+                )
+                continue
+            start_time = time.perf_counter()
+            callbacks: list[Callback] = []
+            try:
+                with storage.savepoint():
+                    failures.update(handler(kind_events, callbacks))
+            except Exception as e:
+                # the handler's changes are undone, and its events
+                # retried with backoff like the ones it reports failed
+                error = f"{type(e).__name__}: {e}"
+                failures.update((event.id, error) for event in kind_events)
+            else:
+                on_commit.extend(callbacks)
+            metrics.observe(
+                "outbox_dispatch_duration_seconds",
+                time.perf_counter() - start_time,
+                kind=kind,
+            )
+
+        for event in events:
+            error = failures.get(event.id)
+            if error is None:
+                storage.delete(event)
+                metrics.inc(
+                    "outbox_events_total", kind=event.kind, result="done"
+                )
+                continue
+
+            event.attempts += 1
+            event.last_error = error[:1024]
+            event.available_at = now + timedelta(
+                seconds=min(2 ** event.attempts, MAX_RETRY_DELAY)
+            )
+            metrics.inc(
+                "outbox_events_total", kind=event.kind, result="failed"
+            )
+            logger.error(
+                f"Outbox event {event.id} ({event.kind}) failed,"
+                f" attempt {event.attempts}: {error}"
+            )
+        storage.save()
+    except Exception as e:
+        # storage failed, the whole batch is claimed again on the next run
+        storage.rollback()
+        logger.error(f"Outbox dispatch failed: {e}")
+        metrics.inc("outbox_errors_total")
+        return 0
+    finally:
+        storage.close()
+
+    for callback in on_commit:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Outbox callback failed: {e}")
+    return len(events)
+
+
+def run_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Dispatches batches until no due events are left.
+    Returns the number of events claimed.
+    """
+    total = 0
+    while True:
+        claimed = dispatch_outbox(batch_size)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+class OutboxDispatcher(threading.Thread):
+    """
+    Dispatches the outbox every interval seconds, or when woken.
+    """
+
+    def __init__(
+        self, interval: float, batch_size: int = OUTBOX_BATCH_SIZE
+    ) -> None:
+        """Initialize the dispatcher thread."""
+        super().__init__(name="outbox-dispatcher", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.__woken = threading.Event()
+        self.__stopped = threading.Event()
+
+    def run(self) -> None:
+        """Dispatch until stopped."""
+        while not self.__stopped.is_set():
+            self.__woken.wait(self.interval)
+            self.__woken.clear()
+            if self.__stopped.is_set():
+                return
+            run_outbox(self.batch_size)
+            metrics.maybe_flush()
+
+    def wake(self) -> None:
+        """Dispatch now rather than at the next interval."""
+        self.__woken.set()
+
+    def stop(self) -> None:
+        """Stop the dispatcher after the current run."""
+        self.__stopped.set()
+        self.__woken.set()
+
+
+outbox_dispatcher: OutboxDispatcher | None = None
+outbox_lock = threading.Lock()
+
+
+def start_outbox_dispatcher() -> OutboxDispatcher | None:
+    """
+    Starts the outbox dispatcher of this process unless
+    OUTBOX_INTERVAL is 0 or it is running already.
+    """
+    global outbox_dispatcher
+
+    interval = float(os.getenv("OUTBOX_INTERVAL", 5))
+    if interval <= 0:
+        return
+
+    with outbox_lock:
+        if outbox_dispatcher is None or not outbox_dispatcher.is_alive():
+            outbox_dispatcher = OutboxDispatcher(interval)
+            outbox_dispatcher.start()
+        return outbox_dispatcher
+
+
+def wake_outbox_dispatcher() -> None:
+    """
+    Has the dispatcher of this process carry out the events just
+    committed. Without a dispatcher thread, they wait for the next run
+    of the standalone one.
+    """
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.wake()
+
+
+def main() -> None:
+    """Runs the dispatcher from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--once", action="store_true", help="dispatch once and exit"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("OUTBOX_INTERVAL", 5)) or 5,
+        help="seconds between runs (default OUTBOX_INTERVAL or 5)",
+    )
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        dispatched = run_outbox(args.batch_size)
+        if dispatched:
+            logger.info(f"Dispatched {dispatched} outbox events")
+        metrics.flush()
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
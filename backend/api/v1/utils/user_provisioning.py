@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+"""
+Implements bulk registration of users, e.g. a whole intake of students.
+
+All records are validated first. Emails already taken, and the
+departments and levels referenced, are each checked with one query.
+Passwords are then hashed across the bcrypt process pool, and the users
+are inserted in chunks of BULK_INSERT_CHUNK_SIZE (default 25), one
+executemany and commit per chunk. A chunk conflicting with a concurrent
+registration fails on its own, the other chunks are still created.
+
+At most MAX_BULK_USERS (default 100) users are registered per request.
+At bcrypt cost 12 a hash takes about 250ms, so a full request hashes
+for 25s spread across the processes of the bcrypt pool. Larger intakes
+are sent in several requests.
+"""
+
+from dotenv import load_dotenv
+from flask import abort
+from sqlalchemy.exc import IntegrityError
+from typing import Any
+import logging
+import os
+
+from api.v1.auth.password_hashing import password_hasher
+from api.v1.auth.rate_limit import login_rate_limiter
+from api.v1.utils.data_validations import UserCreate, validate_many
+from models import storage
+from models.admin import Admin
+from models.department import Department
+from models.level import Level
+from models.user import User
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+MAX_BULK_USERS = int(os.getenv("MAX_BULK_USERS", 100))
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", 25))
+
+
+class BulkUserRegistration:
+    """
+    Registers many users in one request and reports a result per record.
+    """
+
+    def __init__(self, records: Any) -> None:
+        """Initialize the registration of the given records."""
+        if not isinstance(records, list) or not records:
+            abort(400, description="Expected a non-empty list of users.")
+        if len(records) > MAX_BULK_USERS:
+            abort(
+                400,
+                description=(
+                    f"Register at most {MAX_BULK_USERS} users at once."
+                ),
+            )
+        self.records = records
+        self.results: list[dict[str, Any]] = [
+            {"index": index} for index in range(len(records))
+        ]
+
+    def fail(self, index: int, errors: list[Any]) -> None:
+        """Mark a record as not registered."""
+        self.results[index]["status"] = "error"
+        self.results[index]["errors"] = errors
+
+    def validate(self) -> dict[int, dict[str, Any]]:
+        """
+        Returns the valid records by index.
+        """
+        valid, errors = validate_many(UserCreate, self.records)
+        for index, record_errors in errors.items():
+            record = self.records[index]
+            if isinstance(record, dict):
+                self.results[index]["email"] = record.get("email")
+            self.fail(index, record_errors)
+        for index, user_data in valid.items():
+            self.results[index]["email"] = user_data["email"]
+
+        taken_emails = {
+            user.email
+            for user in storage.get_by_values(
+                User, email=[data["email"] for data in valid.values()]
+            )
+        }
+        department_ids = {
+            department.id
+            for department in storage.get_by_values(
+                Department,
+                id=[
+                    data["department_id"] for data in valid.values()
+                    if data["department_id"]
+                ],
+            )
+        }
+        level_ids = {
+            level.id
+            for level in storage.get_by_values(
+                Level,
+                id=[
+                    data["level_id"] for data in valid.values()
+                    if data["level_id"]
+                ],
+            )
+        }
+
+        for index, data in list(valid.items()):
+            errors: list[str] = []
+            if data["email"] in taken_emails:
+                errors.append("Email already registered.")
+            if data["department_id"] and (
+                data["department_id"] not in department_ids
+            ):
+                errors.append("Department does not exist.")
+            if data["level_id"] and data["level_id"] not in level_ids:
+                errors.append("Level does not exist.")
+
+            if errors:
+                self.fail(index, errors)
+                del valid[index]
+            else:
+                # later records with the same email are duplicates
+                taken_emails.add(data["email"])
+
+        return valid
+
+    def insert_chunk(self, chunk: list[tuple[int, dict[str, Any]]]) -> None:
+        """
+        Inserts a chunk of users and their admin rows, and commits.
+        The whole chunk fails if another request registered one of
+        its emails meanwhile.
+        """
+        rows = [
+            {
+                "email": data["email"],
+                "password": data["password"],
+                "is_admin": bool(data["is_admin"]),
+                "department_id": data["department_id"],
+                "level_id": data["level_id"],
+            }
+            for _, data in chunk
+        ]
+        try:
+            rows = storage.bulk_insert(User, rows)
+            storage.bulk_insert(
+                Admin,
+                [{"user_id": row["id"]} for row in rows if row["is_admin"]],
+            )
+            storage.save()
+        except IntegrityError as e:
+            storage.rollback()
+            logger.error(f"Bulk user registration chunk failed: {e}")
+            for index, _ in chunk:
+                self.fail(index, ["Conflicts with an existing user."])
+            return
+
+        for (index, _), row in zip(chunk, rows):
+            self.results[index]["status"] = "created"
+            self.results[index]["id"] = row["id"]
+            login_rate_limiter.forget_unknown_email(row["email"])
+
+    def run(self) -> dict[str, Any]:
+        """
+        Registers the valid records.
+        Returns the number of users created and failed, and the result
+        of every record.
+        """
+        valid = self.validate()
+
+        hashes = password_hasher.generate_password_hashes(
+            data["password"] for data in valid.values()
+        )
+        for data, pw_hash in zip(valid.values(), hashes):
+            data["password"] = pw_hash
+
+        records = list(valid.items())
+        for start in range(0, len(records), BULK_INSERT_CHUNK_SIZE):
+            self.insert_chunk(records[start:start + BULK_INSERT_CHUNK_SIZE])
+
+        created = sum(
+            1 for result in self.results if result.get("status") == "created"
+        )
+        return {
+            "created": created,
+            "failed": len(self.results) - created,
+            "results": self.results,
+        }
@@ -5,16 +5,20 @@
 """
 
 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
 from datetime import datetime
-from flask import abort
+from flask import abort, request
 from psycopg2.errors import UniqueViolation
 from sqlalchemy.exc import IntegrityError
-from typing import Type, TypeVar
+from typing import Any, Iterator, NoReturn, Sequence, Type, TypeVar
+from werkzeug.exceptions import HTTPException
+import binascii
 import logging
 
 from models import storage
 from models.basemodel import BaseModel
-from models.user import User, UserWarning, UserSuspension
+from models.user import User, UserWarning
 from models.admin import Admin
 
 
@@ -22,15 +26,104 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
 
 
-def get_obj(cls: Type[T], id: str) -> T | None:
-    """ """
+def get_obj(cls: Type[T], id: str, load: Sequence[str] = ()) -> T | None:
+    """
+    Returns the object of cls with the given id. Relationships named in
+    load are fetched along with it (see storage.prefetch).
+    """
     try:
+        if load:
+            return storage.prefetch(cls, [id], *load).get(id)
         return storage.get_obj_by_id(cls, id)
     except Exception as e:
         logger.error(f"Database operation failed: {e}")
         abort(500)
 
 
+def get_date_filters() -> dict[str, str | None]:
+    """
+    Returns the creation date filters supported by list endpoints:
+    date, date_from, date_to and period (e.g. last_7d, this_week).
+    Aborts the request if one of them is malformed.
+    """
+    date_filters = {
+        "date_str": request.args.get("date"),
+        "date_from": request.args.get("date_from"),
+        "date_to": request.args.get("date_to"),
+        "period": request.args.get("period"),
+    }
+    try:
+        storage.get_date_range(**date_filters)
+    except ValueError as e:
+        abort(400, description=str(e))
+    return date_filters
+
+
+def encode_cursor(obj: Any) -> str:
+    """
+    Returns the opaque cursor of the page following obj, any object or
+    row with created_at and id, for keyset pagination.
+    """
+    key = f"{obj.created_at.isoformat()}|{obj.id}"
+    return urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Returns the (created_at, id) a cursor points after,
+    or aborts the request if the cursor is invalid.
+    """
+    try:
+        key = urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, obj_id = key.split("|", 1)
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, UnicodeError, binascii.Error):
+        abort(400, description="Invalid cursor.")
+
+
+def get_page_size(default: int, maximum: int) -> int:
+    """
+    Returns the page_size requested, default if none, capped at
+    maximum, or aborts the request if it is not a positive integer.
+    """
+    try:
+        page_size = int(request.args.get("page_size", default))
+    except ValueError:
+        abort(400, description="page_size must be a positive integer")
+    if page_size < 1:
+        abort(400, description="page_size must be a positive integer")
+    return min(page_size, maximum)
+
+
+def get_file_stats_dict(rows: Sequence[Any]) -> dict[str, Any]:
+    """
+    Returns a json serializable summary of file stats rows,
+    as returned by storage.get_file_stats.
+    """
+    stats: dict[str, Any] = {
+        "total_files": 0,
+        "total_size": 0,
+        "files_by_status": {},
+        "approved_files_by_type": {},
+        "approved_files_by_session": {},
+    }
+    for status, file_type, session, file_count, total_size in rows:
+        file_count, total_size = int(file_count), int(total_size)
+        stats["total_files"] += file_count
+        stats["total_size"] += total_size
+        by_status = stats["files_by_status"]
+        by_status[status] = by_status.get(status, 0) + file_count
+        if status != "approved":
+            continue
+
+        by_type = stats["approved_files_by_type"]
+        by_type[file_type] = by_type.get(file_type, 0) + file_count
+        if session:
+            by_session = stats["approved_files_by_session"]
+            by_session[session] = by_session.get(session, 0) + file_count
+    return stats
+
+
 class DatabaseOp:
     """ """
 
@@ -40,18 +133,36 @@ class DatabaseOp:
         """ """
         try:
             obj.save()
-        except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolation):
-                detail = e.orig.diag.message_detail
-                if detail:
-                    detail = detail.replace("Key ", "")
-                abort(409, description=detail)
-            else:
-                logger.error(f"Database operation failed: {e}")
-                abort(500)
         except Exception as e:
-            logger.error(f"Database operation failed: {e}")
-            abort(500)
+            self.abort_on_error(e)
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        """
+        Commits everything saved in the block at once, when it ends,
+        see storage.unit_of_work.
+        """
+        try:
+            with storage.unit_of_work():
+                yield
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.abort_on_error(e)
+
+    def abort_on_error(self, e: Exception) -> NoReturn:
+        """
+        Aborts with 409 for unique constraint violations, else 500.
+        """
+        if isinstance(e, IntegrityError) and isinstance(
+            e.orig, UniqueViolation
+        ):
+            detail = e.orig.diag.message_detail
+            if detail:
+                detail = detail.replace("Key ", "")
+            abort(409, description=detail)
+        logger.error(f"Database operation failed: {e}")
+        abort(500)
 
     def commit(self):
         """ """
@@ -74,62 +185,74 @@ class UserDisplineHandler:
     """ """
 
     SUSPENSION_INTERVAL = 3
+    SUSPENSION_DAYS = 7
     MAX_WARNINGS = 9
     TERMINATION_LIMIT = 3
     db = DatabaseOp()
 
-    def should_suspend_user(self, user: User) -> bool:
+    def should_suspend_user(self, warnings_count: int) -> bool:
         """ """
-        warnings = user.warnings_count
-
         return (
-            warnings % self.SUSPENSION_INTERVAL == 0
-            and warnings <= self.MAX_WARNINGS
+            warnings_count % self.SUSPENSION_INTERVAL == 0
+            and warnings_count <= self.MAX_WARNINGS
         )
 
-    def should_terminate_account(self, user: User) -> bool:
+    def should_terminate_account(self, suspensions_count: int) -> bool:
         """ """
-        return user.suspensions_count >= self.TERMINATION_LIMIT
+        return suspensions_count >= self.TERMINATION_LIMIT
 
-    def create_user_warning(
+    def issue_warnings(
         self,
-        user: User,
+        users: Sequence[User],
         admin: Admin,
         reason: str,
-    ) -> UserWarning:
-        """ """
-        warning = UserWarning(
-            reason=reason, user_id=user.id, admin_id=admin.id
+    ) -> dict[str, Any]:
+        """
+        Warns the users, suspends those reaching a multiple of
+        SUSPENSION_INTERVAL warnings and deletes those reaching
+        TERMINATION_LIMIT suspensions, in one transaction.
+
+        The counters are incremented by UPDATE ... RETURNING statements,
+        so concurrent warnings of a user each act on their own count.
+        Returns the warnings issued and the ids of the users suspended
+        and terminated.
+        """
+        warnings = [
+            UserWarning(reason=reason, user_id=user.id, admin_id=admin.id)
+            for user in users
+        ]
+        warnings_counts = storage.increment_warnings(
+            [user.id for user in users]
         )
-        user.warnings_count += 1
-        self.db.save(warning)
-        self.db.save(user)
-        return warning
+        suspended = [
+            user_id for user_id, count in warnings_counts.items()
+            if self.should_suspend_user(count)
+        ]
+        suspensions_counts = storage.suspend_users(
+            suspended, self.SUSPENSION_DAYS
+        )
+        terminated = [
+            user_id for user_id, count in suspensions_counts.items()
+            if self.should_terminate_account(count)
+        ]
 
-    def handle_suspension(self, user: User) -> None:
-        """ """
-        if self.should_suspend_user(user):
-            suspension = UserSuspension(duration_days=7, user_id=user.id)
-            user.suspensions_count += 1
-            user.is_active = False
-            self.db.save(suspension)
-            self.db.save(user)
-
-    def handle_termination(self, user: User) -> None:
-        """ """
-        if not self.should_terminate_account(user):
-            return
-        self.db.delete(user)
+        for user in users:
+            if user.id in terminated:
+                self.db.delete(user)
         self.db.commit()
 
+        return {
+            "warnings": warnings,
+            "suspended": suspended,
+            "terminated": terminated,
+        }
+
     def active_user(self, user: User) -> bool:
-        """ """
+        """
+        Returns False while the user is suspended. Users whose
+        suspension expired are reactivated by the maintenance worker.
+        """
         # suspension has not expired
         if user.suspension and user.suspension.expires_at > datetime.now():
             return False
-
-        # suspension has expired
-        if not user.is_active:
-            user.is_active = True
-            self.db.save(user)
         return True
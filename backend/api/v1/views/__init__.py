@@ -14,13 +14,16 @@ from api.v1.views.admins import *
 from api.v1.views.courses import *
 from api.v1.views.course_departments import *
 from api.v1.views.departments import *
+from api.v1.views.events import *
 from api.v1.views.feedbacks import *
 from api.v1.views.files import *
 from api.v1.views.helps import *
 from api.v1.views.index import *
 from api.v1.views.levels import *
+from api.v1.views.metrics import *
 from api.v1.views.notifications import *
 from api.v1.views.reports import *
 from api.v1.views.tutorial_links import *
 from api.v1.views.users import *
+from api.v1.views.user_warnings import *
 from api.v1.views.session_auth import *
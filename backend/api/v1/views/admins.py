@@ -11,7 +11,7 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.utils.utility import get_obj, get_date_filters, DatabaseOp
 from api.v1.utils.data_validations import get_request_data
 from models import storage
 from models.admin import Admin
@@ -27,9 +27,12 @@ logger = logging.getLogger(__name__)
 @admin_only
 def get_all_admins(page_size: int, page_num: int):
     """
-    Returns all admins in the database.
+    Returns all admins in the database optionally filtered by
+    creation date (date, date range or period).
     """
-    admins = storage.all(Admin, page_size, page_num)
+    admins = storage.filter(
+        Admin, page_size=page_size, page_num=page_num, **get_date_filters()
+    )
     if not admins:
         abort(404, description="Admin(s) not found")
 
@@ -12,7 +12,9 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
+from api.v1.utils.caching import cached_response, catalogue_cache
 from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.views.courses import COURSE_RELATIONSHIPS, get_course_dict
 from models import storage
 from models.course import Course
 from models.department import Department
@@ -22,24 +24,6 @@ from models.level import Level
 logger = logging.getLogger(__name__)
 
 
-def get_course_dict(course: Course) -> dict[str, Any]:
-    """
-    Returns a json serializable dict of the course object.
-    """
-    course_dict = course.to_dict()
-    course_dict["course_code"] = course_dict["course_code"].upper()
-    course_dict["level"] = course.level.level_name
-    course_dict["num_of_files_in_course"] = len(course.files)
-    course_dict["departments"] = [
-        department.dept_name for department in course.departments
-    ]
-    course_dict["added_by"] = course.added_by.user.email
-    course_dict.pop("files", None)
-    course_dict.pop("__class__", None)
-
-    return course_dict
-
-
 @app_views.route(
     "/courses/<course_id>/departments/<department_id>",
     strict_slashes=False,
@@ -50,7 +34,7 @@ def add_department_to_course(course_id: str, department_id: str):
     """
     Adds a department to a course.
     """
-    course = get_obj(Course, course_id)
+    course = get_obj(Course, course_id, load=COURSE_RELATIONSHIPS)
     if not course:
         abort(404, description="Course does not exist.")
 
@@ -60,8 +44,10 @@ def add_department_to_course(course_id: str, department_id: str):
 
     if department not in course.departments:
         course.departments.append(department)
+        storage.refresh_course_path_buckets([course.id])
         db = DatabaseOp()
         db.save(course)
+        catalogue_cache.invalidate()
 
     course_dict = get_course_dict(course)
     return jsonify(course_dict), 201
@@ -87,8 +73,10 @@ def add_course_to_department(department_id: str, course_id: str):
 
     if course not in department.courses:
         department.courses.append(course)
+        storage.refresh_course_path_buckets([course.id])
         db = DatabaseOp()
         db.save(department)
+        catalogue_cache.invalidate()
 
     dept_dict = get_course_dict(course)
     return jsonify(dept_dict), 201
@@ -102,10 +90,18 @@ def add_course_to_department(department_id: str, course_id: str):
 def get_courses_by_department_and_level(department_id: str, level_id: str):
     """
     Retrieves all courses offered by a specific department and level and
-    optionally filter by semester.
+    optionally filter by semester, with their numbers of approved files.
+    The serialized courses are cached until a course or the approved
+    files change.
     """
     semester: str | None = request.args.get("semester")
 
+    cache_key = (department_id, level_id, semester)
+    entry = catalogue_cache.get(cache_key)
+    if entry:
+        return cached_response(entry)
+    version = catalogue_cache.version()
+
     department = get_obj(Department, department_id)
     if not department:
         abort(404, description="Department does not exist.")
@@ -115,7 +111,7 @@ def get_courses_by_department_and_level(department_id: str, level_id: str):
         abort(404, description="Level does not exist.")
 
     courses = storage.get_courses_by_dept_and_level(
-        department.id, level.id, semester=semester
+        department.id, level.id, semester=semester, load=COURSE_RELATIONSHIPS
     )
 
     if not courses:
@@ -124,11 +120,16 @@ def get_courses_by_department_and_level(department_id: str, level_id: str):
             description="No course found for the department and level."
         )
 
+    file_counts = storage.count_course_files(
+        (course.id for course in courses), status="approved"
+    )
     courses_dict: list[dict[str, Any]] = [
-        get_course_dict(course) for course in courses
+        get_course_dict(course, file_counts) for course in courses
     ]
 
-    return jsonify(courses_dict), 200
+    body = jsonify(courses_dict).get_data()
+    entry = catalogue_cache.set(cache_key, body, version)
+    return cached_response(entry)
 
 
 @app_views.route(
@@ -141,7 +142,7 @@ def delete_department_from_course(course_id: str, department_id: str):
     """
     Removes a department from a course.
     """
-    course = get_obj(Course, course_id)
+    course = get_obj(Course, course_id, load=COURSE_RELATIONSHIPS)
     if not course:
         abort(404, description="Course does not exist.")
 
@@ -150,8 +151,10 @@ def delete_department_from_course(course_id: str, department_id: str):
         abort(404, description="Department does not exist.")
 
     course.departments.remove(department)
+    storage.refresh_course_path_buckets([course.id])
     db = DatabaseOp()
     db.save(course)
+    catalogue_cache.invalidate()
 
     course_dict = get_course_dict(course)
     return jsonify(course_dict), 200
@@ -176,8 +179,10 @@ def delete_course_from_department(department_id: str, course_id: str):
         abort(404, description="Course does not exist.")
 
     department.courses.remove(course)
+    storage.refresh_course_path_buckets([course.id])
     db = DatabaseOp()
     db.save(course)
+    catalogue_cache.invalidate()
 
     course_dict = get_course_dict(course)
     return jsonify(course_dict), 200
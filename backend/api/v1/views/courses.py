@@ -11,8 +11,18 @@ from typing import Any, cast
 import logging
 
 from api.v1.views import app_views
-from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.auth.authorization import admin_only, is_admin
+from api.v1.utils.caching import catalogue_cache, conditional_get
+from api.v1.utils.course_import import CourseImport
+from api.v1.utils.utility import (
+    decode_cursor,
+    encode_cursor,
+    get_obj,
+    get_date_filters,
+    get_file_stats_dict,
+    get_page_size,
+    DatabaseOp,
+)
 from api.v1.utils.data_validations import (
     validate_request_data,
     CourseCreate,
@@ -21,25 +31,43 @@ from api.v1.utils.data_validations import (
 from models import storage
 from models.admin import Admin
 from models.course import Course
+from models.course_file_stats import course_file_stats
+from models.department import Department
+from models.file import File
 from models.level import Level
+from models.user import User
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# relationships read by get_course_dict
+COURSE_RELATIONSHIPS = ("level", "departments", "added_by.user")
+
 
-def get_course_dict(course: Course) -> dict[str, Any]:
+def get_course_dict(
+    course: Course, file_counts: dict[str, int] | None = None
+) -> dict[str, Any]:
     """
     Returns a json serializable dict of the course object.
+    Pass the file_counts of a list of courses, from
+    storage.count_course_files, to count them with one query.
     """
+    if file_counts is None:
+        file_counts = storage.count_course_files([course.id])
+
     course_dict = course.to_dict()
     course_dict["course_code"] = course_dict["course_code"].upper()
     course_dict["level"] = course.level.level_name
-    course_dict["num_of_files_in_course"] = len(course.files)
+    course_dict["num_of_files_in_course"] = file_counts.get(course.id, 0)
     course_dict["departments"] = [
         department.dept_name for department in course.departments
     ]
     course_dict["added_by"] = course.added_by.user.email
     course_dict.pop("files", None)
+    course_dict.pop("path_bucket", None)
     course_dict.pop("__class__", None)
 
     return course_dict
@@ -65,41 +93,70 @@ def add_course():
     db = DatabaseOp()
     course = Course(**valid_data)
     db.save(course)
+    catalogue_cache.invalidate()
 
     course_dict = get_course_dict(course)
     return jsonify(course_dict), 201
 
 
+@app_views.route("/courses/import", strict_slashes=False, methods=["POST"])
+@admin_only
+def import_courses():
+    """
+    Imports departments, courses and the departments offering them
+    from a JSON list or a CSV file in a single transaction.
+
+    Nothing is imported when any row is invalid, unless partial=true
+    is passed, in which case invalid rows are skipped.
+    Errors are reported per row.
+    """
+    admin = cast(Admin, g.current_user.admin)
+    partial = request.args.get("partial", "").lower() == "true"
+
+    course_import = CourseImport(admin.id)
+    result = course_import.run(partial=partial)
+    if result["courses_created"]:
+        catalogue_cache.invalidate()
+
+    if result["errors"] and not partial:
+        return jsonify(result), 400
+    return jsonify(result), 201
+
+
 @app_views.route("/courses", strict_slashes=False, methods=["GET"])
 @admin_only
+@conditional_get(Course, Department, File, Level, User)
 def get_all_courses():
     """
     Returns all courses in the database with optional filtering by:
-    date, search and pagination.
+    date, date range, period, search and pagination.
     """
     page_size: str | None = request.args.get("page_size")
     page_num: str | None = request.args.get("page_num")
-    created_at: str | None = request.args.get("date")
+    date_filters = get_date_filters()
     course_code: str | None = request.args.get("search")
 
-    if course_code or created_at:
+    if course_code or any(date_filters.values()):
         courses = storage.filter(
             Course,
             search_str=course_code,
-            date_str=created_at,
             page_size=page_size,
             page_num=page_num,
+            load=COURSE_RELATIONSHIPS,
+            **date_filters,
         )
     else:
         courses = storage.all(
             Course,
             page_size=page_size,
             page_num=page_num,
+            load=COURSE_RELATIONSHIPS,
         )
 
     if not Course:
         abort(404, description="No course found")
-    all_courses = [get_course_dict(course) for course in courses]
+    file_counts = storage.count_course_files(course.id for course in courses)
+    all_courses = [get_course_dict(course, file_counts) for course in courses]
     return jsonify(all_courses), 200
 
 
@@ -107,11 +164,12 @@ def get_all_courses():
         "/courses/<course_id>", strict_slashes=False, methods=["GET"]
 )
 @admin_only
+@conditional_get(Course, Department, File, Level, User)
 def get_course(course_id: str):
     """
     Return a course details given its id.
     """
-    course = get_obj(Course, course_id)
+    course = get_obj(Course, course_id, load=COURSE_RELATIONSHIPS)
     if not course:
         abort(404, description="Course does not exist.")
 
@@ -119,6 +177,72 @@ def get_course(course_id: str):
     return jsonify(course_dict), 200
 
 
+@app_views.route(
+        "/courses/<course_id>/stats", strict_slashes=False, methods=["GET"]
+)
+@conditional_get(Course, course_file_stats)
+def get_course_stats(course_id: str):
+    """
+    Returns the number and total size of the files of a course,
+    by status, and of its approved files by type and session.
+    Files awaiting moderation are only counted for admins.
+    """
+    course = get_obj(Course, course_id)
+    if not course:
+        abort(404, description="Course does not exist.")
+
+    if is_admin():
+        stats_dict = get_file_stats_dict(
+            storage.get_file_stats(course_id=course.id)
+        )
+    else:
+        stats_dict = get_file_stats_dict(
+            storage.get_file_stats(course_id=course.id, status="approved")
+        )
+        stats_dict.pop("files_by_status")
+    stats_dict["course_id"] = course.id
+    return jsonify(stats_dict), 200
+
+
+@app_views.route(
+        "/courses/<course_id>/files", strict_slashes=False, methods=["GET"]
+)
+def get_course_files(course_id: str):
+    """
+    Returns a page of the approved files of a course, latest first,
+    optionally filtered by file_type, session and ext (e.g. pdf).
+    Pass the returned next_cursor as cursor to get the next page.
+    """
+    course = get_obj(Course, course_id)
+    if not course:
+        abort(404, description="Course does not exist.")
+
+    page_size = get_page_size(DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    cursor = request.args.get("cursor")
+    before = decode_cursor(cursor) if cursor else None
+    file_ext = request.args.get("ext")
+    if file_ext:
+        file_ext = "." + file_ext.lower().lstrip(".")
+
+    # one extra row tells whether there is a next page
+    rows = storage.get_course_files(
+        course.id,
+        page_size + 1,
+        before=before,
+        file_type=request.args.get("file_type"),
+        session=request.args.get("session"),
+        file_ext=file_ext,
+    )
+    page = rows[:page_size]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > page_size else None
+
+    return jsonify({
+        "course_id": course.id,
+        "files": [row._asdict() for row in page],
+        "next_cursor": next_cursor,
+    }), 200
+
+
 @app_views.route(
         "/courses/<course_id>", strict_slashes=False, methods=["PUT"]
 )
@@ -134,7 +258,7 @@ def update_course(course_id: str):
         if not level:
             abort(404, description="Level does not exist.")
 
-    course = get_obj(Course, course_id)
+    course = get_obj(Course, course_id, load=COURSE_RELATIONSHIPS)
     if not course:
         abort(404, description="Course does not exist.")
 
@@ -143,6 +267,7 @@ def update_course(course_id: str):
 
     db = DatabaseOp()
     db.save(course)
+    catalogue_cache.invalidate()
 
     course_dict = get_course_dict(course)
     return jsonify(course_dict), 200
@@ -163,4 +288,5 @@ def delete_course(course_id: str):
     db = DatabaseOp()
     db.delete(course)
     db.commit()
+    catalogue_cache.invalidate()
     return jsonify({}), 200
@@ -12,14 +12,20 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.utils.caching import catalogue_cache, conditional_get
+from api.v1.utils.utility import (
+    get_obj, get_date_filters, get_file_stats_dict, DatabaseOp
+)
 from api.v1.utils.data_validations import (
     validate_request_data,
     DepartmentCreate,
     DepartmentUpdate,
 )
 from models import storage
+from models.course import Course
+from models.course_file_stats import course_file_stats
 from models.department import Department
+from models.user import User
 
 
 logger = logging.getLogger(__name__)
@@ -52,32 +58,36 @@ def create_department():
     """
     valid_data = validate_request_data(DepartmentCreate)
 
-    department = Department(**valid_data)
     db = DatabaseOp()
-    db.save(department)
+    with db.unit_of_work():
+        department = Department(**valid_data)
+        db.save(department)
+        # courses offered by every department are no longer general
+        storage.refresh_course_path_buckets(bucket="general")
 
     dept_dict = get_department_dict(department)
     return jsonify(dept_dict), 201
 
 
 @app_views.route("/departments", strict_slashes=False, methods=["GET"])
+@conditional_get(Department, Course, User, public=True)
 def get_all_departments():
     """
     Retrieves all departments with optional
-    filtering by date and pagination.
+    filtering by date, date range, period and pagination.
     """
     page_size: str | None = request.args.get("page_size")
     page_num: str | None = request.args.get("page_num")
-    created_at: str | None = request.args.get("date")
+    date_filters = get_date_filters()
     dept_name: str | None = request.args.get("search")
 
-    if dept_name or created_at:
+    if dept_name or any(date_filters.values()):
         departments = storage.filter(
             Department,
             search_str=dept_name,
-            date_str=created_at,
             page_size=page_size,
             page_num=page_num,
+            **date_filters,
         )
     else:
         departments = storage.all(
@@ -94,6 +104,7 @@ def get_all_departments():
 @app_views.route(
         "/departments/<dept_id>", strict_slashes=False, methods=["GET"]
 )
+@conditional_get(Department, Course, User, public=True)
 def get_department(dept_id: str):
     """
     Retrieves a department from the database by its id.
@@ -106,6 +117,30 @@ def get_department(dept_id: str):
     return jsonify(dept_dict), 200
 
 
+@app_views.route(
+        "/departments/<dept_id>/stats", strict_slashes=False, methods=["GET"]
+)
+@conditional_get(Department, Course, course_file_stats, public=True)
+def get_department_stats(dept_id: str):
+    """
+    Returns the number and total size of the approved files of the
+    courses offered by a department, and their numbers by type and
+    session. Files of shared courses count for every department
+    offering them. The route is public, so files awaiting moderation
+    are left out.
+    """
+    department = get_obj(Department, dept_id)
+    if not department:
+        abort(404, description="Department does not exist.")
+
+    stats_dict = get_file_stats_dict(
+        storage.get_file_stats(department_id=department.id, status="approved")
+    )
+    stats_dict.pop("files_by_status")
+    stats_dict["department_id"] = department.id
+    return jsonify(stats_dict), 200
+
+
 @app_views.route(
         "/departments/<dept_id>", strict_slashes=False, methods=["PUT"]
 )
@@ -124,7 +159,15 @@ def update_department(dept_id: str):
         setattr(department, attr, value)
 
     db = DatabaseOp()
-    db.save(department)
+    with db.unit_of_work():
+        db.save(department)
+        if "dept_name" in valid_data:
+            # only courses of the department may be named after it
+            storage.refresh_course_path_buckets(
+                [course.id for course in department.courses]
+            )
+    if "dept_name" in valid_data:
+        catalogue_cache.invalidate()
 
     dept_dict = get_department_dict(department)
     return jsonify(dept_dict), 200
@@ -143,6 +186,8 @@ def delete_department(dept_id: str):
         abort(404, description="Department does not exist.")
 
     db = DatabaseOp()
-    db.delete(department)
-    db.commit()
+    with db.unit_of_work():
+        db.delete(department)
+        storage.refresh_course_path_buckets()
+    catalogue_cache.invalidate()
     return jsonify({}), 200
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Implements the stream of moderation events sent to admins
+as Server-Sent Events.
+"""
+
+
+from dotenv import load_dotenv
+from flask import Response, abort
+from typing import Iterator
+import logging
+import os
+import time
+
+from api.v1.views import app_views
+from api.v1.auth.authorization import admin_only
+from api.v1.utils.events import Subscription, event_broker
+
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+# comments sent while idle keep proxies from closing the stream
+HEARTBEAT_INTERVAL = float(os.getenv("EVENTS_HEARTBEAT_INTERVAL", 15))
+# streams are closed after a while, the client reconnecting
+# re-authenticates and frees the worker thread meanwhile
+MAX_STREAM_DURATION = float(os.getenv("EVENTS_MAX_STREAM_DURATION", 300))
+RECONNECT_DELAY_MS = 3000
+
+
+def stream_events(subscription: Subscription) -> Iterator[str]:
+    """
+    Yields the events of subscription as Server-Sent Events messages.
+    """
+    yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+
+    deadline = time.monotonic() + MAX_STREAM_DURATION
+    while not subscription.overflowed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        event = subscription.get(min(HEARTBEAT_INTERVAL, remaining))
+        yield event.to_sse() if event else ": heartbeat\n\n"
+
+
+@app_views.route("/events", strict_slashes=False, methods=["GET"])
+@admin_only
+def get_events():
+    """
+    Streams moderation events to the current admin:
+    - file.created and report.created, with the notification sent
+    - file.approved and file.rejected
+    Events are not replayed, so refetch the moderation queue when
+    (re)connecting rather than polling it.
+    """
+    subscription = event_broker.subscribe()
+    if subscription is None:
+        abort(503, description="Too many event streams open.")
+
+    response = Response(
+        stream_events(subscription), mimetype="text/event-stream"
+    )
+    response.call_on_close(lambda: event_broker.unsubscribe(subscription))
+    response.cache_control.no_cache = True
+    # stops nginx from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
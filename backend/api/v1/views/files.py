@@ -13,11 +13,20 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.utils.utility import get_obj, get_date_filters, DatabaseOp
+from api.v1.utils.caching import catalogue_cache, conditional_get
+from api.v1.utils.events import event_broker
 from api.v1.utils.file_utils import FileManager, FileUpload
+from api.v1.utils.outbox import (
+    S3_DELETE,
+    S3_MOVE,
+    record,
+    record_notification,
+    wake_outbox_dispatcher,
+)
 from models import storage
+from models.course import Course
 from models.file import File
-from models.notification import Notification
 from models.admin import Admin
 from models.user import User
 
@@ -25,6 +34,9 @@ from models.user import User
 logger = logging.getLogger(__name__)
 load_dotenv()
 
+# relationships read by get_file_dict
+FILE_RELATIONSHIPS = ("course", "added_by", "approved_by.user")
+
 
 def get_file_dict(file: File) -> dict[str, Any]:
     """
@@ -47,32 +59,31 @@ def get_file_dict(file: File) -> dict[str, Any]:
     return file_dict
 
 
-def handle_approved_files(file: File, uploader: FileUpload) -> None:
+def get_file_event_data(file: File) -> dict[str, Any]:
     """
-    Move file to permanent S3 bucket if approved.
+    Returns the data of the events published about the file.
     """
-    new_path: str | None = uploader.upload_file_to_s3_perm(
-        file.temp_filepath
-    )
-    if new_path:
-        file.permanent_filepath = new_path
-    else:
-        file.status = "pending"
+    return {
+        "file_id": file.id,
+        "file_name": file.file_name,
+        "course": file.course.course_code,
+    }
 
 
-def handle_rejected_files(
-        file: File, uploader: FileUpload, db: DatabaseOp
-) -> None:
+def get_file_paths(file: File) -> list[str]:
     """
-    Delete file completely if rejected.
+    Returns the S3 paths the file may be stored at. Until a file is
+    moved, that includes the permanent path a pending move copies it to.
     """
-    path: str = file.temp_filepath or file.permanent_filepath
-    try:
-        uploader.delete_file(path)
-        db.delete(file)
-        db.commit()
-    except Exception:
-        return
+    permanent_filepath = file.permanent_filepath
+    if not permanent_filepath and file.temp_filepath:
+        permanent_filepath = FileManager().generate_permanent_s3_filepath(
+            file.temp_filepath
+        )
+    return [
+        path for path in (file.temp_filepath, permanent_filepath)
+        if path
+    ]
 
 
 @app_views.route("/files", strict_slashes=False, methods=["POST"])
@@ -89,21 +100,20 @@ def add_file():
     file_metadata["user_id"] = user.id
 
     file = File(**file_metadata)
-    db = DatabaseOp()
-    db.save(file)
 
-    # upload to s3 bucket
+    # upload to s3 bucket first, so no committed file lacks its object
     file_obj = file_data["file_obj"]
     file_upload.upload_file_to_s3_temp(file_obj, file.temp_filepath)
 
-    # notify admins
+    # admins are notified by the outbox dispatcher once committed
+    record_notification(
+        f"new file pending review - {file.file_name}",
+        "file.created",
+        get_file_event_data(file),
+    )
     db = DatabaseOp()
-    notification_data: dict[str, str] = {
-        "message": f"new file pending review - {file.file_name}",
-        "notification_scope": "admin",
-    }
-    notification = Notification(**notification_data)
-    db.save(notification)
+    db.save(file)
+    wake_outbox_dispatcher()
 
     file_dict: dict[str, str] = get_file_dict(file)
     return jsonify(file_dict), 201
@@ -113,34 +123,37 @@ def add_file():
         "/files", strict_slashes=False, methods=["GET"]
 )
 @admin_only
+@conditional_get(File, Course, User)
 def get_all_files():
     """
     Returns all files in database optionally filtered by:
     - file name
     - file status
-    - date created
+    - date created (date, date_from/date_to or period e.g. this_week)
     - pagination
     """
     page_size = request.args.get("page_size")
     page_num = request.args.get("page_num")
-    created_at = request.args.get("date")
+    date_filters = get_date_filters()
     file_name = request.args.get("search")
     file_status = request.args.get("file_status")
 
-    if created_at or file_name or file_status:
+    if file_name or file_status or any(date_filters.values()):
         files = storage.filter(
             File,
             search_str=file_name,
             file_status=file_status,
-            date_str=created_at,
             page_num=page_num,
             page_size=page_size,
+            load=FILE_RELATIONSHIPS,
+            **date_filters,
         )
     else:
         files = storage.all(
             File,
             page_num=page_num,
-            page_size=page_size
+            page_size=page_size,
+            load=FILE_RELATIONSHIPS,
         )
 
     all_files = [get_file_dict(file) for file in files]
@@ -156,15 +169,15 @@ def get_file(file_id: str):
     Returns file metadata and a presigned url to allow users
     to download or view file.
     """
-    file = get_obj(File, file_id)
+    file = get_obj(File, file_id, load=FILE_RELATIONSHIPS)
     if not file:
         abort(404, description="File does not exist.")
 
+    # approved files are served from the temporary path until moved
     file_upload = FileUpload()
-    if file.temp_filepath:
-        url = file_upload.get_presigned_url(file.temp_filepath)
-    else:
-        url = file_upload.get_presigned_url(file.permanent_filepath)
+    url = file_upload.get_presigned_url(
+        file.permanent_filepath or file.temp_filepath
+    )
 
     file_dict = get_file_dict(file)
     file_dict["url"] = url
@@ -181,12 +194,12 @@ def update_file_metadata(file_id: str):
     Updates a file metadata and save in database.
     Moves file to permanent s3 bucket if file status is approved. Or
     Deletes file if file status is rejected.
+    The S3 move and deletion are carried out by the outbox dispatcher.
     """
     admin = cast(Admin, g.current_user.admin)
-    uploader = FileUpload()
     db = DatabaseOp()
 
-    file = get_obj(File, file_id)
+    file = get_obj(File, file_id, load=FILE_RELATIONSHIPS)
     if not file:
         abort(400, description="File does not exist")
 
@@ -194,17 +207,31 @@ def update_file_metadata(file_id: str):
     metadata = file_manager.validate_update_file_request()
     metadata["admin_id"] = admin.id
 
+    was_approved = file.status == "approved"
     for attr, value in metadata.items():
         setattr(file, attr, value)
 
-    # move to permanent s3 storage
-    if file.status == "approved":
-        handle_approved_files(file, uploader)
+    if file.status == "rejected":
+        # delete file
+        record(S3_DELETE, paths=get_file_paths(file))
+        db.delete(file)
+        db.commit()
+    else:
+        # move to permanent s3 storage
+        if file.status == "approved" and not file.permanent_filepath:
+            record(
+                S3_MOVE, file_id=file.id, temp_filepath=file.temp_filepath
+            )
         db.save(file)
+    if was_approved or file.status == "approved":
+        # the catalogue counts approved files only
+        catalogue_cache.invalidate()
+    wake_outbox_dispatcher()
 
-    # delete file
     if file.status == "rejected":
-        handle_rejected_files(file, uploader, db)
+        event_broker.publish("file.rejected", get_file_event_data(file))
+    elif file.status == "approved" and not was_approved:
+        event_broker.publish("file.approved", get_file_event_data(file))
 
     file_dict: dict[str, str] = get_file_dict(file)
     return jsonify(file_dict), 200
@@ -222,14 +249,11 @@ def delete_file(file_id: str):
     if not file:
         abort(404, description="File does not exist")
 
-    file_upload = FileUpload()
-
-    if file.status.value == "approved":
-        file_upload.delete_file(file.permanent_filepath)
-    else:
-        file_upload.delete_file(file.temp_filepath)
-
+    record(S3_DELETE, paths=get_file_paths(file))
     db = DatabaseOp()
     db.delete(file)
     db.commit()
+    if file.status == "approved":
+        catalogue_cache.invalidate()
+    wake_outbox_dispatcher()
     return jsonify({}), 200
@@ -11,12 +11,15 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.utils.caching import catalogue_cache, conditional_get
+from api.v1.utils.utility import get_obj, get_date_filters, DatabaseOp
 from api.v1.utils.data_validations import (
     validate_request_data, LevelCreate
 )
 from models import storage
+from models.course import Course
 from models.level import Level
+from models.user import User
 
 
 logger = logging.getLogger(__name__)
@@ -51,23 +54,24 @@ def create_level():
 
 
 @app_views.route("/levels", strict_slashes=False, methods=["GET"])
+@conditional_get(Level, Course, User, public=True)
 def get_all_levels():
     """
     Returns all levels with optional filtering by,
-    date, search and pagination.
+    date, date range, period, search and pagination.
     """
     page_size: str | None = request.args.get("page_size")
     page_num: str | None = request.args.get("page_num")
-    created_at: str | None = request.args.get("date")
+    date_filters = get_date_filters()
     level_name: str | None = request.args.get("search")
 
-    if created_at or level_name:
+    if level_name or any(date_filters.values()):
         levels = storage.filter(
             Level,
             search_str=level_name,
-            date_str=created_at,
             page_size=page_size,
             page_num=page_num,
+            **date_filters,
         )
     else:
         levels = storage.all(
@@ -86,6 +90,7 @@ def get_all_levels():
 @app_views.route(
         "/levels/<level_id>", strict_slashes=False, methods=["GET"]
 )
+@conditional_get(Level, Course, User, public=True)
 def get_level(level_id: str):
     """
     Return a level by its id.
@@ -112,4 +117,5 @@ def delete_level(level_id: str):
     db = DatabaseOp()
     db.delete(level)
     db.commit()
+    catalogue_cache.invalidate()
     return jsonify({}), 200
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Implements the /metrics route exposing application metrics
+in the Prometheus text format.
+"""
+
+
+from dotenv import load_dotenv
+from flask import Response, abort, request
+import hmac
+import os
+
+from api.v1.views import app_views
+from api.v1.utils.metrics import metrics
+
+
+load_dotenv()
+
+
+@app_views.route("/metrics", strict_slashes=False, methods=["GET"])
+def get_metrics():
+    """
+    Returns request, database pool, S3, cache and upload metrics.
+    The scraper must send METRICS_TOKEN as a bearer token. Without
+    METRICS_TOKEN the route is disabled, as it is not behind session auth.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        abort(404)
+
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization, f"Bearer {token}"):
+        abort(401)
+
+    return Response(
+        metrics.render(),
+        status=200,
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
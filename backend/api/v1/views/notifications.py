@@ -1,36 +1,101 @@
-# #!/usr/bin/env python3
+#!/usr/bin/env python3
 
-# """
+"""
+Implements routes for reading and marking read the notifications
+of admins.
+"""
 
-# """
 
+from flask import abort, g, jsonify, request
+from sqlalchemy.exc import IntegrityError
+from typing import Any, cast
+import logging
 
-# from flask import jsonify, g
-# from typing import cast
-# import logging
+from api.v1.views import app_views
+from api.v1.auth.authorization import admin_only
+from api.v1.utils.data_validations import get_request_data
+from api.v1.utils.notifications import get_notification_dict
+from api.v1.utils.utility import (
+    decode_cursor, encode_cursor, get_page_size, DatabaseOp
+)
+from models import storage
+from models.admin import Admin
 
-# from api.v1.views import app_views
 
-# # from api.v1.auth.authorization import admin_only
-# # from api.v1.utils import get_obj
-# # from api.v1.data_validations import DatabaseOp
-# # from models import storage
-# # from models.admin import Admin
-# # from models.course import Course
-# # from models.department import Department
-# # from models.notification import Notification
-# # from models.user import User
+logger = logging.getLogger(__name__)
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
 
-# logger = logging.getLogger(__name__)
+@app_views.route(
+    "/notifications", strict_slashes=False, methods=["GET"]
+)
+@admin_only
+def get_notifications():
+    """
+    Returns a page of the current admin's notifications, latest first,
+    with the admin's unread count. Pass the returned next_cursor as
+    cursor to get the next page, and unread=true for unread ones only.
+    """
+    admin = cast(Admin, g.current_user.admin)
 
+    page_size = get_page_size(DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
 
-# # @app_views.route(
-# # "/notifications", strict_slashes=False, methods=["GET"]
-# # )
-# # def get_notifications():
-# #     """ """
-# #     user = cast(User, g.current_user)
-# #     notifications = Notification.get_notifications(user)
-# #     logger.debug(notifications)
-# #     return jsonify(notifications), 200
+    cursor = request.args.get("cursor")
+    before = decode_cursor(cursor) if cursor else None
+    unread_only = request.args.get("unread", "").lower() == "true"
+
+    # one extra row tells whether there is a next page
+    rows = storage.get_notifications(
+        admin, page_size + 1, before=before, unread_only=unread_only
+    )
+    page = rows[:page_size]
+    next_cursor = encode_cursor(page[-1][0]) if len(rows) > page_size else None
+
+    return jsonify({
+        "notifications": [
+            get_notification_dict(notification, read_at)
+            for notification, read_at in page
+        ],
+        "next_cursor": next_cursor,
+        "unread_count": admin.unread_notifications,
+    }), 200
+
+
+@app_views.route(
+    "/notifications/read", strict_slashes=False, methods=["PUT"]
+)
+@admin_only
+def mark_notifications_read():
+    """
+    Marks notifications of the current admin as read, either those
+    listed in "ids" or, with "all": true, all of them.
+    """
+    admin = cast(Admin, g.current_user.admin)
+    data: Any = get_request_data()
+
+    if not isinstance(data, dict):
+        abort(400, description="Expected ids or all.")
+    if data.get("all") is True:
+        notification_ids = None
+    else:
+        notification_ids = data.get("ids")
+        if not isinstance(notification_ids, list) or not all(
+            isinstance(notification_id, str)
+            for notification_id in notification_ids
+        ):
+            abort(400, description="ids must be a list of notification ids.")
+
+    try:
+        marked = storage.mark_notifications_read(admin, notification_ids)
+    except IntegrityError:
+        # a concurrent request marked some of them read first
+        storage.rollback()
+        abort(409, description="Notifications were marked read meanwhile.")
+    db = DatabaseOp()
+    db.commit()
+
+    return jsonify({
+        "marked_read": marked,
+        "unread_count": admin.unread_notifications,
+    }), 200
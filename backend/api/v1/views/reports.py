@@ -8,7 +8,8 @@ from typing import cast
 import logging
 
 from api.v1.views import app_views
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.utils.outbox import record_notification, wake_outbox_dispatcher
+from api.v1.utils.utility import get_obj, get_date_filters, DatabaseOp
 from api.v1.utils.data_validations import (
     validate_request_data,
     ReportCreate,
@@ -18,7 +19,6 @@ from api.v1.auth.authorization import admin_only
 from models import storage
 from models.admin import Admin
 from models.file import File
-from models.notification import Notification
 from models.report import Report
 from models.tutoriallink import TutorialLink
 from models.user import User
@@ -27,18 +27,6 @@ from models.user import User
 logger = logging.getLogger(__name__)
 
 
-def add_notification(message: str, report_id: str) -> None:
-    """ """
-    data = {
-        "notification_scope": "admin",
-        "message": message,
-        "report_id": report_id,
-    }
-    notification = Notification(**data)
-    db = DatabaseOp()
-    db.save(notification)
-
-
 @app_views.route("/reports", strict_slashes=False, methods=["POST"])
 def add_report():
     """ """
@@ -57,11 +45,16 @@ def add_report():
             abort(404, description="Tutorial link does not exist.")
 
     db = DatabaseOp()
-    valid_data["added_by"] = user
+    valid_data["user_id"] = user.id
     report = Report(**valid_data)
+    # admins are notified by the outbox dispatcher once committed
+    record_notification(
+        valid_data["message"],
+        "report.created",
+        {"report_id": report.id, "report_type": report.report_type},
+    )
     db.save(report)
-
-    add_notification(valid_data["message"], report.id)
+    wake_outbox_dispatcher()
     return jsonify(report.to_dict()), 201
 
 
@@ -73,7 +66,9 @@ def add_report():
 @admin_only
 def get_all_reports(page_size: int, page_num: int):
     """ """
-    reports = storage.all(Report, page_size, page_num)
+    reports = storage.filter(
+        Report, page_size=page_size, page_num=page_num, **get_date_filters()
+    )
     if not reports:
         abort(404, description="No reports found.")
 
@@ -11,9 +11,12 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp, UserDisplineHandler
+from api.v1.utils.utility import (
+    get_obj, get_date_filters, DatabaseOp, UserDisplineHandler
+)
 from api.v1.utils.data_validations import (
     validate_request_data,
+    UserWarningBulkCreate,
     UserWarningCreate,
     UserWarningUpdate,
 )
@@ -37,13 +40,49 @@ def issue_user_warning(user_id: str):
         abort(404, description="User not found.")
 
     discipline_handler = UserDisplineHandler()
-    warning = discipline_handler.create_user_warning(
-        user, admin, valid_data["reason"]
-    )
-    discipline_handler.handle_suspension(user)
-    discipline_handler.handle_termination(user)
+    db = DatabaseOp()
+    with db.unit_of_work():
+        result = discipline_handler.issue_warnings(
+            [user], admin, valid_data["reason"]
+        )
+
+    return jsonify(result["warnings"][0].to_dict()), 201
+
+
+# allow only admins
+@app_views.route("/users/warnings", strict_slashes=False, methods=["POST"])
+@admin_only
+def issue_user_warnings_in_bulk():
+    """
+    Warns every user listed in "user_ids" for the same reason, in one
+    transaction. Returns the warnings issued, the ids of the users
+    suspended or terminated as a result, and the ids not found.
+    """
+    admin = g.current_user.admin
+    valid_data = validate_request_data(UserWarningBulkCreate)
+
+    users = storage.get_by_values(User, id=valid_data["user_ids"])
+    found_ids = {user.id for user in users}
+    not_found = [
+        user_id for user_id in valid_data["user_ids"]
+        if user_id not in found_ids
+    ]
+    if not users:
+        abort(404, description="No user found.")
+
+    discipline_handler = UserDisplineHandler()
+    db = DatabaseOp()
+    with db.unit_of_work():
+        result = discipline_handler.issue_warnings(
+            users, admin, valid_data["reason"]
+        )
 
-    return jsonify(warning.to_dict()), 201
+    return jsonify({
+        "warnings": [warning.to_dict() for warning in result["warnings"]],
+        "suspended": result["suspended"],
+        "terminated": result["terminated"],
+        "not_found": not_found,
+    }), 201
 
 
 # allow only admins
@@ -55,8 +94,11 @@ def issue_user_warning(user_id: str):
 @admin_only
 def all_user_warnings(page_size: int, page_num: int):
     """ """
-    user_warnings: Sequence[UserWarning] = storage.all(
-        UserWarning, page_size, page_num
+    user_warnings: Sequence[UserWarning] = storage.filter(
+        UserWarning,
+        page_size=page_size,
+        page_num=page_num,
+        **get_date_filters(),
     )
     if not user_warnings:
         abort(404, description="No user warning found")
@@ -98,7 +140,7 @@ def update_user_warnings(user_warning_id: str):
     if not user_warning:
         abort(404, description="User warning does not exist.")
 
-    for attr, value in valid_data:
+    for attr, value in valid_data.items():
         setattr(user_warning, attr, value)
 
     db = DatabaseOp()
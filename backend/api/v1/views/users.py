@@ -12,9 +12,12 @@ import logging
 
 from api.v1.views import app_views
 from api.v1.auth.authorization import admin_only
-from api.v1.utils.utility import get_obj, DatabaseOp
+from api.v1.auth.password_hashing import password_hasher
+from api.v1.auth.rate_limit import login_rate_limiter
+from api.v1.utils.user_provisioning import BulkUserRegistration
+from api.v1.utils.utility import get_obj, get_date_filters, DatabaseOp
 from api.v1.utils.data_validations import (
-    UserCreate, UserUpdate, validate_request_data
+    UserCreate, UserUpdate, get_request_data, validate_request_data
 )
 from models import storage
 from models.user import User
@@ -51,8 +54,6 @@ def register_users():
     """
     Implements route for registering users.
     """
-    from api.v1.app import bcrypt
-
     valid_data = validate_request_data(UserCreate)
 
     if valid_data.get("department_id"):
@@ -65,41 +66,56 @@ def register_users():
         if not level:
             abort(404, description="Level does not exist.")
 
-    valid_data["password"] = (
-        bcrypt.generate_password_hash(valid_data["password"])  # type: ignore
-        .decode("utf-8")
+    valid_data["password"] = password_hasher.generate_password_hash(
+        valid_data["password"]
     )
 
     user = User(**valid_data)
 
     db = DatabaseOp()
-    db.save(user)
-    if user.is_admin:
-        admin = Admin(user_id=user.id)
-        db.save(admin)
+    with db.unit_of_work():
+        db.save(user)
+        if user.is_admin:
+            admin = Admin(user_id=user.id)
+            db.save(admin)
+    login_rate_limiter.forget_unknown_email(user.email)
 
     user_dict = get_user_dict(user)
     return jsonify(user_dict), 201
 
 
+@app_views.route("/users/bulk", strict_slashes=False, methods=["POST"])
+@admin_only
+def register_users_in_bulk():
+    """
+    Registers a list of users, e.g. a whole intake of students,
+    and returns the result of every record.
+    """
+    registration = BulkUserRegistration(get_request_data())
+    result = registration.run()
+
+    status_code = 201 if result["created"] else 400
+    return jsonify(result), status_code
+
+
 @app_views.route("/users", strict_slashes=False, methods=["GET"])
 def get_all_users():
     """
     Returns all users in storage optionally filtered by
-    creation date, email and pagination.
+    creation date (date, date range or period), email and pagination.
     """
     page_size: str | None = request.args.get("page_size")
     page_num: str | None = request.args.get("page_num")
-    created_at: str | None = request.args.get("date")
+    date_filters = get_date_filters()
     email_str: str | None = request.args.get("search")
 
-    if email_str or created_at:
+    if email_str or any(date_filters.values()):
         users = storage.filter(
             User,
             search_str=email_str,
-            date_str=created_at,
             page_size=page_size,
             page_num=page_num,
+            **date_filters,
         )
     else:
         users = storage.all(
@@ -201,11 +217,11 @@ def update_user(user_id: str):
     for attr, value in valid_data.items():
         setattr(user, attr, value)
     db = DatabaseOp()
-    db.save(user)
-
-    if user.is_admin and not user.admin:
-        admin = Admin(user_id=user.id)
-        db.save(admin)
+    with db.unit_of_work():
+        db.save(user)
+        if user.is_admin and not user.admin:
+            admin = Admin(user_id=user.id)
+            db.save(admin)
 
     user_dict = get_user_dict(user)
     user_dict.pop("admin", None)
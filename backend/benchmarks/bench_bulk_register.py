@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks bulk user registration.
+
+Reports users/sec registered one at a time, as POST /register does, and
+through BulkUserRegistration, as POST /users/bulk does. The users are
+deleted again afterwards.
+
+Usage (from backend/, with the usual .env and a test database):
+    python -m benchmarks.bench_bulk_register [--users 500] [--rounds 12]
+"""
+
+import argparse
+import os
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    # the hasher reads its cost when imported
+    os.environ["BCRYPT_LOG_ROUNDS"] = str(args.rounds)
+
+    from api.v1.app import create_app
+    from api.v1.auth.password_hashing import password_hasher
+    from api.v1.utils.user_provisioning import (
+        BulkUserRegistration,
+        MAX_BULK_USERS,
+    )
+    from models import storage
+    from models.user import User
+
+    cores = os.cpu_count() or 1
+    print(f"bcrypt cost {args.rounds}, {args.users} users, {cores} cores")
+
+    def records(prefix: str) -> list[dict[str, str]]:
+        return [
+            {"email": f"{prefix}{i}@bench.com", "password": "Password1234"}
+            for i in range(args.users)
+        ]
+
+    def cleanup(prefix: str) -> None:
+        emails = [record["email"] for record in records(prefix)]
+        for user in storage.get_by_values(User, email=emails):
+            storage.delete(user)
+        storage.save()
+
+    app = create_app()
+    with app.test_request_context():
+        start = time.perf_counter()
+        for record in records("single"):
+            User(
+                email=record["email"],
+                password=password_hasher.generate_password_hash(
+                    record["password"]
+                ),
+            )
+            storage.save()
+        elapsed = time.perf_counter() - start
+        cleanup("single")
+        print(f"one at a time : {args.users / elapsed:8.1f} users/sec")
+
+        # larger intakes are registered in requests of MAX_BULK_USERS
+        bulk_records = records("bulk")
+        created = 0
+        start = time.perf_counter()
+        for index in range(0, len(bulk_records), MAX_BULK_USERS):
+            result = BulkUserRegistration(
+                bulk_records[index:index + MAX_BULK_USERS]
+            ).run()
+            created += result["created"]
+        elapsed = time.perf_counter() - start
+        cleanup("bulk")
+        assert created == args.users, created
+        print(f"bulk          : {args.users / elapsed:8.1f} users/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks response compression on a course listing.
+
+Builds a JSON listing of courses shaped like get_course_dict, with
+2000-character outlines, and reports for each encoding the bytes saved
+and the CPU time spent per response.
+
+Usage (from backend/, with the usual .env):
+    python -m benchmarks.bench_compression [--courses 200]
+        [--requests 50]
+"""
+
+from uuid import uuid4
+import argparse
+import json
+import random
+import time
+
+from api.v1.utils import compression
+
+
+WORDS = (
+    "analysis design of systems engineering principles fluid mechanics"
+    " thermodynamics circuits signals control materials structures"
+    " laboratory practical introduction advanced theory applications"
+    " students will learn the fundamentals methods and their use in"
+).split()
+
+
+def course_listing(courses: int) -> bytes:
+    """Return a JSON listing of made up courses."""
+    rng = random.Random(0)
+    listing = []
+    for index in range(courses):
+        outline = ""
+        while len(outline) < 2000:
+            outline += rng.choice(WORDS) + " "
+        listing.append({
+            "id": str(uuid4()),
+            "course_code": f"CVE{index:03d}",
+            "title": " ".join(rng.choices(WORDS, k=5)),
+            "outline": outline[:2000],
+            "semester": rng.choice(["first", "second"]),
+            "credit_load": rng.randint(1, 4),
+            "is_active": True,
+            "level": 100 * rng.randint(1, 5),
+            "level_id": str(uuid4()),
+            "admin_id": str(uuid4()),
+            "num_of_files_in_course": rng.randint(0, 40),
+            "departments": ["civil engineering"],
+            "added_by": "admin@gmail.com",
+            "created_at": "2025-10-01T12:00:00.000000",
+            "updated_at": "2025-10-01T12:00:00.000000",
+        })
+    return json.dumps(listing).encode("utf-8")
+
+
+def run(body: bytes, encoding: str, cached: bool, requests: int) -> None:
+    """Compress body requests times and print the results."""
+    start = time.process_time()
+    for _ in range(requests):
+        compressed = compression.compress(body, encoding, cached=cached)
+    cpu_ms = (time.process_time() - start) * 1000 / requests
+
+    saved = 1 - len(compressed) / len(body)
+    label = f"{encoding}{' (cached)' if cached else ''}"
+    print(
+        f"{label:<13}: {len(compressed):>9} bytes, {saved:6.1%} saved,"
+        f" {cpu_ms:7.2f} ms CPU per response"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    body = course_listing(args.courses)
+    print(f"{args.courses} courses, {len(body)} bytes uncompressed")
+
+    for encoding in compression.supported_encodings():
+        run(body, encoding, False, args.requests)
+        if encoding == "br":
+            run(body, encoding, True, max(1, args.requests // 10))
+    if not compression.brotli:
+        print("brotli is not installed, only gzip was measured")
+
+
+if __name__ == "__main__":
+    main()
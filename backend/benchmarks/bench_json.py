@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks JSON serialization of course and file listings.
+
+Serializes 1000 course dicts and 1000 file dicts, shaped like the
+responses of get_course_dict and get_file_dict and holding datetimes
+and enums as BaseModel.to_dict returns them, with the stdlib encoder
+and with orjson when it is installed.
+
+Usage (from backend/, with the usual .env):
+    python -m benchmarks.bench_json [--rows 1000] [--repeat 20]
+"""
+
+from datetime import datetime
+from flask import Flask
+from typing import Any
+from uuid import uuid4
+import argparse
+import time
+
+from api.v1.utils import json_provider
+from api.v1.utils.json_provider import JSONProvider
+from models.course import Semester
+from models.file import FileStatus
+
+
+def course_dicts(rows: int) -> list[dict[str, Any]]:
+    """Return made up course dicts."""
+    return [
+        {
+            "id": str(uuid4()),
+            "course_code": f"CVE{index % 1000:03d}",
+            "title": "Fluid mechanics and hydraulics",
+            "outline": "Properties of fluids, statics and dynamics. " * 40,
+            "semester": Semester.first,
+            "credit_load": 3,
+            "is_active": True,
+            "level": 300,
+            "level_id": str(uuid4()),
+            "admin_id": str(uuid4()),
+            "num_of_files_in_course": index % 40,
+            "departments": ["civil engineering", "mechanical engineering"],
+            "added_by": "admin@gmail.com",
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        }
+        for index in range(rows)
+    ]
+
+
+def file_dicts(rows: int) -> list[dict[str, Any]]:
+    """Return made up file dicts."""
+    return [
+        {
+            "id": str(uuid4()),
+            "file_name": f"past-questions-{index}.pdf",
+            "file_type": "pdf",
+            "file_size": 1024 * index,
+            "status": FileStatus.approved,
+            "course": "CVE301",
+            "course_id": str(uuid4()),
+            "user_id": str(uuid4()),
+            "admin_id": str(uuid4()),
+            "added_by": "student@gmail.com",
+            "approved_by": "admin@gmail.com",
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        }
+        for index in range(rows)
+    ]
+
+
+def run(provider: JSONProvider, data: Any, repeat: int) -> float:
+    """Return the milliseconds taken to serialize data."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        provider.dumps_bytes(data)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    provider = JSONProvider(app)
+    orjson = json_provider.orjson
+    print(f"{args.rows} rows, mean of {args.repeat} runs")
+
+    for name, data in (
+        ("courses", course_dicts(args.rows)),
+        ("files", file_dicts(args.rows)),
+    ):
+        json_provider.orjson = None
+        stdlib_ms = run(provider, data, args.repeat)
+        print(f"{name:<8} json   : {stdlib_ms:8.2f} ms")
+
+        json_provider.orjson = orjson
+        if orjson is None:
+            print("orjson is not installed")
+            continue
+        orjson_ms = run(provider, data, args.repeat)
+        print(
+            f"{name:<8} orjson : {orjson_ms:8.2f} ms"
+            f" ({stdlib_ms / orjson_ms:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the password check done on every login.
+
+Reports logins/sec on the request thread and through the bcrypt process
+pool, and the throughput per CPU core.
+
+Usage (from backend/, with the usual .env):
+    python -m benchmarks.bench_login [--rounds 12] [--logins 200]
+        [--threads 8] [--pool-size N]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import time
+
+from api.v1.auth.password_hashing import PasswordHasher
+
+
+def run(hasher: PasswordHasher, logins: int, threads: int) -> float:
+    """
+    Check the password of logins users from threads concurrent request
+    threads and return the logins per second.
+    """
+    pw_hash = hasher.generate_password_hash("Password1234")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(
+            lambda _: hasher.check_password_hash(pw_hash, "Password1234"),
+            range(logins),
+        ))
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    return logins / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"bcrypt cost {args.rounds}, {args.logins} logins, {cores} cores")
+
+    inline = PasswordHasher(rounds=args.rounds, pool_size=0)
+    rate = run(inline, args.logins, args.threads)
+    print(f"request thread : {rate:8.1f} logins/sec")
+
+    pooled = PasswordHasher(
+        rounds=args.rounds,
+        pool_size=args.pool_size,
+        max_pending=args.threads,
+        queue_timeout=60,
+    )
+    rate = run(pooled, args.logins, args.threads)
+    print(
+        f"process pool   : {rate:8.1f} logins/sec"
+        f" ({rate / min(args.pool_size, cores):.1f} per core,"
+        f" {args.pool_size} workers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
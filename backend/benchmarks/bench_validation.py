@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks request validation of course payloads.
+
+Validates 10k CourseCreate payloads three ways:
+    - before: a model lowercasing its input in a Python
+      model_validator, dumped twice per payload, as requests were
+      validated before,
+    - one by one: CourseCreate, lowercased by pydantic, dumped once,
+      as validate_request_data does,
+    - in bulk: validate_many on the whole list.
+
+Usage (from backend/, with the usual .env):
+    python -m benchmarks.bench_validation [--payloads 10000] [--repeat 5]
+"""
+
+from pydantic import model_validator
+from typing import Any, Callable
+import argparse
+import time
+
+from api.v1.utils.data_validations import CourseCreate, validate_many
+
+
+class LegacyCourseCreate(CourseCreate):
+    """CourseCreate lowercasing its input in Python."""
+
+    @model_validator(mode="before")
+    @classmethod
+    def set_to_lowercase(cls, request_data: Any):
+        for attr, value in request_data.items():
+            if isinstance(value, str):
+                request_data[attr] = value.lower()
+        return request_data
+
+
+def payloads(count: int) -> list[dict[str, Any]]:
+    """Return count valid course payloads in mixed case."""
+    return [
+        {
+            "course_code": f"CVE{index % 1000:03d}",
+            "semester": "First",
+            "credit_load": 3,
+            "title": "Fluid Mechanics",
+            "outline": "Properties of Fluids, Statics and Dynamics. " * 10,
+            "level_id": "0b0c8a4e-4a8e-4b8e-9a4e-0b0c8a4e4a8e",
+        }
+        for index in range(count)
+    ]
+
+
+def before(records: list[dict[str, Any]]) -> None:
+    for record in records:
+        valid = LegacyCourseCreate(**dict(record))
+        valid.model_dump(exclude_none=True)
+        valid.model_dump(exclude_unset=True)
+
+
+def one_by_one(records: list[dict[str, Any]]) -> None:
+    for record in records:
+        CourseCreate.model_validate(record).model_dump(exclude_unset=True)
+
+
+def in_bulk(records: list[dict[str, Any]]) -> None:
+    valid, errors = validate_many(CourseCreate, records, exclude_unset=True)
+    assert len(valid) == len(records) and not errors
+
+
+def run(
+    name: str, validate: Callable[..., None], records: list, repeat: int
+) -> float:
+    """Print and return the best rate of payloads validated per second."""
+    rate = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validate(records)
+        rate = max(rate, len(records) / (time.perf_counter() - start))
+    print(f"{name:<11}: {rate:10.0f} payloads/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payloads", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = payloads(args.payloads)
+    print(f"{args.payloads} CourseCreate payloads")
+    baseline = run("before", before, records, args.repeat)
+    for name, validate in (("one by one", one_by_one), ("in bulk", in_bulk)):
+        rate = run(name, validate, records, args.repeat)
+        print(f"{'':<11}  {rate / baseline:.1f}x the previous rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Load tests the API with a realistic mix of student and admin traffic,
+reporting p50/p95/p99 latency and requests per second per route.
+
+1. Start the S3 stand-in, and the API pointed at it and at a database
+   it may fill (any database the models support):
+
+    python -m benchmarks.loadtest s3 --port 9000
+    AWS_ENDPOINT_URL_S3=http://localhost:9000 BCRYPT_LOG_ROUNDS=12 \\
+        gunicorn -w 2 -k gthread -b :8000 api.v1.app:app
+
+2. Seed the database, with the environment of the API:
+
+    AWS_ENDPOINT_URL_S3=http://localhost:9000 \\
+        python -m benchmarks.loadtest seed --courses 200 --files 5000
+
+3. Replay the traffic, saving the results as the baseline of later
+   runs or comparing them with it:
+
+    python -m benchmarks.loadtest run --url http://localhost:8000/api/v1 \\
+        --workers 50 --duration 60 --save baseline.json
+    python -m benchmarks.loadtest run ... --baseline baseline.json
+
+   With --baseline, the exit status is 1 when a route's p95 latency
+   exceeds the baseline by more than --tolerance, or its error rate
+   grew, so a deploy can be gated on it.
+
+4. Delete what was seeded:
+
+    python -m benchmarks.loadtest cleanup
+
+Uploads go wherever the API stores files: never run this against an
+API using the real bucket.
+"""
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Command line of the load tests, see benchmarks.loadtest.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from benchmarks.loadtest import __doc__ as usage
+from benchmarks.loadtest.seed import (
+    cleanup,
+    load_manifest,
+    save_manifest,
+    seed,
+)
+
+
+DEFAULT_MANIFEST = "/tmp/unibenengvault_loadtest.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=usage,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--manifest",
+        default=DEFAULT_MANIFEST,
+        help=f"seeded data, written by seed (default {DEFAULT_MANIFEST})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    s3 = commands.add_parser("s3", help="run the S3 stand-in")
+    s3.add_argument("--host", default="127.0.0.1")
+    s3.add_argument("--port", type=int, default=9000)
+
+    seed_parser = commands.add_parser("seed", help="seed the database")
+    seed_parser.add_argument("--departments", type=int, default=5)
+    seed_parser.add_argument("--levels", type=int, default=5)
+    seed_parser.add_argument("--courses", type=int, default=200)
+    seed_parser.add_argument("--students", type=int, default=200)
+    seed_parser.add_argument("--admins", type=int, default=5)
+    seed_parser.add_argument("--files", type=int, default=5000)
+    seed_parser.add_argument("--approved-ratio", type=float, default=0.8)
+    seed_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="replay the traffic")
+    run_parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    run_parser.add_argument("--workers", type=int, default=50)
+    run_parser.add_argument(
+        "--admins", type=int, default=2, help="workers moderating files"
+    )
+    run_parser.add_argument("--duration", type=float, default=60)
+    run_parser.add_argument("--warmup", type=float, default=5)
+    run_parser.add_argument("--ramp-up", type=float, default=5)
+    run_parser.add_argument(
+        "--think", type=float, default=0,
+        help="mean seconds between the requests of a user",
+    )
+    run_parser.add_argument("--upload-kb", type=int, default=256)
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--save", help="write the results as JSON")
+    run_parser.add_argument("--baseline", help="results to compare with")
+    run_parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="p95 increase over the baseline allowed (default 0.25)",
+    )
+
+    commands.add_parser("cleanup", help="delete the seeded data")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "s3":
+        from benchmarks.loadtest.s3_stub import main as serve_s3
+
+        sys.argv = [sys.argv[0], "--host", args.host, "--port", str(args.port)]
+        serve_s3()
+    elif args.command == "seed":
+        manifest = seed(
+            departments=args.departments,
+            levels=args.levels,
+            courses=args.courses,
+            students=args.students,
+            admins=args.admins,
+            files=args.files,
+            approved_ratio=args.approved_ratio,
+            random_seed=args.seed,
+        )
+        save_manifest(manifest, args.manifest)
+        print(
+            f"Seeded {args.courses} courses, {args.files} files and"
+            f" {args.students + args.admins} users into {args.manifest}"
+        )
+    elif args.command == "cleanup":
+        cleanup(load_manifest(args.manifest))
+        print("Deleted the seeded data")
+    else:
+        from benchmarks.loadtest.runner import (
+            find_regressions,
+            format_results,
+            run,
+        )
+
+        options = vars(args)
+        recorder = run(load_manifest(args.manifest), options)
+        results = recorder.results()
+        print(format_results(results))
+        if args.save:
+            with open(args.save, "w") as results_file:
+                json.dump(results, results_file, indent=2)
+        if args.baseline:
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = find_regressions(results, baseline, args.tolerance)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+
+"""
+Replays a mix of student and admin traffic against a running API and
+reports the latency percentiles and throughput of every route.
+
+Every worker thread logs in as a seeded user over a keep-alive
+connection of its own, then picks weighted tasks until the run ends,
+revalidating cached responses with If-None-Match as browsers do.
+Students browse the catalogue, list and open files and upload some.
+Admins moderate the pending files.
+"""
+
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable
+from urllib.parse import urlencode, urlsplit
+from uuid import uuid4
+import json
+import math
+import random
+import threading
+import time
+
+
+LOGIN = "POST /auth_session/login"
+UPLOAD_BOUNDARY = "loadtest-boundary"
+
+
+def percentile(latencies: list[float], p: float) -> float:
+    """Return the p-th percentile of sorted latencies, by nearest rank."""
+    if not latencies:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(latencies)), 1)
+    return latencies[rank - 1]
+
+
+class Recorder:
+    """Collects the latency and outcome of every request by route."""
+
+    def __init__(self) -> None:
+        """Initialize an empty recorder, not recording yet."""
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.recording = False
+        self.started_at = self.stopped_at = 0.0
+        self.__lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start recording, e.g. once warmed up."""
+        self.started_at = time.perf_counter()
+        self.recording = True
+
+    def stop(self) -> None:
+        """Stop recording."""
+        self.recording = False
+        self.stopped_at = time.perf_counter()
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        """Record a request to route."""
+        if not self.recording:
+            return
+        with self.__lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def results(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the count, errors, requests per second and latency
+        percentiles in milliseconds of every route.
+        """
+        duration = max(self.stopped_at - self.started_at, 1e-9)
+        results: dict[str, dict[str, float]] = {}
+        with self.__lock:
+            for route, latencies in sorted(self.latencies.items()):
+                latencies = sorted(latencies)
+                results[route] = {
+                    "count": len(latencies),
+                    "errors": self.errors.get(route, 0),
+                    "rps": len(latencies) / duration,
+                    "p50": percentile(latencies, 50) * 1000,
+                    "p95": percentile(latencies, 95) * 1000,
+                    "p99": percentile(latencies, 99) * 1000,
+                    "max": latencies[-1] * 1000,
+                }
+        return results
+
+
+class Client:
+    """An API client over one keep-alive connection."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float):
+        """Initialize a client of the API at base_url."""
+        url = urlsplit(base_url)
+        self.connection_cls = (
+            HTTPSConnection if url.scheme == "https" else HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip("/") or "/api/v1"
+        self.recorder = recorder
+        self.timeout = timeout
+        self.cookie: str | None = None
+        self.etags: dict[str, str] = {}
+        self.connection: HTTPConnection | None = None
+
+    def request(
+        self,
+        route: str,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        expected: tuple[int, ...] = (200,),
+    ) -> tuple[int, bytes]:
+        """
+        Sends a request, recording it under route, and returns the
+        status and body of the response, status 0 if none came.
+        GET requests revalidate the response last received.
+        """
+        path = self.prefix + path
+        headers = dict(headers or {})
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        if method == "GET" and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+            expected += (304,)
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = self.connection_cls(
+                    self.netloc, timeout=self.timeout
+                )
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, HTTPException):
+            self.recorder.record(route, time.perf_counter() - start, False)
+            self.close()
+            return 0, b""
+        self.recorder.record(
+            route, time.perf_counter() - start, response.status in expected
+        )
+
+        etag = response.getheader("ETag")
+        if method == "GET" and etag:
+            self.etags[path] = etag
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie:
+            self.cookie = set_cookie.split(";", 1)[0]
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        return response.status, data
+
+    def get_json(self, route: str, path: str, **params: Any) -> Any:
+        """Send a GET request, returning its JSON body if it had one."""
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        status, data = self.request(route, "GET", path)
+        if status != 200:
+            return None
+        return json.loads(data)
+
+    def send_json(self, route: str, method: str, path: str, obj: Any):
+        """Send obj as JSON."""
+        return self.request(
+            route,
+            method,
+            path,
+            json.dumps(obj).encode("utf-8"),
+            {"Content-Type": "application/json"},
+            expected=(200, 201),
+        )
+
+    def login(self, email: str, password: str) -> bool:
+        """Log in, keeping the session cookie."""
+        self.cookie = None
+        self.etags.clear()
+        status, _ = self.send_json(
+            LOGIN, "POST", "/auth_session/login",
+            {"email": email, "password": password},
+        )
+        return status == 200
+
+    def close(self) -> None:
+        """Close the connection, reopened by the next request."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def multipart_body(fields: dict[str, str], filename: str, content: bytes):
+    """Return a multipart/form-data body with fields and a file."""
+    parts = [
+        (
+            f"--{UPLOAD_BOUNDARY}\r\n"
+            f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+            f"{value}\r\n"
+        ).encode("utf-8")
+        for name, value in fields.items()
+    ]
+    parts.append((
+        f"--{UPLOAD_BOUNDARY}\r\n"
+        f"Content-Disposition: form-data; name=\"file\";"
+        f" filename=\"{filename}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode("utf-8") + content + b"\r\n")
+    parts.append(f"--{UPLOAD_BOUNDARY}--\r\n".encode("utf-8"))
+    return b"".join(parts)
+
+
+class Session:
+    """
+    The traffic of one user. Subclasses list their tasks, with their
+    relative weights, in TASKS.
+    """
+
+    TASKS: tuple[tuple[str, int], ...] = ()
+
+    def __init__(
+        self,
+        client: Client,
+        manifest: dict[str, Any],
+        email: str,
+        rng: random.Random,
+        options: dict[str, Any],
+    ) -> None:
+        """Initialize the session of the user with email."""
+        self.client = client
+        self.manifest = manifest
+        self.email = email
+        self.rng = rng
+        self.options = options
+        names, weights = zip(*self.TASKS)
+        self.tasks: list[Callable[[], None]] = [
+            getattr(self, name) for name in names
+        ]
+        self.weights = weights
+
+    def login(self) -> None:
+        """Log in again, as users do when their session ends."""
+        self.client.login(self.email, self.manifest["password"])
+
+    def step(self) -> None:
+        """Carry out one task picked by weight."""
+        self.rng.choices(self.tasks, self.weights)[0]()
+
+
+class StudentSession(Session):
+    """Browses the catalogue and files, and uploads now and then."""
+
+    TASKS = (
+        ("browse_catalogue", 30),
+        ("list_course_files", 25),
+        ("open_file", 20),
+        ("list_departments", 10),
+        ("course_stats", 5),
+        ("upload_file", 5),
+        ("login", 5),
+    )
+
+    def browse_catalogue(self) -> None:
+        """List the courses of a department and level."""
+        department_id, level_id = self.rng.choice(self.manifest["catalogue"])
+        self.client.get_json(
+            "GET /departments/<department_id>/levels/<level_id>/courses",
+            f"/departments/{department_id}/levels/{level_id}/courses",
+        )
+
+    def list_course_files(self) -> None:
+        """List the files of a course, sometimes filtered or paged."""
+        course_id = self.rng.choice(self.manifest["course_ids"])
+        route = "GET /courses/<course_id>/files"
+        params: dict[str, Any] = {}
+        if self.rng.random() < 0.3:
+            params["file_type"] = self.rng.choice(self.manifest["file_types"])
+        page = self.client.get_json(
+            route, f"/courses/{course_id}/files", **params
+        )
+        if page and page.get("next_cursor") and self.rng.random() < 0.3:
+            params["cursor"] = page["next_cursor"]
+            self.client.get_json(
+                route, f"/courses/{course_id}/files", **params
+            )
+
+    def open_file(self) -> None:
+        """Get the details and download URL of a file."""
+        file_id = self.rng.choice(self.manifest["file_ids"])
+        self.client.get_json("GET /files/<file_id>", f"/files/{file_id}")
+
+    def list_departments(self) -> None:
+        """List the departments."""
+        self.client.get_json("GET /departments", "/departments")
+
+    def course_stats(self) -> None:
+        """Get the file statistics of a course."""
+        course_id = self.rng.choice(self.manifest["course_ids"])
+        self.client.get_json(
+            "GET /courses/<course_id>/stats", f"/courses/{course_id}/stats"
+        )
+
+    def upload_file(self) -> None:
+        """Upload a file for review."""
+        fields = {
+            "course_id": self.rng.choice(self.manifest["course_ids"]),
+            "file_type": "past question",
+            "session": "2023/2024",
+        }
+        size = self.options["upload_kb"] * 1024
+        content = b"%PDF-1.4\n" + b"0" * max(size - 9, 0)
+        self.client.request(
+            "POST /files",
+            "POST",
+            "/files",
+            multipart_body(fields, f"loadtest-{uuid4().hex}.pdf", content),
+            {
+                "Content-Type":
+                    f"multipart/form-data; boundary={UPLOAD_BOUNDARY}",
+            },
+            expected=(201,),
+        )
+
+
+class AdminSession(Session):
+    """Moderates the pending files."""
+
+    TASKS = (
+        ("moderate_files", 60),
+        ("list_notifications", 25),
+        ("login", 15),
+    )
+
+    def moderate_files(self) -> None:
+        """List pending files and approve or reject one of them."""
+        files = self.client.get_json(
+            "GET /files",
+            "/files",
+            file_status="pending",
+            page_size=20,
+            page_num=1,
+        )
+        if not files:
+            return
+
+        file = self.rng.choice(files)
+        if self.rng.random() < 0.8:
+            review = {"status": "approved"}
+        else:
+            review = {
+                "status": "rejected",
+                "rejection_reason": "Not course material.",
+            }
+        self.client.send_json(
+            "PUT /files/<file_id>", "PUT", f"/files/{file['id']}", review
+        )
+
+    def list_notifications(self) -> None:
+        """Read the latest notifications."""
+        self.client.get_json("GET /notifications", "/notifications")
+
+
+def worker(
+    index: int,
+    manifest: dict[str, Any],
+    recorder: Recorder,
+    options: dict[str, Any],
+    deadline: float,
+) -> None:
+    """
+    Runs the session of one user until deadline: the admin sessions
+    first, then students.
+    """
+    rng = random.Random(options["seed"] + index)
+    client = Client(options["url"], recorder, options["timeout"])
+    if index < options["admins"]:
+        admins = manifest["admins"]
+        session: Session = AdminSession(
+            client, manifest, admins[index % len(admins)], rng, options
+        )
+    else:
+        students = manifest["students"]
+        session = StudentSession(
+            client, manifest, students[index % len(students)], rng, options
+        )
+
+    time.sleep(options["ramp_up"] * index / options["workers"])
+    session.login()
+    while time.perf_counter() < deadline:
+        session.step()
+        if options["think"]:
+            time.sleep(rng.uniform(0, 2 * options["think"]))
+    client.close()
+
+
+def run(manifest: dict[str, Any], options: dict[str, Any]) -> Recorder:
+    """
+    Runs options["workers"] sessions for options["duration"] seconds
+    after options["warmup"] seconds, and returns their recordings.
+    """
+    recorder = Recorder()
+    start = time.perf_counter()
+    warmed_up = start + options["ramp_up"] + options["warmup"]
+    deadline = warmed_up + options["duration"]
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(index, manifest, recorder, options, deadline),
+            name=f"loadtest-{index}",
+            daemon=True,
+        )
+        for index in range(options["workers"])
+    ]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(max(warmed_up - time.perf_counter(), 0))
+    recorder.start()
+    time.sleep(max(deadline - time.perf_counter(), 0))
+    recorder.stop()
+    for thread in threads:
+        thread.join(options["timeout"])
+    return recorder
+
+
+def format_results(results: dict[str, dict[str, float]]) -> str:
+    """Return the results as a table, one route per line."""
+    lines = [
+        f"{'route':<62} {'count':>7} {'errors':>6} {'rps':>8}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    ]
+    for route, result in results.items():
+        lines.append(
+            f"{route:<62} {result['count']:>7} {result['errors']:>6}"
+            f" {result['rps']:>8.1f} {result['p50']:>8.1f}"
+            f" {result['p95']:>8.1f} {result['p99']:>8.1f}"
+            f" {result['max']:>8.1f}"
+        )
+    total = sum(result["count"] for result in results.values())
+    errors = sum(result["errors"] for result in results.values())
+    rps = sum(result["rps"] for result in results.values())
+    lines.append(f"{'total':<62} {total:>7} {errors:>6} {rps:>8.1f}")
+    return "\n".join(lines)
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    min_count: int = 20,
+) -> list[str]:
+    """
+    Returns a description of every route whose p95 latency exceeds its
+    baseline by more than tolerance, or whose error rate grew. Routes
+    with fewer than min_count requests in either run are skipped.
+    """
+    regressions = []
+    for route, result in results.items():
+        base = baseline.get(route)
+        if not base or min(result["count"], base["count"]) < min_count:
+            continue
+        if result["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{route}: p95 {result['p95']:.1f} ms,"
+                f" baseline {base['p95']:.1f} ms"
+            )
+        error_rate = result["errors"] / result["count"]
+        base_error_rate = base["errors"] / base["count"]
+        if error_rate > base_error_rate + 0.01:
+            regressions.append(
+                f"{route}: {error_rate:.1%} errors,"
+                f" baseline {base_error_rate:.1%}"
+            )
+    return regressions
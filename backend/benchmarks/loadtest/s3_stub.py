@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+A local stand-in for S3, so uploads and moderation can be load tested
+without an AWS account and without S3 latency in the results.
+
+It keeps objects in memory and implements the calls the API makes:
+PutObject, CopyObject, GetObject, HeadObject, DeleteObject and
+DeleteObjects, with path-style or virtual-hosted bucket addressing.
+Requests are not authenticated.
+
+Point the API at it with AWS_ENDPOINT_URL_S3, which boto3 reads:
+
+    python -m benchmarks.loadtest.s3_stub [--port 9000]
+    AWS_ENDPOINT_URL_S3=http://localhost:9000 gunicorn ...
+"""
+
+from datetime import datetime, timezone
+from email.utils import formatdate
+from hashlib import md5
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+import argparse
+import threading
+
+
+S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class ObjectStore:
+    """Objects by bucket and key, shared by the request threads."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+        self.lock = threading.Lock()
+
+    def put(self, bucket: str, key: str, body: bytes, content_type: str):
+        """Store an object."""
+        with self.lock:
+            self.objects[(bucket, key)] = (body, content_type)
+
+    def get(self, bucket: str, key: str) -> tuple[bytes, str] | None:
+        """Return the body and content type of an object, if any."""
+        with self.lock:
+            return self.objects.get((bucket, key))
+
+    def delete(self, bucket: str, key: str) -> None:
+        """Delete an object, if it exists."""
+        with self.lock:
+            self.objects.pop((bucket, key), None)
+
+
+def decode_aws_chunked(body: bytes) -> bytes:
+    """
+    Returns the payload of an aws-chunked body, as botocore sends
+    streamed uploads with a trailing checksum.
+    """
+    payload = bytearray()
+    position = 0
+    while True:
+        line_end = body.index(b"\r\n", position)
+        size = int(body[position:line_end].split(b";", 1)[0], 16)
+        if size == 0:
+            return bytes(payload)
+        start = line_end + 2
+        payload += body[start:start + size]
+        position = start + size + 2
+
+
+class S3StubHandler(BaseHTTPRequestHandler):
+    """Handles the S3 requests of one connection."""
+
+    protocol_version = "HTTP/1.1"
+    store = ObjectStore()
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not log every request."""
+
+    def parse_target(self) -> tuple[str, str, dict[str, list[str]]]:
+        """Return the bucket, key and query of the request."""
+        url = urlsplit(self.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        path = unquote(url.path).lstrip("/")
+
+        host = self.headers.get("Host", "").split(":", 1)[0]
+        # virtual-hosted style: <bucket>.localhost
+        if host.count(".") and not host.replace(".", "").isdigit():
+            return host.split(".", 1)[0], path, query
+        bucket, _, key = path.partition("/")
+        return bucket, key, query
+
+    def read_body(self) -> bytes:
+        """Return the request body, decoding its transfer encodings."""
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";", 1)[0], 16)
+                if size == 0:
+                    # trailers, up to the empty line
+                    while self.rfile.readline() not in (b"\r\n", b""):
+                        pass
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            body = bytes(body)
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if "aws-chunked" in self.headers.get("Content-Encoding", ""):
+            return decode_aws_chunked(body)
+        return body
+
+    def send(
+        self,
+        status: int,
+        body: bytes = b"",
+        content_type: str = "application/xml",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Send a response, keeping the connection open."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_error_xml(self, status: int, code: str, key: str = "") -> None:
+        """Send an S3 error response."""
+        body = (
+            f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+            f"<Error><Code>{code}</Code><Key>{key}</Key></Error>"
+        )
+        self.send(status, body.encode("utf-8"))
+
+    def do_PUT(self) -> None:
+        """PutObject, CopyObject, or CreateBucket without a key."""
+        bucket, key, _ = self.parse_target()
+        body = self.read_body()
+        if not key:
+            self.send(200)
+            return
+
+        copy_source = self.headers.get("x-amz-copy-source")
+        if copy_source:
+            source_bucket, _, source_key = (
+                unquote(copy_source).lstrip("/").partition("/")
+            )
+            source = self.store.get(source_bucket, source_key)
+            if source is None:
+                self.send_error_xml(404, "NoSuchKey", source_key)
+                return
+            self.store.put(bucket, key, *source)
+            etag = md5(source[0]).hexdigest()
+            modified = datetime.now(timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z"
+            )
+            result = (
+                f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+                f"<CopyObjectResult><LastModified>{modified}</LastModified>"
+                f"<ETag>\"{etag}\"</ETag></CopyObjectResult>"
+            )
+            self.send(200, result.encode("utf-8"))
+            return
+
+        content_type = self.headers.get(
+            "Content-Type", "application/octet-stream"
+        )
+        self.store.put(bucket, key, body, content_type)
+        self.send(200, headers={"ETag": f"\"{md5(body).hexdigest()}\""})
+
+    def do_GET(self) -> None:
+        """GetObject."""
+        bucket, key, _ = self.parse_target()
+        obj = self.store.get(bucket, key)
+        if obj is None:
+            self.send_error_xml(404, "NoSuchKey", key)
+            return
+        body, content_type = obj
+        self.send(200, body, content_type, {
+            "ETag": f"\"{md5(body).hexdigest()}\"",
+            "Last-Modified": formatdate(usegmt=True),
+        })
+
+    def do_HEAD(self) -> None:
+        """HeadObject, or HeadBucket without a key."""
+        bucket, key, _ = self.parse_target()
+        if not key:
+            self.send(200)
+            return
+        self.do_GET()
+
+    def do_DELETE(self) -> None:
+        """DeleteObject."""
+        bucket, key, _ = self.parse_target()
+        self.read_body()
+        self.store.delete(bucket, key)
+        self.send(204)
+
+    def do_POST(self) -> None:
+        """DeleteObjects."""
+        bucket, _, query = self.parse_target()
+        body = self.read_body()
+        if "delete" not in query:
+            self.send_error_xml(501, "NotImplemented")
+            return
+
+        deleted = []
+        for element in ElementTree.fromstring(body).iter():
+            if element.tag.rsplit("}", 1)[-1] == "Key" and element.text:
+                self.store.delete(bucket, element.text)
+                deleted.append(element.text)
+        result = "".join(
+            f"<Deleted><Key>{key}</Key></Deleted>" for key in deleted
+        )
+        self.send(200, (
+            f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+            f"<DeleteResult xmlns=\"{S3_NAMESPACE}\">{result}</DeleteResult>"
+        ).encode("utf-8"))
+
+
+def serve(host: str = "127.0.0.1", port: int = 9000) -> ThreadingHTTPServer:
+    """
+    Starts the stand-in in a background thread and returns its server.
+    Call shutdown() on it to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), S3StubHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="s3-stub", daemon=True
+    ).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), S3StubHandler)
+    server.daemon_threads = True
+    print(f"S3 stand-in on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+"""
+Seeds the database the API uses with departments, levels, courses,
+users and files for a load test, through the models, and writes a
+manifest of what the traffic can reference. Everything seeded is named
+after PREFIX and deleted again by cleanup().
+
+When AWS_ENDPOINT_URL_S3 is set, an object is stored for every file,
+so that approving a seeded file can copy it. Objects are never written
+to AWS itself.
+
+Usage (from backend/, with the environment of the API):
+    python -m benchmarks.loadtest seed [--courses 200] [--files 5000] ...
+    python -m benchmarks.loadtest cleanup
+"""
+
+from datetime import datetime, timedelta
+from typing import Any
+import json
+import logging
+import os
+import random
+
+
+logger = logging.getLogger(__name__)
+PREFIX = "loadtest"
+PASSWORD = "Loadtest1234"
+EMAIL_DOMAIN = "loadtest.example.com"
+FILE_TYPES = ("lecture material", "note", "past question")
+FILE_EXTENSIONS = (".pdf", ".docx", ".pptx")
+CHUNK_SIZE = 1000
+
+
+def store_objects(paths: list[str]) -> None:
+    """Stores a small object at every path in the local S3 stand-in."""
+    from api.v1.utils.file_utils import AWS_S3_BUCKET, FileUpload
+
+    s3 = FileUpload.s3
+    for path in paths:
+        s3.put_object(
+            Bucket=AWS_S3_BUCKET,
+            Key=path,
+            Body=b"%PDF-1.4 loadtest",
+            ContentType="application/pdf",
+        )
+
+
+def seed(
+    departments: int = 5,
+    levels: int = 5,
+    courses: int = 200,
+    students: int = 200,
+    admins: int = 5,
+    files: int = 5000,
+    approved_ratio: float = 0.8,
+    random_seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Seeds the database and returns the manifest of the load test.
+    Levels named 100, 200... are reused if they exist.
+    """
+    from api.v1.auth.password_hashing import password_hasher
+    from models import storage
+    from models.admin import Admin
+    from models.course import Course
+    from models.department import Department
+    from models.file import File
+    from models.level import Level
+    from models.user import User
+
+    rng = random.Random(random_seed)
+    pw_hash = password_hasher.generate_password_hash(PASSWORD)
+    created: dict[str, list[str]] = {"levels": []}
+
+    level_names = [100 * (index + 1) for index in range(levels)]
+    level_objs = {
+        level.level_name: level
+        for level in storage.get_by_values(Level, level_name=level_names)
+    }
+    for level_name in level_names:
+        if level_name not in level_objs:
+            level_objs[level_name] = Level(level_name=level_name)
+            created["levels"].append(level_objs[level_name].id)
+    level_list = [level_objs[name] for name in level_names]
+
+    department_list = [
+        Department(
+            dept_name=f"{PREFIX} department {index}",
+            dept_code=f"{PREFIX[:2]}{index}",
+            faculty_name=f"{PREFIX} faculty",
+        )
+        for index in range(departments)
+    ]
+    admin_users = [
+        User(
+            email=f"{PREFIX}-admin{index}@{EMAIL_DOMAIN}",
+            password=pw_hash,
+            is_admin=True,
+        )
+        for index in range(admins)
+    ]
+    admin_list = [Admin(user_id=user.id) for user in admin_users]
+    student_list = [
+        User(
+            email=f"{PREFIX}-student{index}@{EMAIL_DOMAIN}",
+            password=pw_hash,
+            department_id=department_list[index % departments].id,
+            level_id=level_list[index % levels].id,
+        )
+        for index in range(students)
+    ]
+    storage.save()
+
+    course_list = []
+    catalogue: set[tuple[str, str]] = set()
+    for index in range(courses):
+        department = department_list[index % departments]
+        level = level_list[(index // departments) % levels]
+        course = Course(
+            course_code=f"{PREFIX[:2]}{index:04d}",
+            semester=rng.choice(("first", "second")),
+            credit_load=rng.randint(1, 4),
+            title=f"{PREFIX} course {index}",
+            outline=f"Outline of {PREFIX} course {index}. " * 20,
+            level_id=level.id,
+            admin_id=rng.choice(admin_list).id,
+            path_bucket=department.dept_name.replace(" ", "-"),
+        )
+        course.departments.append(department)
+        course_list.append(course)
+        catalogue.add((department.id, level.id))
+    storage.save()
+
+    now = datetime.now()
+    file_ids: list[str] = []
+    paths: list[str] = []
+    for start in range(0, files, CHUNK_SIZE):
+        chunk = []
+        for index in range(start, min(start + CHUNK_SIZE, files)):
+            course = rng.choice(course_list)
+            file_type = rng.choice(FILE_TYPES)
+            file_ext = rng.choice(FILE_EXTENSIONS)
+            year = rng.randint(2015, 2024)
+            temp_filepath = (
+                f"temp/{PREFIX}/{course.course_code.upper()}"
+                f"/file-{index}{file_ext}"
+            )
+            approved = rng.random() < approved_ratio
+            file = File(
+                file_name=f"file-{index}{file_ext}",
+                file_type=file_type,
+                file_ext=file_ext,
+                file_size=rng.randint(50, 20000),
+                session=(
+                    f"{year}/{year + 1}"
+                    if file_type == "past question" else None
+                ),
+                status="approved" if approved else "pending",
+                temp_filepath=temp_filepath,
+                permanent_filepath=temp_filepath[4:] if approved else None,
+                course_id=course.id,
+                user_id=rng.choice(student_list).id,
+                admin_id=rng.choice(admin_list).id if approved else None,
+            )
+            # BaseModel.__init__ sets created_at to now, spread the
+            # files over a year for pagination and date filters
+            file.created_at = now - timedelta(
+                minutes=rng.randint(0, 365 * 24 * 60)
+            )
+            chunk.append(file)
+        storage.save()
+        for file in chunk:
+            if file.status == "approved":
+                file_ids.append(file.id)
+            paths.append(file.permanent_filepath or file.temp_filepath)
+        storage.close()
+
+    if os.getenv("AWS_ENDPOINT_URL_S3"):
+        store_objects(paths)
+    else:
+        logger.warning(
+            "AWS_ENDPOINT_URL_S3 is not set, no file objects stored."
+        )
+
+    created.update(
+        departments=[department.id for department in department_list],
+        courses=[course.id for course in course_list],
+        users=[user.id for user in admin_users + student_list],
+    )
+    return {
+        "password": PASSWORD,
+        "students": [user.email for user in student_list],
+        "admins": [user.email for user in admin_users],
+        "catalogue": sorted(catalogue),
+        "course_ids": created["courses"],
+        "file_ids": file_ids,
+        "file_types": list(FILE_TYPES),
+        "created": created,
+    }
+
+
+def cleanup(manifest: dict[str, Any]) -> None:
+    """
+    Deletes what seed() created, along with the files uploaded to the
+    seeded courses during the load test.
+    """
+    from models import storage
+    from models.course import Course
+    from models.department import Department
+    from models.file import File
+    from models.level import Level
+    from models.user import User
+
+    created = manifest["created"]
+    course_ids = created["courses"]
+    while True:
+        files = storage.get_by_values(File, course_id=course_ids)
+        if not files:
+            break
+        for file in files[:CHUNK_SIZE]:
+            storage.delete(file)
+        storage.save()
+        storage.close()
+
+    for cls, key in (
+        (Course, "courses"),
+        (User, "users"),
+        (Department, "departments"),
+        (Level, "levels"),
+    ):
+        for obj in storage.get_by_values(cls, id=created[key]):
+            storage.delete(obj)
+        storage.save()
+    storage.close()
+
+
+def load_manifest(path: str) -> dict[str, Any]:
+    """Return the manifest written by the seed command."""
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def save_manifest(manifest: dict[str, Any], path: str) -> None:
+    """Write the manifest for the run and cleanup commands."""
+    with open(path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
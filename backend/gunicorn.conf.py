@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+"""
+Gunicorn settings, read from the working directory. The command line
+in the Dockerfile sets the workers and bind address.
+
+Environment variables:
+    GUNICORN_THREADS: request threads per gthread worker (default 16).
+        The app reads it too, to keep open /events streams to a quarter
+        of the threads, see api.v1.utils.events.
+"""
+
+from typing import Any
+import os
+
+
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    """
+    Restart the log listener of a worker forked from a master that
+    preloaded the app, see logging_config.restart_listener.
+    """
+    from logging_config import restart_listener
+
+    restart_listener()
@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 
 """
+Logging configuration.
 
+Loggers never write to files on the calling thread. Records are put on a
+bounded queue by a QueueHandler and a background listener writes them to
+the configured file handlers in batches, flushing once per batch.
+
+Environment variables:
+    LOG_FORMAT: "json" writes structured JSON lines instead of plain text.
+    LOG_DEBUG_SAMPLE_RATE: fraction (0-1) of DEBUG records to keep.
+    LOG_QUEUE_SIZE: max records waiting to be written; extra records
+        are dropped rather than blocking the caller.
+    LOG_BATCH_SIZE: max records written per batch.
 """
 
+from datetime import datetime
 from dotenv import load_dotenv
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
 from typing import Any
+import atexit
+import json
 import logging.config
 import os
+import queue
+import random
+import threading
 
 
 load_dotenv()
@@ -19,12 +37,15 @@ LOGGING_CONFIG: dict[str, Any] = {
     "formatters": {
         "standard": {
             "format": ("[UnibenEngVault] - %(asctime)s - %(levelname)s - %(name)s -"
-            " lineno. %(lineno)d - %(message)s")
-        }
+            " lineno. %(lineno)d - %(request_id)s - %(message)s")
+        },
+        "json": {
+            "()": "logging_config.JsonFormatter",
+        },
     },
     "handlers": {
         "models_files": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
+            "class": "logging_config.BatchedFileHandler",
             "when": "midnight",
             "interval": 1,
             "backupCount": 1,
@@ -32,7 +53,7 @@ LOGGING_CONFIG: dict[str, Any] = {
             "formatter": "standard",
         },
         "api_files": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
+            "class": "logging_config.BatchedFileHandler",
             "when": "midnight",
             "interval": 1,
             "backupCount": 1,
@@ -40,15 +61,23 @@ LOGGING_CONFIG: dict[str, Any] = {
             "formatter": "standard",
         },
         "test_files": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
+            "class": "logging_config.BatchedFileHandler",
             "when": "midnight",
             "interval": 1,
             "backupCount": 1,
             "filename": "logs/tests.log",
             "formatter": "standard",
         },
+        "performance_files": {
+            "class": "logging_config.BatchedFileHandler",
+            "when": "midnight",
+            "interval": 1,
+            "backupCount": 7,
+            "filename": "logs/performance.log",
+            "formatter": "standard",
+        },
         "error_files": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
+            "class": "logging_config.BatchedFileHandler",
             "when": "midnight",
             "interval": 1,
             "backupCount": 1,
@@ -69,17 +98,258 @@ LOGGING_CONFIG: dict[str, Any] = {
         "tests": {
             "handlers": ["test_files"],
             "level": "DEBUG",
+        },
+        "api.performance": {
+            "handlers": ["performance_files"],
+            "level": "DEBUG",
+            "propagate": False,
         }
     }
 }
 
+
+class RequestIdFilter(logging.Filter):
+    """
+    Adds the id of the current request to log records as request_id.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Set request_id, or "-" outside of requests, and keep record."""
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+            try:
+                from flask import g, has_request_context
+                if has_request_context():
+                    record.request_id = g.get("request_id", "-")
+            except ImportError:
+                pass
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of DEBUG records.
+    """
+
+    def __init__(self, rate: float = 1.0) -> None:
+        """Keep a rate fraction of DEBUG records."""
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Keep records above DEBUG, and DEBUG ones at random."""
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return record and its exception, if any, as a JSON line."""
+        log_entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "lineno": record.lineno,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry["exc_info"] = record.exc_text
+        return json.dumps(log_entry, default=str)
+
+
+class BatchedFileHandler(TimedRotatingFileHandler):
+    """
+    Daily rotating file handler that leaves flushing to the
+    queue listener, which flushes once per batch of records.
+    """
+
+    def flush(self) -> None:
+        """Skip the flush StreamHandler.emit does after each record."""
+        pass
+
+    def flush_batch(self) -> None:
+        """Flush the records written since the last batch."""
+        with self.lock:  # type: ignore
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+
+    def close(self) -> None:
+        """Flush the pending records and close the file."""
+        self.flush_batch()
+        super().close()
+
+
+class RoutingQueueHandler(QueueHandler):
+    """
+    Puts records on the log queue tagged with the logger they were
+    configured for, and drops them when the queue is full instead of
+    blocking the caller.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]", route: str) -> None:
+        """Put records of the logger route on log_queue."""
+        super().__init__(log_queue)
+        self.route = route
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Format the message as QueueHandler does and tag the route."""
+        record = super().prepare(record)
+        record.log_route = self.route
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue record, or count it as dropped if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """
+    Writes queued records to the handlers of their route on a
+    background thread, up to batch_size records at a time.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[Any]",
+        routes: dict[str, list[logging.Handler]],
+        batch_size: int = 100,
+    ) -> None:
+        """Write records of log_queue to the handlers of routes."""
+        self.queue = log_queue
+        self.routes = routes
+        self.batch_size = batch_size
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the background thread."""
+        self._thread = threading.Thread(
+            target=self._monitor, name="log-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write the remaining records and stop the background thread."""
+        if self._thread and self._thread.is_alive():
+            self.queue.put(self._sentinel)
+            self._thread.join()
+        self._thread = None
+
+    def _monitor(self) -> None:
+        """
+        Take the waiting records, up to batch_size, and write them until
+        the stop sentinel is met.
+        """
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._sentinel in batch
+            self.handle_batch([r for r in batch if r is not self._sentinel])
+            if stop:
+                return
+
+    def handle_batch(self, records: list[logging.LogRecord]) -> None:
+        """Write records to their handlers and flush each handler once."""
+        used: set[logging.Handler] = set()
+        for record in records:
+            handlers = self.routes.get(getattr(record, "log_route", ""), [])
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                    used.add(handler)
+
+        for handler in used:
+            if isinstance(handler, BatchedFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+
+
+listener: BatchingQueueListener | None = None
+
+
 def setup_logging() -> None:
-    """Setup logging configurations"""
+    """
+    Setup logging configurations and move the configured file handlers
+    behind the log queue.
+    """
+    global listener
+
     os.makedirs("logs", exist_ok=True)
 
     debug_mode = bool(os.getenv("FLASK_DEBUG", False))
-    
+
     log_level = "DEBUG" if debug_mode else "WARNING"
     for logger in LOGGING_CONFIG["loggers"].values():
         logger["level"] = log_level
-    return logging.config.dictConfig(LOGGING_CONFIG)
+
+    if os.getenv("LOG_FORMAT", "").lower() == "json":
+        for handler in LOGGING_CONFIG["handlers"].values():
+            handler["formatter"] = "json"
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+    if listener:
+        listener.stop()
+
+    log_queue: "queue.Queue[Any]" = queue.Queue(
+        int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    )
+    request_id_filter = RequestIdFilter()
+    sampling_filter = DebugSamplingFilter(
+        float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1))
+    )
+    routes: dict[str, list[logging.Handler]] = {}
+
+    for name in LOGGING_CONFIG["loggers"]:
+        logger = logging.getLogger(name)
+        routes[name] = list(logger.handlers)
+        for handler in routes[name]:
+            handler.addFilter(request_id_filter)
+            logger.removeHandler(handler)
+
+        queue_handler = RoutingQueueHandler(log_queue, name)
+        queue_handler.addFilter(sampling_filter)
+        queue_handler.addFilter(request_id_filter)
+        logger.addHandler(queue_handler)
+
+    listener = BatchingQueueListener(
+        log_queue, routes, int(os.getenv("LOG_BATCH_SIZE", 100))
+    )
+    listener.start()
+
+
+def restart_listener() -> None:
+    """
+    Rebuild the log queue and listener in a gunicorn worker, as the
+    listener thread does not survive the fork. Called from post_fork.
+    """
+    if listener:
+        setup_logging()
+
+
+def stop_listener() -> None:
+    """Write queued records before the process exits."""
+    if listener:
+        listener.stop()
+
+
+atexit.register(stop_listener)
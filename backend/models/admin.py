@@ -3,7 +3,7 @@
 """Defines admin-related models and permissions for the system."""
 
 
-from sqlalchemy import String, Boolean, ForeignKey
+from sqlalchemy import String, Boolean, ForeignKey, Integer
 from sqlalchemy.orm import mapped_column, relationship
 
 from models.basemodel import BaseModel, Base
@@ -24,6 +24,13 @@ class Admin(BaseModel, Base):
     __tablename__ = "admins"
 
     is_super_admin = mapped_column(Boolean, nullable=False, default=False)
+    # notifications created since the admin was, not read yet, see
+    # DBStorage.add_unread_notification and mark_notifications_read.
+    # Deleting a notification uncounts it for the admins who had not
+    # read it, in the same flush.
+    unread_notifications = mapped_column(
+        Integer, nullable=False, default=0
+    )
     user_id = mapped_column(
         String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
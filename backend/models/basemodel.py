@@ -8,7 +8,7 @@ from uuid import uuid4
 from copy import deepcopy
 from datetime import datetime
 from typing import Any
-from sqlalchemy import String, DateTime
+from sqlalchemy import String, DateTime, inspect
 from sqlalchemy.orm import DeclarativeBase, mapped_column
 import logging
 
@@ -30,7 +30,8 @@ class BaseModel:
         String(36), primary_key=True, nullable=False, sort_order=-3
     )
     created_at = mapped_column(
-        DateTime, nullable=False, default=datetime.now, sort_order=-2
+        DateTime, nullable=False, default=datetime.now, index=True,
+        sort_order=-2
     )
     updated_at = mapped_column(
         DateTime, nullable=False, default=datetime.now, sort_order=-1
@@ -77,13 +78,17 @@ class BaseModel:
 
     def to_dict(self) -> dict[str, Any]:
         """
-        Return a dictionary representation of the instance
-        with datetimes as strings.
+        Return a dictionary representation of the instance.
+        Datetimes and enums are left as they are, the JSON provider
+        encodes them.
+
+        Loaded relationships are left out so that eagerly loaded
+        objects are not copied along with the instance.
         """
-        obj_dict = deepcopy(self.__dict__)
+        obj_dict = dict(self.__dict__)
+        for relationship in inspect(self).mapper.relationships.keys():
+            obj_dict.pop(relationship, None)
 
-        obj_dict["created_at"] = self.created_at.isoformat()
-        obj_dict["updated_at"] = self.updated_at.isoformat()
         obj_dict["__class__"] = self.__class__.__name__
 
         obj_dict.pop("_sa_instance_state", None)
@@ -57,6 +57,9 @@ class Course(BaseModel, Base):
     is_active = mapped_column(Boolean, nullable=False, default=True)
     level_id = mapped_column(ForeignKey("levels.id", ondelete="SET NULL"))
     admin_id = mapped_column(ForeignKey("admins.id", ondelete="SET NULL"))
+    # S3 prefix of the course's files, see
+    # DBStorage.refresh_course_path_buckets
+    path_bucket = mapped_column(String(200))
 
     level = relationship(
         "Level",
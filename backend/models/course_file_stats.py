@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+"""
+Defines the course_file_stats table, counting the files of every course
+by status, type and session.
+"""
+
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, Table
+
+from models.basemodel import Base
+
+
+# Kept up to date by DBStorage as files are flushed, see
+# DBStorage.update_course_file_stats. session is "" for files without one,
+# since it is part of the primary key.
+course_file_stats = Table(
+    "course_file_stats",
+    Base.metadata,
+    Column(
+        "course_id",
+        String(36),
+        ForeignKey("courses.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("status", String(20), primary_key=True),
+    Column("file_type", String(100), primary_key=True),
+    Column("session", String(20), primary_key=True),
+    Column("file_count", Integer, nullable=False, default=0),
+    Column("total_size", BigInteger, nullable=False, default=0),
+)
@@ -4,36 +4,85 @@
 Database storage engine for managing ORM operations with SQLAlchemy.
 """
 
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from typing import Any, Optional, Sequence, Type, TypeVar, cast
-from sqlalchemy import create_engine, select, and_, func
-from sqlalchemy.orm import sessionmaker, scoped_session
+from typing import (
+    Any, Iterable, Iterator, Optional, Sequence, Type, TypeVar, cast
+)
+from sqlalchemy import (
+    create_engine,
+    select,
+    and_,
+    or_,
+    func,
+    case,
+    delete,
+    exists,
+    insert,
+    literal,
+    null,
+    tuple_,
+    update,
+    event,
+    inspect,
+    DateTime,
+    String,
+    Table,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import (
+    IntegrityError,
+    OperationalError,
+    ProgrammingError,
+)
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    RelationshipProperty,
+    Session,
+    sessionmaker,
+    scoped_session,
+    joinedload,
+    selectinload,
+)
+from sqlalchemy.orm.interfaces import LoaderOption
 from sqlalchemy.sql import Select
+from uuid import uuid4
 import logging
+import re
 
 from models.basemodel import BaseModel, Base
 from models.admin import Admin, Permission, AdminPermission
+from models.engine.query_stats import QueryStats
 from models.course import (
     Course, Semester, course_departments  # type: ignore
 )
+from models.course_file_stats import course_file_stats  # type: ignore
 from models.department import Department
 from models.feedback import Feedback
-from models.file import File
+from models.file import File, FileStatus
 from models.help import Help
 from models.level import Level
 from models.notification import (
     Notification, notification_reads  # type: ignore
 )
+from models.outbox_event import OutboxEvent
 from models.report import Report
+from models.revoked_token import RevokedToken
+from models.table_version import table_versions  # type: ignore
 from models.tutoriallink import TutorialLink
-from models.user import User
+from models.user import User, UserSuspension
 from models.user_session import UserSession
 
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
+RELATIVE_PERIOD = re.compile(r"^last_(\d+)([hdw])$")
+# columns of a file counted in course_file_stats
+FILE_STATS_COLUMNS = ("course_id", "status", "file_type", "session")
+FileStatsKey = tuple[str, str, str, str]
 
 
 class DBStorage:
@@ -50,7 +99,9 @@ class DBStorage:
         Help,
         Level,
         Notification,
+        OutboxEvent,
         Report,
+        RevokedToken,
         TutorialLink,
         User,
         UserSession,
@@ -59,20 +110,24 @@ class DBStorage:
     def __init__(self, database_url: str) -> None:
         """Initialize the database engine."""
         self.__engine = create_engine(database_url, pool_pre_ping=True)
+        self.query_stats = QueryStats()
+        self.query_stats.install(self.__engine)
 
     def all(
         self,
         cls: Type[T],
         page_size: int | str | None = None,
         page_num: int | str | None = None,
+        load: Sequence[str] = (),
     ) -> Sequence[T]:
         """
         Returns all objects of a class with optional pagination.
+        Relationships named in load are eagerly loaded.
         """
         if not issubclass(cls, BaseModel):  # type: ignore
             raise TypeError("Cls must inherit from BaseModel")
 
-        stmt = select(cls)
+        stmt = select(cls).options(*self.load_options(cls, load))
 
         if page_size and page_num:
             stmt = self.apply_pagination(stmt, page_size, page_num)
@@ -100,6 +155,196 @@ class DBStorage:
 
         return stmt
 
+    def get_date_range(
+        self,
+        date_str: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        period: str | None = None,
+    ) -> tuple[datetime | None, datetime | None]:
+        """
+        Converts date filters into a half-open [start, end) datetime range.
+
+        - date_str: a single day in the format YYYY-MM-DD.
+        - date_from, date_to: inclusive days in the format YYYY-MM-DD.
+        - period: today, this_week, this_month or last_<n>h, last_<n>d,
+          last_<n>w (e.g. last_7d).
+
+        When several filters are given the resulting range is
+        their intersection.
+        """
+        starts: list[datetime] = []
+        ends: list[datetime] = []
+
+        def parse_day(value: str, name: str) -> datetime:
+            if not isinstance(value, str):  # type: ignore
+                raise ValueError(f"{name} must be a string")
+            try:
+                return datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"{name} must be in the format YYYY-MM-DD")
+
+        if date_str:
+            day = parse_day(date_str, "date")
+            starts.append(day)
+            ends.append(day + timedelta(days=1))
+
+        if date_from:
+            starts.append(parse_day(date_from, "date_from"))
+
+        if date_to:
+            ends.append(parse_day(date_to, "date_to") + timedelta(days=1))
+
+        if period:
+            now = datetime.now()
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            period = period.lower()
+            match = RELATIVE_PERIOD.match(period)
+
+            if period == "today":
+                starts.append(today)
+            elif period == "this_week":
+                starts.append(today - timedelta(days=today.weekday()))
+            elif period == "this_month":
+                starts.append(today.replace(day=1))
+            elif match:
+                amount, unit = int(match.group(1)), match.group(2)
+                units = {"h": "hours", "d": "days", "w": "weeks"}
+                starts.append(now - timedelta(**{units[unit]: amount}))
+            else:
+                raise ValueError(
+                    "period must be today, this_week, this_month"
+                    " or last_<n>h, last_<n>d, last_<n>w"
+                )
+
+        start = max(starts) if starts else None
+        end = min(ends) if ends else None
+        return start, end
+
+    def apply_date_range(
+        self,
+        stmt: Select[Any],
+        cls: Type[T],
+        date_str: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        period: str | None = None,
+    ) -> Select[Any]:
+        """
+        Filter stmt by creation date using plain comparisons on
+        created_at so that its index can be used.
+        """
+        start, end = self.get_date_range(date_str, date_from, date_to, period)
+
+        if start:
+            stmt = stmt.where(cls.created_at >= start)  # type: ignore
+        if end:
+            stmt = stmt.where(cls.created_at < end)  # type: ignore
+
+        return stmt
+
+    def add_unread_notification(self, count: int = 1) -> None:
+        """
+        Counts count new notifications as unread for every admin, with
+        a single UPDATE in the current transaction.
+        """
+        self.__session.execute(
+            update(Admin).values(
+                unread_notifications=Admin.unread_notifications + count
+            ),
+            execution_options={"synchronize_session": False},
+        )
+
+    def bulk_insert(
+        self, table: Type[BaseModel] | Table, rows: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Inserts rows into the table of a model, or an association table,
+        with a single executemany in the current transaction. Model rows
+        get timestamps, and an id unless they have one, like
+        BaseModel.__init__ would set. Returns the rows as inserted.
+        """
+        if not rows:
+            return rows
+
+        if not isinstance(table, Table):
+            now = datetime.now()
+            rows = [
+                dict(
+                    row,
+                    id=row.get("id") or str(uuid4()),
+                    created_at=now,
+                    updated_at=now,
+                )
+                for row in rows
+            ]
+
+        self.__session.execute(insert(table), rows)
+        return rows
+
+    def claim_outbox_events(
+        self, now: datetime, max_attempts: int, limit: int
+    ) -> Sequence[OutboxEvent]:
+        """
+        Returns up to limit outbox events due by now, oldest first,
+        locked until the current transaction ends. Events locked by
+        another dispatcher are skipped rather than waited for.
+        """
+        stmt = (
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.available_at <= now,
+                OutboxEvent.attempts < max_attempts,
+            )
+            .order_by(OutboxEvent.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return self.__session.scalars(stmt).all()
+
+    def bump_table_versions(
+        self, connection: Connection, tables: Iterable[str]
+    ) -> None:
+        """
+        Increments the versions of the tables in table_versions, with
+        one upsert in the transaction of connection, so they change
+        exactly when its writes commit.
+        """
+        now = datetime.now()
+        rows = [
+            {"table_name": name, "version": 1, "updated_at": now}
+            for name in sorted(tables)
+        ]
+        if not rows:
+            return
+
+        versions = table_versions.c
+        dialect = connection.dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            for row in rows:
+                updated = connection.execute(
+                    update(table_versions)
+                    .where(versions.table_name == row["table_name"])
+                    .values(version=versions.version + 1, updated_at=now)
+                )
+                if not updated.rowcount:
+                    connection.execute(insert(table_versions), row)
+            return
+
+        dialect_insert = (
+            postgresql.insert if dialect == "postgresql" else sqlite.insert
+        )
+        # rows are sorted, so concurrent transactions lock them in order
+        stmt = dialect_insert(table_versions)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[versions.table_name],
+            set_={
+                "version": versions.version + 1,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        connection.execute(stmt, rows)
+
     def close(self) -> None:
         """Close the current database session."""
         self.__session.close()
@@ -123,10 +368,153 @@ class DBStorage:
             all_obj_count[cls_name.__name__] = cls_objects_count
         return all_obj_count
 
+    @property
+    def dialect_name(self) -> str:
+        """Name of the database dialect, e.g. "postgresql"."""
+        return self.__engine.dialect.name
+
+    def count_course_files(
+        self, course_ids: Iterable[str], status: str | None = None
+    ) -> dict[str, int]:
+        """
+        Returns the number of files of each course, from
+        course_file_stats, with one query, optionally of the files
+        with status only.
+        """
+        course_ids = set(course_ids)
+        if not course_ids:
+            return {}
+
+        stmt = (
+            select(
+                course_file_stats.c.course_id,
+                func.sum(course_file_stats.c.file_count),
+            )
+            .where(course_file_stats.c.course_id.in_(course_ids))
+            .group_by(course_file_stats.c.course_id)
+        )
+        if status:
+            stmt = stmt.where(course_file_stats.c.status == status)
+        return {
+            course_id: int(count or 0)
+            for course_id, count in self.__session.execute(stmt)
+        }
+
+    def create_indexes(self) -> None:
+        """
+        Creates the indexes missing from existing tables, which
+        create_all only creates with the tables themselves.
+        """
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(self.__engine, checkfirst=True)
+                except (OperationalError, ProgrammingError):
+                    # created meanwhile by another process
+                    pass
+
     def delete(self, obj: BaseModel) -> None:
         """Delete an object from the current session."""
         self.__session.delete(obj)
 
+    def delete_expired_sessions(
+        self, cutoff: datetime, batch_size: int = 1000
+    ) -> int:
+        """
+        Deletes user sessions created before cutoff.
+        Returns the number of sessions deleted.
+        """
+        return self.__delete_in_batches(
+            UserSession, UserSession.created_at < cutoff, batch_size
+        )
+
+    def delete_expired_revoked_tokens(
+        self, now: datetime, batch_size: int = 1000
+    ) -> int:
+        """
+        Deletes revoked tokens that have expired anyway.
+        Returns the number of rows deleted.
+        """
+        return self.__delete_in_batches(
+            RevokedToken, RevokedToken.expires_at <= now, batch_size
+        )
+
+    def reactivate_suspended_users(
+        self, now: datetime, batch_size: int = 1000
+    ) -> int:
+        """
+        Reactivates inactive users whose suspensions have all expired.
+        Returns the number of users reactivated.
+        """
+        expired_suspension = exists().where(
+            UserSuspension.user_id == User.id,
+            UserSuspension.expires_at <= now,
+        )
+        current_suspension = exists().where(
+            UserSuspension.user_id == User.id,
+            UserSuspension.expires_at > now,
+        )
+        user_ids = (
+            select(User.id)
+            .where(
+                User.is_active.is_(False),
+                expired_suspension,
+                ~current_suspension,
+            )
+            .limit(batch_size)
+        )
+        return self.__in_batches(
+            update(User)
+            .where(User.id.in_(user_ids.correlate(None)))
+            .values(is_active=True, updated_at=now),
+            batch_size,
+        )
+
+    def __delete_in_batches(
+        self, cls: Type[T], condition: Any, batch_size: int
+    ) -> int:
+        """
+        Deletes the rows of cls matching condition, batch_size rows
+        per statement. Returns the number of rows deleted.
+        """
+        ids = select(cls.id).where(condition).limit(batch_size)
+        return self.__in_batches(
+            delete(cls).where(cls.id.in_(ids.correlate(None))), batch_size
+        )
+
+    def __in_batches(self, stmt: Any, batch_size: int) -> int:
+        """
+        Executes a set-based statement limited to batch_size rows until
+        it affects fewer rows, committing after every batch so locks
+        are held briefly. Returns the number of rows affected.
+        """
+        total = 0
+        while True:
+            try:
+                result = self.__session.execute(
+                    stmt, execution_options={"synchronize_session": False}
+                )
+                self.__session.commit()
+            except Exception:
+                self.__session.rollback()
+                raise
+
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+
+    def __expire(
+        self, cls: Type[BaseModel], ids: Iterable[str], attributes: list[str]
+    ) -> None:
+        """
+        Expires attributes of the loaded objects of cls with the given
+        ids, after a set-based statement changed them in the database.
+        """
+        ids = set(ids)
+        for obj in list(self.__session.identity_map.values()):
+            if isinstance(obj, cls) and obj.id in ids:
+                self.__session.expire(obj, attributes)
+
     def filter(
         self,
         cls: Type[T],
@@ -135,13 +523,18 @@ class DBStorage:
         file_status: str | None = None,
         page_size: int | str | None = None,
         page_num: int | str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        period: str | None = None,
+        load: Sequence[str] = (),
     ) -> Sequence[T]:
         """
         Returns objects of a class filtered optionally by:
         - search str
-        - date
+        - date, date range (date_from, date_to) or relative period
         - file status
         - pagination
+        Relationships named in load are eagerly loaded.
         """
 
         search_map: dict[Any, Any] = {
@@ -161,7 +554,7 @@ class DBStorage:
         if file_status and not isinstance(file_status, str):  # type: ignore
             raise ValueError("file_status must be a string")
 
-        stmt = select(cls)
+        stmt = select(cls).options(*self.load_options(cls, load))
         filters: list[Select[Any]] = []
 
         if search_str:
@@ -171,23 +564,231 @@ class DBStorage:
         if file_status:
             filters.append(File.status == file_status)  # type: ignore
 
-        if date_str:
-            try:
-                date_only = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except ValueError:
-                raise ValueError("date_str must be in the format YYYY-MM-DD")
-            filters.append(
-                func.date(cls.created_at) == date_only  # type: ignore
-            )
-
         if filters:
             stmt = stmt.where(*filters)  # type: ignore
 
+        stmt = self.apply_date_range(
+            stmt, cls, date_str, date_from, date_to, period
+        )
+
         if page_size and page_num:
             stmt = self.apply_pagination(stmt, page_size, page_num)
 
         return self.__session.scalars(stmt).all()
 
+    def fingerprint(
+        self, *tables: Type[BaseModel] | Table
+    ) -> tuple[tuple[int, datetime | None], ...]:
+        """
+        Returns the version and the time of the last committed write of
+        each table, or table of a class, with one primary key lookup.
+        Any commit inserting, updating or deleting rows of a table
+        changes its version, see bump_table_versions.
+        """
+        names = [
+            table.name if isinstance(table, Table) else table.__tablename__
+            for table in tables
+        ]
+        rows = self.__session.execute(
+            select(table_versions).where(
+                table_versions.c.table_name.in_(names)
+            )
+        )
+        versions = {
+            row.table_name: (row.version, row.updated_at) for row in rows
+        }
+        return tuple(versions.get(name, (0, None)) for name in names)
+
+    def notify(self, channel: str, payload: str) -> None:
+        """
+        Sends a Postgres notification on its own connection, so the
+        current session's transaction is left alone.
+        """
+        with self.__engine.begin() as connection:
+            connection.execute(select(func.pg_notify(channel, payload)))
+
+    def pool_status(self) -> dict[str, int]:
+        """
+        Returns the number of connections of the engine's pool by state.
+        """
+        pool: Any = self.__engine.pool
+        status: dict[str, int] = {}
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            counter = getattr(pool, state, None)
+            if callable(counter):
+                status[state] = counter()
+        return status
+
+    def prefetch(
+        self,
+        cls: Type[T],
+        ids: Iterable[str],
+        *relationships: str,
+        lock: bool = False,
+    ) -> dict[str, T]:
+        """
+        Loads the objects of cls with the given ids together with the
+        named relationships using one query per relationship. With
+        lock, their rows are locked until the current transaction ends.
+
+        Loaded objects stay in the session identity map for the rest of
+        the request, so later get_obj_by_id calls and relationship access
+        on them do not hit the database again.
+        """
+        if not issubclass(cls, BaseModel):  # type: ignore
+            raise TypeError("Cls must inherit from BaseModel")
+
+        ids = {id for id in ids if id}
+        if not ids:
+            return {}
+
+        stmt = (
+            select(cls)
+            .where(cls.id.in_(ids))  # type: ignore
+            .options(*self.load_options(cls, relationships))
+        )
+        if lock:
+            stmt = stmt.with_for_update()
+        return {obj.id: obj for obj in self.__session.scalars(stmt).all()}
+
+    def get_by_values(
+        self, cls: Type[T], **values: Iterable[Any]
+    ) -> Sequence[T]:
+        """
+        Returns the objects of cls whose column matches any of the
+        values given for it, in a single query:
+
+            storage.get_by_values(Level, id=level_ids, level_name=names)
+        """
+        conditions = [
+            getattr(cls, column).in_(set(column_values))
+            for column, column_values in values.items()
+            if column_values
+        ]
+        if not conditions:
+            return []
+        return self.__session.scalars(
+            select(cls).where(or_(*conditions))
+        ).all()
+
+    def get_notifications(
+        self,
+        admin: Admin,
+        page_size: int,
+        before: tuple[datetime, str] | None = None,
+        unread_only: bool = False,
+    ) -> list[tuple[Notification, datetime | None]]:
+        """
+        Returns the latest notifications of an admin, created since the
+        admin was, along with when the admin read each one.
+        before is the (created_at, id) of the last notification of the
+        previous page, so every page is an index range scan however far
+        the admin pages back.
+        """
+        stmt = (
+            select(Notification, notification_reads.c.read_at)
+            .outerjoin(
+                notification_reads,
+                and_(
+                    notification_reads.c.notification_id == Notification.id,
+                    notification_reads.c.admin_id == admin.id,
+                ),
+            )
+            .where(Notification.created_at >= admin.created_at)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(page_size)
+        )
+        if before:
+            stmt = stmt.where(
+                tuple_(Notification.created_at, Notification.id)
+                < tuple_(*before)
+            )
+        if unread_only:
+            stmt = stmt.where(notification_reads.c.read_at.is_(None))
+
+        return [(row[0], row[1]) for row in self.__session.execute(stmt)]
+
+    def get_course_files(
+        self,
+        course_id: str,
+        page_size: int,
+        before: tuple[datetime, str] | None = None,
+        file_type: str | None = None,
+        session: str | None = None,
+        file_ext: str | None = None,
+    ) -> Sequence[Any]:
+        """
+        Returns the latest approved files of a course as rows of their
+        listed columns, without loading any relationship.
+        before is the (created_at, id) of the last file of the previous
+        page, so every page is a range scan of the
+        (course_id, status, created_at, id) index.
+        """
+        stmt = (
+            select(
+                File.id,
+                File.file_name,
+                File.file_type,
+                File.file_ext,
+                File.file_size,
+                File.session,
+                File.created_at,
+            )
+            .where(
+                File.course_id == course_id,
+                File.status == FileStatus.approved,
+            )
+            .order_by(File.created_at.desc(), File.id.desc())
+            .limit(page_size)
+        )
+        if before:
+            stmt = stmt.where(
+                tuple_(File.created_at, File.id) < tuple_(*before)
+            )
+        if file_type:
+            stmt = stmt.where(File.file_type == file_type)
+        if session:
+            stmt = stmt.where(File.session == session)
+        if file_ext:
+            stmt = stmt.where(File.file_ext == file_ext)
+
+        return self.__session.execute(stmt).all()
+
+    def get_file_stats(
+        self,
+        course_id: str | None = None,
+        department_id: str | None = None,
+        status: str | None = None,
+    ) -> Sequence[Any]:
+        """
+        Returns the file counts and total sizes by status, file type and
+        session, of a course or of the courses of a department, from
+        course_file_stats, optionally of the files with status only.
+        Files without a session have session "".
+        """
+        stats = course_file_stats.c
+        stmt = (
+            select(
+                stats.status,
+                stats.file_type,
+                stats.session,
+                func.sum(stats.file_count).label("file_count"),
+                func.sum(stats.total_size).label("total_size"),
+            )
+            .where(stats.file_count > 0)
+            .group_by(stats.status, stats.file_type, stats.session)
+        )
+        if course_id:
+            stmt = stmt.where(stats.course_id == course_id)
+        if status:
+            stmt = stmt.where(stats.status == status)
+        if department_id:
+            stmt = stmt.join(
+                course_departments,
+                course_departments.c.course_id == stats.course_id,
+            ).where(course_departments.c.department_id == department_id)
+        return self.__session.execute(stmt).all()
+
     def get_obj_by_id(self, cls: Type[T], id: str) -> T | None:
         """
         Returns an object based on its class and  ID, or None if not found.
@@ -240,11 +841,15 @@ class DBStorage:
         return user_objects
 
     def get_courses_by_dept_and_level(
-        self, department_id: str, level_id: str, semester: str | None = None
+        self,
+        department_id: str,
+        level_id: str,
+        semester: str | None = None,
+        load: Sequence[str] = (),
     ) -> Sequence[Course]:
         """
         Returns all courses offered by a department and level optionally
-        filtered by semester.
+        filtered by semester. Relationships named in load are eagerly loaded.
         """
         if not (
             isinstance(department_id, str)  # type: ignore
@@ -262,6 +867,7 @@ class DBStorage:
                 Course.level_id == level_id,
                 Department.id == department_id,  # type: ignore
             )
+            .options(*self.load_options(Course, load))
         )
 
         if semester:
@@ -270,20 +876,276 @@ class DBStorage:
         courses = self.__session.scalars(stmt).all()
         return courses
 
+    def increment_warnings(self, user_ids: list[str]) -> dict[str, int]:
+        """
+        Counts a warning for each user with one UPDATE ... RETURNING
+        in the current transaction, so concurrent warnings are not lost.
+        Returns the new warnings_count of each user.
+        """
+        if not user_ids:
+            return {}
+
+        rows = self.__session.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(
+                warnings_count=User.warnings_count + 1,
+                updated_at=datetime.now(),
+            )
+            .returning(User.id, User.warnings_count),
+            execution_options={"synchronize_session": False},
+        ).all()
+        self.__expire(User, user_ids, ["warnings_count", "updated_at"])
+        return {user_id: count for user_id, count in rows}
+
+    def listen_connection(self) -> Any:
+        """
+        Returns a DBAPI connection taken out of the pool, in autocommit
+        mode, for waiting on notifications. The caller closes it.
+        """
+        connection = self.__engine.raw_connection()
+        connection.detach()
+        dbapi_connection: Any = connection.driver_connection
+        dbapi_connection.autocommit = True
+        return dbapi_connection
+
+    def load_options(
+        self, cls: Type[T], relationships: Iterable[str]
+    ) -> list[LoaderOption]:
+        """
+        Returns loader options that eagerly load the named relationships
+        of cls. Nested relationships are given as dotted paths
+        e.g. "added_by.user".
+
+        Many-to-one relationships are joined into the parent query while
+        collections are loaded with one extra query each.
+        """
+        options: list[LoaderOption] = []
+
+        for path in relationships:
+            current: Any = cls
+            option: Any = None
+            for name in path.split("."):
+                attr = getattr(current, name, None)
+                if not isinstance(
+                    getattr(attr, "property", None), RelationshipProperty
+                ):
+                    raise ValueError(
+                        f"{current.__name__} has no relationship {name}"
+                    )
+                if attr.property.uselist:
+                    option = (
+                        selectinload(attr) if option is None
+                        else option.selectinload(attr)
+                    )
+                else:
+                    option = (
+                        joinedload(attr) if option is None
+                        else option.joinedload(attr)
+                    )
+                current = attr.property.mapper.class_
+            options.append(option)
+
+        return options
+
+    def mark_notifications_read(
+        self, admin: Admin, notification_ids: Sequence[str] | None = None
+    ) -> int:
+        """
+        Marks the given notifications, or all notifications, of an admin
+        as read and decrements the admin's unread count accordingly,
+        with one INSERT ... SELECT and one UPDATE in the current
+        transaction. Returns the number of notifications marked read.
+        """
+        already_read = exists().where(
+            notification_reads.c.notification_id == Notification.id,
+            notification_reads.c.admin_id == admin.id,
+        )
+        unread = (
+            select(
+                Notification.id,
+                literal(admin.id, String),
+                literal(datetime.now(), DateTime),
+            )
+            .where(Notification.created_at >= admin.created_at)
+            .where(~already_read)
+        )
+        if notification_ids is not None:
+            unread = unread.where(Notification.id.in_(notification_ids))
+
+        marked = self.__session.execute(
+            insert(notification_reads).from_select(
+                ["notification_id", "admin_id", "read_at"], unread
+            )
+        ).rowcount
+        if marked:
+            self.__session.execute(
+                update(Admin)
+                .where(Admin.id == admin.id)
+                .values(
+                    unread_notifications=case(
+                        (Admin.unread_notifications > marked,
+                         Admin.unread_notifications - marked),
+                        else_=0,
+                    )
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            self.__session.expire(admin, ["unread_notifications"])
+        return marked
+
     def new(self, obj: BaseModel) -> None:
         """Add a new object to the current session."""
         self.__session.add(obj)
 
+    def refresh_course_path_buckets(
+        self,
+        course_ids: Sequence[str] | None = None,
+        bucket: str | None = None,
+    ) -> None:
+        """
+        Recomputes the S3 prefix that files of the given courses, or of
+        all courses, optionally only those currently under bucket, are
+        uploaded under:
+            - "general": offered by every department.
+            - "shared": offered by several, but not all, departments.
+            - the dashed department name: offered by one department.
+            - NULL: not offered by any department yet.
+
+        Runs as a single UPDATE in the current transaction, so call it
+        before committing a change to departments or course_departments.
+        """
+        links_count = (
+            select(func.count())
+            .select_from(course_departments)
+            .where(course_departments.c.course_id == Course.id)
+            .scalar_subquery()
+        )
+        departments_count = (
+            select(func.count()).select_from(Department).scalar_subquery()
+        )
+        department_name = (
+            select(func.replace(Department.dept_name, " ", "-"))
+            .join(
+                course_departments,
+                course_departments.c.department_id == Department.id,
+            )
+            .where(course_departments.c.course_id == Course.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        path_bucket = case(
+            (links_count == 0, null()),
+            (links_count == departments_count, "general"),
+            (links_count > 1, "shared"),
+            else_=department_name,
+        )
+
+        stmt = update(Course).values(path_bucket=path_bucket)
+        if course_ids is not None:
+            stmt = stmt.where(Course.id.in_(course_ids))
+        if bucket is not None:
+            stmt = stmt.where(Course.path_bucket == bucket)
+        self.__session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+
+        for obj in list(self.__session.identity_map.values()):
+            if isinstance(obj, Course) and (
+                course_ids is None or obj.id in course_ids
+            ):
+                self.__session.expire(obj, ["path_bucket"])
+
+    def rebuild_course_file_stats(self) -> None:
+        """
+        Recomputes course_file_stats from the files table, e.g. to fill
+        it for files added before it existed.
+        """
+        stats = course_file_stats.c
+        counts = (
+            select(
+                File.course_id,
+                File.status.cast(String),
+                File.file_type,
+                func.coalesce(File.session, ""),
+                func.count(),
+                func.coalesce(func.sum(File.file_size), 0),
+            )
+            .where(File.course_id.is_not(None))
+            .group_by(
+                File.course_id,
+                File.status,
+                File.file_type,
+                func.coalesce(File.session, ""),
+            )
+        )
+        with self.__engine.begin() as connection:
+            connection.execute(delete(course_file_stats))
+            connection.execute(
+                insert(course_file_stats).from_select(
+                    [
+                        stats.course_id,
+                        stats.status,
+                        stats.file_type,
+                        stats.session,
+                        stats.file_count,
+                        stats.total_size,
+                    ],
+                    counts,
+                )
+            )
+            self.bump_table_versions(connection, [course_file_stats.name])
+
     def reload(self) -> None:
         """Create database tables and initialize the session factory."""
         # Base.metadata.drop_all(self.__engine)
         Base.metadata.create_all(self.__engine)
-        self.__session = scoped_session(
-            sessionmaker(bind=self.__engine, expire_on_commit=False)
+        self.create_indexes()
+        session_factory = sessionmaker(
+            bind=self.__engine, expire_on_commit=False
+        )
+        event.listen(
+            session_factory, "before_flush", self.__uncount_notifications
+        )
+        event.listen(session_factory, "after_flush", self.__count_files)
+        event.listen(
+            session_factory, "after_flush", self.__track_flushed_tables
+        )
+        event.listen(
+            session_factory, "do_orm_execute", self.__track_executed_tables
+        )
+        event.listen(
+            session_factory, "before_commit", self.__bump_written_tables
         )
+        event.listen(
+            session_factory, "after_rollback", self.__forget_written_tables
+        )
+        self.__session = scoped_session(session_factory)
+
+        with self.__engine.connect() as connection:
+            stats_missing = connection.execute(
+                select(exists().where(File.course_id.is_not(None)))
+                .where(~exists().select_from(course_file_stats))
+            ).scalar()
+        if stats_missing:
+            try:
+                self.rebuild_course_file_stats()
+            except IntegrityError:
+                # another process filled it meanwhile
+                pass
+
+    def rollback(self) -> None:
+        """Roll back the current transaction."""
+        self.__session.rollback()
 
     def save(self) -> None:
-        """Commit the current transaction, rollback if an error occurs."""
+        """
+        Commit the current transaction, rollback if an error occurs.
+        Within a unit of work, only flush the changes.
+        """
+        if self.__session.info.get("unit_of_work_depth"):
+            self.__session.flush()
+            return
         try:
             self.__session.commit()
         except Exception as e:
@@ -293,6 +1155,170 @@ class DBStorage:
                 logger.critical(f"Rollback failed: {rollback_error}")
             raise e
 
+    def __uncount_notifications(
+        self, session: Session, flush_context: Any, instances: Any
+    ) -> None:
+        """
+        Decrements the unread count of every admin for the deleted
+        notifications they had not read, with one UPDATE in the flush's
+        transaction, before the flush deletes their reads.
+        """
+        notification_ids = [
+            obj.id for obj in session.deleted if isinstance(obj, Notification)
+        ]
+        if not notification_ids:
+            return
+
+        unread = (
+            select(func.count())
+            .select_from(Notification)
+            .where(Notification.id.in_(notification_ids))
+            .where(Notification.created_at >= Admin.created_at)
+            .where(~exists().where(
+                notification_reads.c.notification_id == Notification.id,
+                notification_reads.c.admin_id == Admin.id,
+            ))
+            .scalar_subquery()
+        )
+        session.connection().execute(
+            update(Admin.__table__).values(
+                unread_notifications=case(
+                    (Admin.unread_notifications > unread,
+                     Admin.unread_notifications - unread),
+                    else_=0,
+                )
+            )
+        )
+        session.info.setdefault("written_tables", set()).add(
+            Admin.__tablename__
+        )
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, Admin):
+                session.expire(obj, ["unread_notifications"])
+
+    def __track_flushed_tables(
+        self, session: Session, flush_context: Any
+    ) -> None:
+        """
+        Records the tables of the objects inserted, updated and deleted
+        by a flush, to bump their versions on commit.
+        """
+        tables = session.info.setdefault("written_tables", set())
+        for obj in session.new | session.deleted:
+            tables.add(obj.__table__.name)
+        for obj in session.dirty:
+            if session.is_modified(obj):
+                tables.add(obj.__table__.name)
+
+    def __track_executed_tables(
+        self, orm_execute_state: ORMExecuteState
+    ) -> None:
+        """
+        Records the table of INSERT, UPDATE and DELETE statements
+        executed by the session, which bypass the flush.
+        """
+        if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            table = cast(Any, orm_execute_state.statement).table
+            orm_execute_state.session.info.setdefault(
+                "written_tables", set()
+            ).add(table.name)
+
+    def __bump_written_tables(self, session: Session) -> None:
+        """
+        Bumps the versions of the tables written by the transaction
+        about to commit, in that transaction.
+        """
+        # the last changes are flushed after before_commit
+        session.flush()
+        tables = session.info.pop("written_tables", None)
+        if tables:
+            self.bump_table_versions(session.connection(), tables)
+
+    def __forget_written_tables(self, session: Session) -> None:
+        """Forgets the tables written by a rolled back transaction."""
+        session.info.pop("written_tables", None)
+
+    def __count_files(self, session: Session, flush_context: Any) -> None:
+        """
+        Counts the files inserted, updated and deleted by a flush in
+        course_file_stats, in the flush's transaction.
+        """
+        deleted_course_ids = {
+            obj.id for obj in session.deleted if isinstance(obj, Course)
+        }
+        deltas: dict[FileStatsKey, list[int]] = {}
+
+        def count(values: dict[str, Any], sign: int) -> None:
+            key = cast(
+                FileStatsKey,
+                tuple(values[column] for column in FILE_STATS_COLUMNS),
+            )
+            # the stats of deleted courses are deleted with them
+            if key[0] is None or key[0] in deleted_course_ids:
+                return
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += sign
+            delta[1] += sign * (values["file_size"] or 0)
+
+        for obj in session.new:
+            if isinstance(obj, File):
+                count(self.__file_stats_values(obj), 1)
+        for obj in session.deleted:
+            if isinstance(obj, File):
+                count(self.__file_stats_values(obj, old=True), -1)
+        for obj in session.dirty:
+            if isinstance(obj, File):
+                old = self.__file_stats_values(obj, old=True)
+                new = self.__file_stats_values(obj)
+                if old != new:
+                    count(old, -1)
+                    count(new, 1)
+
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if deltas:
+            self.update_course_file_stats(session.connection(), deltas)
+            session.info.setdefault("written_tables", set()).add(
+                course_file_stats.name
+            )
+
+    def __file_stats_values(
+        self, file: File, old: bool = False
+    ) -> dict[str, Any]:
+        """
+        Returns the values of file counted in course_file_stats,
+        as of the last flush if old, else as of this one.
+        """
+        state = inspect(file)
+        values: dict[str, Any] = {}
+        for column in FILE_STATS_COLUMNS + ("file_size",):
+            value = getattr(file, column)
+            if old:
+                history = state.attrs[column].history
+                if history.deleted:
+                    value = history.deleted[0]
+            values[column] = value
+
+        values["status"] = getattr(values["status"], "value", values["status"])
+        values["session"] = values["session"] or ""
+        return values
+
+    def revoked_token_ids(self) -> set[str]:
+        """
+        Returns the ids (jti) of revoked session tokens
+        that have not expired yet.
+        """
+        return set(
+            self.__session.scalars(
+                select(RevokedToken.jti).where(
+                    RevokedToken.expires_at > datetime.now()
+                )
+            )
+        )
+
     def search_email(self, email: str) -> Optional[User]:
         """
         Checks for a user email in the database.
@@ -305,3 +1331,133 @@ class DBStorage:
             select(User).where(User.email == email)
         ).one_or_none()
         return user
+
+    def suspend_users(
+        self, user_ids: list[str], duration_days: int
+    ) -> dict[str, int]:
+        """
+        Deactivates the users and replaces their suspension with one
+        expiring in duration_days, counting it with one
+        UPDATE ... RETURNING in the current transaction.
+        Returns the new suspensions_count of each user.
+        """
+        if not user_ids:
+            return {}
+
+        now = datetime.now()
+        rows = self.__session.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(
+                suspensions_count=User.suspensions_count + 1,
+                is_active=False,
+                updated_at=now,
+            )
+            .returning(User.id, User.suspensions_count),
+            execution_options={"synchronize_session": False},
+        ).all()
+        self.__expire(
+            User, user_ids, ["suspensions_count", "is_active", "updated_at"]
+        )
+
+        self.__session.execute(
+            delete(UserSuspension).where(UserSuspension.user_id.in_(user_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        self.bulk_insert(
+            UserSuspension,
+            [
+                {
+                    "user_id": user_id,
+                    "duration_days": duration_days,
+                    "expires_at": now + timedelta(days=duration_days),
+                }
+                for user_id, _ in rows
+            ],
+        )
+        self.__expire(User, user_ids, ["suspension"])
+        return {user_id: count for user_id, count in rows}
+
+    def update_course_file_stats(
+        self, connection: Connection, deltas: dict[FileStatsKey, list[int]]
+    ) -> None:
+        """
+        Adds the [file_count, total_size] deltas to the course_file_stats
+        rows of their (course_id, status, file_type, session) keys, with
+        one upsert.
+        """
+        rows = [
+            dict(
+                zip(FILE_STATS_COLUMNS, key),
+                file_count=file_count,
+                total_size=total_size,
+            )
+            for key, (file_count, total_size) in sorted(deltas.items())
+        ]
+        stats = course_file_stats.c
+
+        dialect = connection.dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            for row in rows:
+                updated = connection.execute(
+                    update(course_file_stats)
+                    .where(*(
+                        stats[column] == row[column]
+                        for column in FILE_STATS_COLUMNS
+                    ))
+                    .values(
+                        file_count=stats.file_count + row["file_count"],
+                        total_size=stats.total_size + row["total_size"],
+                    )
+                )
+                if not updated.rowcount:
+                    connection.execute(insert(course_file_stats), row)
+            return
+
+        dialect_insert = (
+            postgresql.insert if dialect == "postgresql" else sqlite.insert
+        )
+        stmt = dialect_insert(course_file_stats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(FILE_STATS_COLUMNS),
+            set_={
+                "file_count": stats.file_count + stmt.excluded.file_count,
+                "total_size": stats.total_size + stmt.excluded.total_size,
+            },
+        )
+        connection.execute(stmt, rows)
+
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        """
+        Runs the block in a SAVEPOINT of the current transaction, so
+        only its changes are undone if it raises.
+        """
+        with self.__session.begin_nested():
+            yield
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        """
+        Makes the changes saved in the block one transaction. save()
+        only flushes within it, and the outermost block commits when
+        it ends, or rolls back if it raises. Blocks may nest:
+
+            with storage.unit_of_work():
+                user.save()
+                admin.save()
+        """
+        info = self.__session.info
+        depth = info.get("unit_of_work_depth", 0)
+        info["unit_of_work_depth"] = depth + 1
+        try:
+            yield
+        except BaseException:
+            info["unit_of_work_depth"] = depth
+            if not depth:
+                self.__session.rollback()
+            raise
+
+        info["unit_of_work_depth"] = depth
+        if not depth:
+            self.save()
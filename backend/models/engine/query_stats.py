@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Counts and times the SQL statements executed by the storage engine.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Iterator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import threading
+import time
+
+
+class QueryScope:
+    """
+    Holds the number of statements executed while the scope is active,
+    their total duration and the slowest of them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty scope."""
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+
+    def record(self, statement: str, duration: float) -> None:
+        """Record an executed statement and its duration in seconds."""
+        self.count += 1
+        self.total_time += duration
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+
+class QueryStats:
+    """
+    Records executed statements into every scope that is active
+    on the current thread.
+
+    Scopes nest, so a test can measure a request while the app
+    measures the same request for itself.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the thread-local scope stack."""
+        self.__local = threading.local()
+
+    def install(self, engine: Engine) -> None:
+        """Listen for statements executed on the engine."""
+        event.listen(
+            engine, "before_cursor_execute", self.__before_cursor_execute
+        )
+        event.listen(
+            engine, "after_cursor_execute", self.__after_cursor_execute
+        )
+
+    def __scopes(self) -> list[QueryScope]:
+        """Return the active scopes of the current thread."""
+        scopes = getattr(self.__local, "scopes", None)
+        if scopes is None:
+            scopes = self.__local.scopes = []
+        return scopes
+
+    def __before_cursor_execute(self, conn: Any, *args: Any) -> None:
+        """Remember when the statement started."""
+        conn.info.setdefault("query_start_time", []).append(
+            time.perf_counter()
+        )
+
+    def __after_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        """Record statement and its duration in all active scopes."""
+        start_times = conn.info.get("query_start_time")
+        if not start_times:
+            return
+        duration = time.perf_counter() - start_times.pop()
+
+        for scope in self.__scopes():
+            scope.record(statement, duration)
+
+    def start(self) -> QueryScope:
+        """Start and return a new scope on the current thread."""
+        scope = QueryScope()
+        self.__scopes().append(scope)
+        return scope
+
+    def stop(self, scope: QueryScope) -> None:
+        """Stop recording into scope."""
+        scopes = self.__scopes()
+        if scope in scopes:
+            scopes.remove(scope)
+
+    @contextmanager
+    def scope(self) -> Iterator[QueryScope]:
+        """Record statements executed inside the with block."""
+        scope = self.start()
+        try:
+            yield scope
+        finally:
+            self.stop(scope)
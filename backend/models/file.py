@@ -2,7 +2,7 @@
 
 """Defines file model for the system."""
 
-from sqlalchemy import String, Integer, ForeignKey, Enum
+from sqlalchemy import String, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import mapped_column, relationship
 import enum
 
@@ -28,6 +28,17 @@ class File(BaseModel, Base):
     """
 
     __tablename__ = "files"
+    __table_args__ = (
+        # lists the approved files of a course, latest first,
+        # see DBStorage.get_course_files
+        Index(
+            "ix_files_course_id_status_created_at",
+            "course_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
 
     file_name = mapped_column(String(200), nullable=False)
     file_type = mapped_column(String(100), nullable=False)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+"""
+Defines OutboxEvent class for side effects of a transaction that are
+carried out after it commits.
+"""
+
+
+from datetime import datetime
+from sqlalchemy import JSON, DateTime, Integer, String
+from sqlalchemy.orm import mapped_column
+
+from models.basemodel import BaseModel, Base
+
+
+class OutboxEvent(BaseModel, Base):
+    """
+    A side effect, such as a notification or an S3 move, recorded in the
+    transaction that causes it and carried out by the outbox dispatcher.
+    Rows are deleted once dispatched, and retried until then.
+    """
+    __tablename__ = "outbox_events"
+
+    kind = mapped_column(String(50), nullable=False)
+    payload = mapped_column(JSON, nullable=False)
+    attempts = mapped_column(Integer, nullable=False, default=0)
+    available_at = mapped_column(
+        DateTime, nullable=False, default=datetime.now, index=True
+    )
+    last_error = mapped_column(String(1024))
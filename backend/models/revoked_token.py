@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+"""
+Defines RevokedToken class for denying signed session tokens
+before they expire.
+"""
+
+
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.orm import mapped_column
+
+from models.basemodel import BaseModel, Base
+
+
+class RevokedToken(BaseModel, Base):
+    """
+    Records a signed session token that was logged out. Rows are only
+    needed until the token would have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = mapped_column(String(36), unique=True, nullable=False)
+    user_id = mapped_column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    expires_at = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+"""
+Defines the table_versions table, counting the committed writes to
+every table.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, String, Table
+
+from models.basemodel import Base
+
+
+# Bumped by DBStorage in the transaction of every write to a table,
+# see DBStorage.bump_table_versions. A table without a row was never
+# written since the counter exists. Read by DBStorage.fingerprint to build the
+# validators of cached responses with a primary key lookup.
+table_versions = Table(
+    "table_versions",
+    Base.metadata,
+    Column("table_name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False, default=0),
+    Column("updated_at", DateTime, nullable=False),
+)
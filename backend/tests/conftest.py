@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Shared pytest fixtures.
+"""
+
+
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator
+import pytest
+
+from models import storage
+from models.engine.query_stats import QueryScope
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], ContextManager[QueryScope]]:
+    """
+    Returns a context manager that fails the test when the code
+    inside it executes more SQL statements than max_queries.
+
+        with query_budget(5):
+            client.get("/api/v1/courses")
+    """
+
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[QueryScope]:
+        with storage.query_stats.scope() as scope:
+            yield scope
+
+        if scope.count > max_queries:
+            pytest.fail(
+                f"Query budget exceeded: {scope.count} queries executed,"
+                f" budget is {max_queries}."
+                f" Slowest statement: {scope.slowest_statement}"
+            )
+
+    return budget
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for the response caches.
+"""
+
+
+import logging
+import os
+import tempfile
+import unittest
+
+from api.v1.utils.caching import ResponseCache
+from models import storage
+from models.level import Level
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Tests lookups, expiry and invalidation of cached responses.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates two caches sharing a version file, as two workers do.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        version_file = os.path.join(self.tmp_dir.name, "version")
+        self.cache = ResponseCache("test", 60, 2, version_file)
+        self.other_worker = ResponseCache("test", 60, 2, version_file)
+
+    def tearDown(self) -> None:
+        """
+        Removes the version file.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_get(self):
+        """
+        Test that a stored body is returned with a stable ETag and the
+        least recently used entries are evicted.
+        """
+        self.assertIsNone(self.cache.get("a"))
+        entry = self.cache.set("a", b"[]", self.cache.version())
+        self.assertEqual(self.cache.get("a"), entry)
+        self.assertEqual(
+            entry.etag, self.cache.set("b", b"[]", self.cache.version()).etag
+        )
+
+        self.cache.set("c", b"{}", self.cache.version())
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_invalidate(self):
+        """
+        Test that invalidating discards the entries of every worker and
+        entries built from data read before the invalidation.
+        """
+        self.cache.set("a", b"[]", self.cache.version())
+        self.other_worker.set("a", b"[]", self.other_worker.version())
+        version = self.cache.version()
+
+        self.cache.invalidate()
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNone(self.other_worker.get("a"))
+        self.cache.set("b", b"[]", version)
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_ttl(self):
+        """
+        Test that nothing is cached when the TTL is 0.
+        """
+        cache = ResponseCache("test", 0)
+        cache.set("a", b"[]", cache.version())
+        self.assertIsNone(cache.get("a"))
+
+
+class TestTableVersions(unittest.TestCase):
+    """
+    Tests that the validators of conditional GETs follow every write.
+    """
+
+    def tearDown(self) -> None:
+        """
+        Deletes the levels created.
+        """
+        storage.rollback()
+        for level in storage.get_by_values(Level, level_name=[951, 952]):
+            storage.delete(level)
+        storage.save()
+        storage.close()
+
+    def test_fingerprint(self):
+        """
+        Test that committed inserts, bulk inserts and deletes change
+        the version of a table, and rolled back writes do not.
+        """
+        versions = [storage.fingerprint(Level)]
+        level = Level(level_name=951)
+        storage.save()
+        versions.append(storage.fingerprint(Level))
+
+        storage.bulk_insert(Level, [{"level_name": 952}])
+        storage.save()
+        versions.append(storage.fingerprint(Level))
+
+        Level(level_name=953)
+        storage.rollback()
+        storage.save()
+        self.assertEqual(storage.fingerprint(Level), versions[-1])
+
+        storage.delete(storage.get_obj_by_id(Level, level.id))
+        storage.save()
+        versions.append(storage.fingerprint(Level))
+        self.assertEqual(len(set(versions)), len(versions))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
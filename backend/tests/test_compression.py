@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for response compression.
+"""
+
+
+from flask import Flask, Response
+import gzip
+import logging
+import unittest
+
+from api.v1.utils.caching import ResponseCache, cached_response
+from api.v1.utils.compression import compress_response
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestCompression(unittest.TestCase):
+    """
+    Tests the negotiation and compression of responses.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates an app to build requests and a large JSON body.
+        """
+        self.app = Flask(__name__)
+        self.body = b'[{"outline": "' + b"fluid mechanics " * 200 + b'"}]'
+
+    def compress(self, body: bytes, accept_encoding: str) -> Response:
+        """
+        Returns the JSON response of body after compression.
+        """
+        headers = {"Accept-Encoding": accept_encoding}
+        with self.app.test_request_context(headers=headers):
+            response = Response(body, mimetype="application/json")
+            response.set_etag("etag")
+            return compress_response(response)
+
+    def test_compress_response(self):
+        """
+        Test that large bodies are gzipped for clients accepting it,
+        with a weak ETag.
+        """
+        response = self.compress(self.body, "gzip, deflate")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.get_data()), self.body)
+        self.assertEqual(response.get_etag(), ("etag", True))
+        self.assertIn("Accept-Encoding", response.vary)
+
+    def test_skip_compression(self):
+        """
+        Test that small bodies and clients not accepting gzip get the
+        body as is.
+        """
+        for body, accept_encoding in (
+            (b"[]", "gzip"),
+            (self.body, "identity"),
+        ):
+            response = self.compress(body, accept_encoding)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.get_data(), body)
+            self.assertEqual(response.get_etag(), ("etag", False))
+
+    def test_cached_response(self):
+        """
+        Test that cached responses are compressed once.
+        """
+        cache = ResponseCache("test", 60)
+        entry = cache.set("key", self.body, cache.version())
+
+        for _ in range(2):
+            headers = {"Accept-Encoding": "gzip"}
+            with self.app.test_request_context(headers=headers):
+                response = cached_response(entry)
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(response.get_data(), entry.encoded["gzip"])
+
+        self.assertEqual(list(entry.encoded), ["gzip"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
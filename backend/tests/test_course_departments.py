@@ -256,6 +256,69 @@ class TestCourseDepartmentRoute(unittest.TestCase):
             response.get_json().get("departments")
         )
 
+    def test_course_path_bucket(self):
+        """
+        Test that the S3 path bucket of a course follows its departments.
+        """
+        course_id = self.course_ids[0]
+
+        def path_bucket() -> str | None:
+            storage.close()
+            course = storage.get_obj_by_id(Course, course_id)
+            return cast(Course, course).path_bucket
+
+        self.assertEqual(path_bucket(), "general")
+
+        for dept_id in self.dept_ids[2:]:
+            self.client.delete(
+                f"/api/v1/courses/{course_id}/departments/{dept_id}"
+            )
+        self.assertEqual(path_bucket(), "shared")
+
+        self.client.delete(
+            f"/api/v1/courses/{course_id}/departments/{self.dept_ids[1]}"
+        )
+        department = cast(
+            Department, storage.get_obj_by_id(Department, self.dept_ids[0])
+        )
+        self.assertEqual(
+            path_bucket(), department.dept_name.replace(" ", "-")
+        )
+
+        self.client.delete(
+            f"/api/v1/courses/{course_id}/departments/{self.dept_ids[0]}"
+        )
+        self.assertIsNone(path_bucket())
+
+    def test_course_catalogue_cache(self):
+        """
+        Test that the catalogue is revalidated with its ETag and
+        refreshed when a course leaves the department.
+        """
+        url = (
+            f"/api/v1/departments/{self.dept_ids[0]}"
+            f"/levels/{self.level_ids[0]}/courses"
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+
+        course_ids = [course["id"] for course in self.client.get(url).json]
+        self.client.delete(
+            f"/api/v1/courses/{course_ids[0]}"
+            f"/departments/{self.dept_ids[0]}"
+        )
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertNotEqual(response.status_code, 304)
+        self.assertNotIn(
+            course_ids[0], [course["id"] for course in response.json or []]
+        )
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
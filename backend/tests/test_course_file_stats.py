@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+"""
+Implements test cases for the per-course file statistics.
+"""
+
+from flask.testing import FlaskClient
+import logging
+import unittest
+
+from api.v1.app import create_app
+from api.v1.auth.password_hashing import password_hasher
+from api.v1.utils.caching import catalogue_cache
+from api.v1.utils.utility import get_file_stats_dict
+from models import storage
+from models.admin import Admin
+from models.course import Course
+from models.department import Department
+from models.file import File
+from models.level import Level
+from models.outbox_event import OutboxEvent
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestCourseFileStats(unittest.TestCase):
+    """
+    Tests that course_file_stats follows the files as they are flushed.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a course offered by a department, and a user.
+        """
+        user = User(email="stats@gmail.com", password="Test1234")
+        admin = Admin(user_id=user.id)
+        level = Level(level_name=100)
+        department = Department(
+            dept_name="civil engineering",
+            dept_code="cve",
+            faculty_name="engineering",
+        )
+        storage.save()
+        course = Course(
+            course_code="cve101",
+            semester="first",
+            credit_load=3,
+            title="Statics",
+            outline="Forces",
+            level_id=level.id,
+            admin_id=admin.id,
+        )
+        course.departments.append(department)
+        storage.save()
+        self.user_id, self.level_id = user.id, level.id
+        self.course_id, self.department_id = course.id, department.id
+        storage.close()
+
+    def tearDown(self) -> None:
+        """
+        Deletes the files, the course and its stats, and the events
+        recorded by file routes.
+        """
+        for cls in (File, OutboxEvent):
+            for obj in storage.all(cls):
+                storage.delete(obj)
+        storage.save()
+        for cls, obj_id in (
+            (Course, self.course_id),
+            (Department, self.department_id),
+            (Level, self.level_id),
+            (User, self.user_id),
+        ):
+            storage.delete(storage.get_obj_by_id(cls, obj_id))
+            storage.save()
+        storage.close()
+
+    def add_files(self, count: int) -> list[str]:
+        """
+        Adds count pending files, every other one a past question.
+        Returns their ids.
+        """
+        files = [
+            File(
+                file_name=f"file{index}",
+                file_type="past_question" if index % 2 else "note",
+                file_ext=".pdf",
+                file_size=100,
+                session="2020/2021" if index % 2 else None,
+                temp_filepath=f"temp/file{index}.pdf",
+                course_id=self.course_id,
+                user_id=self.user_id,
+            )
+            for index in range(count)
+        ]
+        storage.save()
+        file_ids = [file.id for file in files]
+        storage.close()
+        return file_ids
+
+    def test_stats_follow_file_changes(self) -> None:
+        """
+        Adding, approving and deleting files updates the stats.
+        """
+        file_ids = self.add_files(4)
+        self.assertEqual(
+            sorted(storage.get_file_stats(course_id=self.course_id)),
+            [
+                ("pending", "note", "", 2, 200),
+                ("pending", "past_question", "2020/2021", 2, 200),
+            ],
+        )
+
+        for file_id in file_ids[:2]:
+            storage.get_obj_by_id(File, file_id).status = "approved"
+        storage.save()
+        storage.delete(storage.get_obj_by_id(File, file_ids[2]))
+        storage.save()
+        storage.close()
+
+        stats = get_file_stats_dict(
+            storage.get_file_stats(department_id=self.department_id)
+        )
+        self.assertEqual(stats["total_files"], 3)
+        self.assertEqual(stats["total_size"], 300)
+        self.assertEqual(
+            stats["files_by_status"], {"approved": 2, "pending": 1}
+        )
+        self.assertEqual(
+            stats["approved_files_by_type"], {"note": 1, "past_question": 1}
+        )
+        self.assertEqual(
+            stats["approved_files_by_session"], {"2020/2021": 1}
+        )
+        self.assertEqual(
+            storage.count_course_files([self.course_id]),
+            {self.course_id: 3},
+        )
+
+    def test_public_department_stats(self) -> None:
+        """
+        Anonymous clients only see the stats of approved files.
+        """
+        file_ids = self.add_files(3)
+        storage.get_obj_by_id(File, file_ids[1]).status = "approved"
+        storage.save()
+        storage.close()
+
+        client = create_app().test_client()
+        url = f"/api/v1/departments/{self.department_id}/stats"
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertNotIn("files_by_status", stats)
+        self.assertEqual(stats["total_files"], 1)
+        self.assertEqual(stats["total_size"], 100)
+        self.assertEqual(stats["approved_files_by_type"], {"past_question": 1})
+
+    def make_admin(self) -> str:
+        """
+        Makes the user an admin with password Test1234.
+        Returns the password hash.
+        """
+        pw_hash = password_hasher.generate_password_hash("Test1234")
+        admin = storage.get_obj_by_id(User, self.user_id)
+        admin.password, admin.is_admin = pw_hash, True
+        return pw_hash
+
+    def login(self, email: str) -> FlaskClient:
+        """
+        Returns a client logged in as the user with email.
+        """
+        client = create_app().test_client()
+        response = client.post(
+            "/api/v1/auth_session/login",
+            json={"email": email, "password": "Test1234"},
+        )
+        self.assertEqual(response.status_code, 200)
+        return client
+
+    def test_course_stats(self) -> None:
+        """
+        Students only see the stats of approved files, admins see the
+        files of every status.
+        """
+        pw_hash = self.make_admin()
+        student = User(email="stats.student@gmail.com", password=pw_hash)
+        storage.save()
+        self.addCleanup(self.delete_user, student.id)
+        file_ids = self.add_files(3)
+        storage.get_obj_by_id(File, file_ids[1]).status = "approved"
+        storage.save()
+        storage.close()
+
+        url = f"/api/v1/courses/{self.course_id}/stats"
+        response = self.login("stats.student@gmail.com").get(url)
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertNotIn("files_by_status", stats)
+        self.assertEqual(stats["total_files"], 1)
+        self.assertEqual(stats["approved_files_by_type"], {"past_question": 1})
+        student_etag = response.headers["ETag"]
+
+        response = self.login("stats@gmail.com").get(
+            url, headers={"If-None-Match": student_etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertEqual(stats["total_files"], 3)
+        self.assertEqual(
+            stats["files_by_status"], {"approved": 1, "pending": 2}
+        )
+
+    def test_catalogue_counts_approved_files(self) -> None:
+        """
+        The catalogue counts approved files only, and is invalidated
+        when a file is approved but not when a pending file goes.
+        """
+        self.make_admin()
+        storage.save()
+        file_ids = self.add_files(2)
+
+        url = (
+            f"/api/v1/departments/{self.department_id}"
+            f"/levels/{self.level_id}/courses"
+        )
+        client = self.login("stats@gmail.com")
+        response = client.get(url)
+        self.assertEqual(response.json[0]["num_of_files_in_course"], 0)
+
+        version = catalogue_cache.version()
+        response = client.delete(f"/api/v1/files/{file_ids[0]}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(catalogue_cache.version(), version)
+
+        response = client.put(
+            f"/api/v1/files/{file_ids[1]}", json={"status": "approved"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(catalogue_cache.version(), version)
+        response = client.get(url)
+        self.assertEqual(response.json[0]["num_of_files_in_course"], 1)
+
+    def delete_user(self, user_id: str) -> None:
+        """
+        Deletes the user with user_id.
+        """
+        storage.delete(storage.get_obj_by_id(User, user_id))
+        storage.save()
+        storage.close()
+
+    def test_rebuild_matches_incremental_stats(self) -> None:
+        """
+        Rebuilding the stats from the files changes nothing.
+        """
+        file_ids = self.add_files(3)
+        storage.get_obj_by_id(File, file_ids[0]).file_size = 250
+        storage.save()
+        storage.close()
+
+        stats = sorted(storage.get_file_stats(course_id=self.course_id))
+        storage.rebuild_course_file_stats()
+        self.assertEqual(
+            sorted(storage.get_file_stats(course_id=self.course_id)), stats
+        )
+
+    def test_rebuild_changes_etag(self) -> None:
+        """
+        Rebuilding the stats invalidates the cached stats responses.
+        """
+        self.add_files(1)
+        storage.close()
+
+        client = create_app().test_client()
+        url = f"/api/v1/departments/{self.department_id}/stats"
+        etag = client.get(url).headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        storage.rebuild_course_file_stats()
+        response = client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
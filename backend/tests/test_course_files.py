@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+"""
+Implements test cases for listing the files of a course.
+"""
+
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import logging
+import unittest
+
+from api.v1.app import create_app
+from models import storage
+from models.admin import Admin
+from models.course import Course
+from models.file import File
+from models.level import Level
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestCourseFilesRoute(unittest.TestCase):
+    """
+    GET - /api/v1/courses/<course_id>/files
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates and login a student, and creates a course with files
+        before execution of the test methods.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.client.post(
+            "/api/v1/register",
+            json={"email": "student@gmail.com", "password": "Test1234"},
+        )
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email": "student@gmail.com", "password": "Test1234"},
+        )
+        cls.user_id = response.get_json().get("user_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = session_cookie.split(
+                ";", 1)[0].split("=", 1)
+            cls.client.set_cookie(cookie_name, session_id)
+
+        user = User(email="uploader@gmail.com", password="Test1234")
+        admin = Admin(user_id=user.id)
+        level = Level(level_name=200)
+        storage.save()
+        course = Course(
+            course_code="mee201",
+            semester="first",
+            credit_load=3,
+            title="Thermodynamics",
+            outline="Heat",
+            level_id=level.id,
+            admin_id=admin.id,
+        )
+        storage.save()
+
+        # file5, the latest, is pending and never listed
+        now = datetime.now()
+        for index in range(6):
+            file = File(
+                file_name=f"file{index}",
+                file_type="past_question" if index % 2 else "note",
+                file_ext=".docx" if index == 2 else ".pdf",
+                file_size=100,
+                session="2021/2022" if index % 2 else None,
+                status="pending" if index == 5 else "approved",
+                temp_filepath=f"temp/file{index}.pdf",
+                course_id=course.id,
+                user_id=user.id,
+            )
+            # BaseModel.__init__ sets created_at to now
+            file.created_at = now - timedelta(minutes=10 - index)
+        storage.save()
+        cls.uploader_id, cls.level_id = user.id, level.id
+        cls.course_id = course.id
+        storage.close()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the files, the course and the users.
+        """
+        for file in storage.all(File):
+            storage.delete(file)
+        storage.save()
+        for cls_, obj_id in (
+            (Course, cls.course_id),
+            (Level, cls.level_id),
+            (User, cls.uploader_id),
+            (User, cls.user_id),
+        ):
+            storage.delete(storage.get_obj_by_id(cls_, obj_id))
+            storage.save()
+        storage.close()
+
+    def get_files(self, **params: Any) -> dict[str, Any]:
+        """
+        Returns the files listed with the given query parameters.
+        """
+        response = self.client.get(
+            f"/api/v1/courses/{self.course_id}/files", query_string=params
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_get_files_with_cursor(self) -> None:
+        """
+        Approved files are listed latest first, a page at a time.
+        """
+        first = self.get_files(page_size=3)
+        self.assertEqual(
+            [file["file_name"] for file in first["files"]],
+            ["file4", "file3", "file2"],
+        )
+        self.assertNotIn("added_by", first["files"][0])
+
+        second = self.get_files(page_size=3, cursor=first["next_cursor"])
+        self.assertEqual(
+            [file["file_name"] for file in second["files"]],
+            ["file1", "file0"],
+        )
+        self.assertIsNone(second["next_cursor"])
+
+    def test_get_filtered_files(self) -> None:
+        """
+        Files are filtered by type, session and extension.
+        """
+        files = self.get_files(file_type="note")["files"]
+        self.assertEqual(
+            [file["file_name"] for file in files], ["file4", "file2", "file0"]
+        )
+        files = self.get_files(session="2021/2022")["files"]
+        self.assertEqual(
+            [file["file_name"] for file in files], ["file3", "file1"]
+        )
+        files = self.get_files(ext="DOCX")["files"]
+        self.assertEqual([file["file_name"] for file in files], ["file2"])
+
+    def test_invalid_requests(self) -> None:
+        """
+        Invalid cursors and unknown courses are rejected.
+        """
+        response = self.client.get(
+            f"/api/v1/courses/{self.course_id}/files?cursor=invalid"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/v1/courses/unknown/files")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,12 @@ Implements unit test cases for courses routes.
 """
 
 
+from datetime import date, timedelta
 from flask import Flask
 from flask.testing import FlaskClient
 from typing import Any
 import logging
+import pytest
 import unittest
 
 from api.v1.app import create_app
@@ -60,6 +62,13 @@ class TestCourseRoute(unittest.TestCase):
                 ";", 1)[0].split("=", 1)
             cls.client.set_cookie(cookie_name, session_id)
 
+    @pytest.fixture(autouse=True)
+    def use_query_budget(self, query_budget: Any) -> None:
+        """
+        Makes the query_budget fixture available to the test methods.
+        """
+        self.query_budget = query_budget
+
     def add_levels(self) -> None:
         """
         Create new levels.
@@ -152,6 +161,81 @@ class TestCourseRoute(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_get_courses_filtered_by_date_range(self):
+        """
+        Test that courses are filtered by date range and relative period.
+        """
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+
+        response = self.client.get(
+            "/api/v1/courses",
+            query_string={
+                "date_from": yesterday.isoformat(),
+                "date_to": today.isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), len(self.courses))
+
+        response = self.client.get(
+            "/api/v1/courses", query_string={"period": "last_1d"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), len(self.courses))
+
+        response = self.client.get(
+            "/api/v1/courses", query_string={"date_to": yesterday.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+    def test_get_all_courses_query_budget(self):
+        """
+        Test that listing courses runs a fixed number of queries
+        regardless of the number of courses.
+        """
+        with self.query_budget(8):
+            response = self.client.get("/api/v1/courses")
+        self.assertEqual(response.status_code, 200)
+
+    def test_import_courses(self):
+        """
+        Test that courses are imported from a CSV file in one request,
+        and that nothing is imported when a row is invalid.
+        """
+        csv_data = (
+            "course_code,semester,credit_load,title,outline,level\n"
+            "tst101,first,2,Test Course One,Test outline,100\n"
+            "tst102,second,3,Test Course Two,Test outline,200\n"
+            "tst103,third,3,Test Course Three,Test outline,900\n"
+        )
+
+        response = self.client.post(
+            "/api/v1/courses/import",
+            data=csv_data,
+            content_type="text/csv",
+        )
+        self.assertEqual(response.status_code, 400)
+        errors = response.get_json().get("errors")
+        self.assertEqual([error["row"] for error in errors], [3])
+        self.assertEqual(response.get_json().get("courses_created"), 0)
+
+        with self.query_budget(10):
+            response = self.client.post(
+                "/api/v1/courses/import?partial=true",
+                data=csv_data,
+                content_type="text/csv",
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json().get("courses_created"), 2)
+
+        courses = storage.get_by_values(
+            Course, course_code=["tst101", "tst102"]
+        )
+        self.course_ids.extend(course.id for course in courses)
+        self.assertEqual(len(courses), 2)
+
     def test_get_course(self):
         """
         Test that a course is retrieved successfully.
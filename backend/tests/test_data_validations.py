@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for request data validation.
+"""
+
+
+import logging
+import unittest
+
+from api.v1.utils.data_validations import (
+    CourseCreate,
+    DepartmentCreate,
+    ReportType,
+    validate_many,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestDataValidations(unittest.TestCase):
+    """
+    Tests lowercasing and bulk validation of request data.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a valid course payload in mixed case.
+        """
+        self.course = {
+            "course_code": "CVE301",
+            "semester": "First",
+            "credit_load": 3,
+            "title": "Fluid Mechanics",
+            "outline": "Properties of Fluids",
+            "level_id": "0B0C8A4E-4A8E-4B8E-9A4E-0B0C8A4E4A8E",
+        }
+
+    def test_lowercase(self):
+        """
+        Test that strings and enum values are matched in any case and
+        stored in lowercase.
+        """
+        course = CourseCreate.model_validate(self.course)
+        self.assertEqual(course.course_code, "cve301")
+        self.assertEqual(course.semester.value, "first")
+        self.assertEqual(course.title, "fluid mechanics")
+        self.assertEqual(course.level_id, self.course["level_id"].lower())
+
+        department = DepartmentCreate.model_validate(
+            {"dept_name": "Civil Engineering", "dept_code": "CVE"}
+        )
+        self.assertEqual(department.dept_name, "civil engineering")
+        self.assertEqual(department.dept_code, "cve")
+        self.assertEqual(ReportType("Tutorial Link"), ReportType.tutorial_link)
+
+    def test_validate_many(self):
+        """
+        Test that valid records are returned and invalid ones reported
+        by their index.
+        """
+        invalid_course = dict(self.course, credit_load=11)
+        valid, errors = validate_many(
+            CourseCreate,
+            [self.course, invalid_course, "course", self.course],
+            exclude_unset=True,
+        )
+
+        self.assertEqual(list(valid), [0, 3])
+        self.assertEqual(valid[0]["course_code"], "cve301")
+        self.assertNotIn("is_active", valid[0])
+        self.assertEqual(list(errors), [1, 2])
+        self.assertEqual(errors[1][0]["loc"], ("credit_load",))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for the database storage.
+"""
+
+from sqlalchemy import create_engine, inspect
+import logging
+import os
+import unittest
+
+from models import storage
+from models.admin import Admin
+from models.course import Course
+from models.department import Department
+from models.level import Level
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestCreateIndexes(unittest.TestCase):
+    """
+    Tests that indexes are added to tables created before them.
+    """
+
+    def test_create_indexes(self) -> None:
+        """
+        An index missing from an existing table is created.
+        """
+        engine = create_engine(os.environ["TEST_DB_URL"])
+        index = next(
+            index for index in Level.__table__.indexes
+            if index.name == "ix_levels_created_at"
+        )
+        storage.close()
+        index.drop(engine)
+        self.assertNotIn(
+            "ix_levels_created_at",
+            {ix["name"] for ix in inspect(engine).get_indexes("levels")},
+        )
+
+        storage.create_indexes()
+        self.assertIn(
+            "ix_levels_created_at",
+            {ix["name"] for ix in inspect(engine).get_indexes("levels")},
+        )
+        engine.dispose()
+
+
+class TestRefreshCoursePathBuckets(unittest.TestCase):
+    """
+    Tests recomputing the S3 prefixes of courses.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a department offering a course.
+        """
+        user = User(email="buckets@gmail.com", password="x")
+        admin = Admin(user_id=user.id)
+        level = Level(level_name=500)
+        department = Department(
+            dept_name="mechanical engineering",
+            dept_code="mee",
+            faculty_name="engineering",
+        )
+        storage.save()
+        course = Course(
+            course_code="mee501",
+            semester="first",
+            credit_load=3,
+            title="Machine Design",
+            outline="Gears",
+            level_id=level.id,
+            admin_id=admin.id,
+        )
+        course.departments.append(department)
+        storage.save()
+        self.ids = [
+            (Course, course.id),
+            (Department, department.id),
+            (Level, level.id),
+            (User, user.id),
+        ]
+        self.course_id = course.id
+        storage.close()
+
+    def tearDown(self) -> None:
+        """
+        Deletes the objects created by the test.
+        """
+        for cls, obj_id in self.ids:
+            obj = storage.get_obj_by_id(cls, obj_id)
+            if obj:
+                storage.delete(obj)
+                storage.save()
+        storage.close()
+
+    def path_bucket(self) -> str | None:
+        """
+        Returns the path bucket of the course.
+        """
+        storage.close()
+        return storage.get_obj_by_id(Course, self.course_id).path_bucket
+
+    def test_refresh_bucket(self) -> None:
+        """
+        Only courses under the given bucket are recomputed.
+        """
+        storage.refresh_course_path_buckets()
+        storage.save()
+        self.assertEqual(self.path_bucket(), "general")
+
+        department = Department(
+            dept_name="chemical engineering",
+            dept_code="che",
+            faculty_name="engineering",
+        )
+        storage.save()
+        self.ids.insert(1, (Department, department.id))
+        storage.refresh_course_path_buckets(bucket="shared")
+        storage.save()
+        self.assertEqual(self.path_bucket(), "general")
+
+        storage.refresh_course_path_buckets(bucket="general")
+        storage.save()
+        self.assertEqual(self.path_bucket(), "mechanical-engineering")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+Implements test cases for the events broker, relays and stream.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from unittest.mock import patch
+import logging
+import tempfile
+import time
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils.events import (
+    Event,
+    EventBroker,
+    SocketRelay,
+    event_broker,
+    max_stream_count,
+)
+from models import storage
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestEventBroker(unittest.TestCase):
+    """
+    Tests publishing events to subscriptions.
+    """
+
+    def test_publish_to_subscribers(self) -> None:
+        """Every subscription receives the events published."""
+        broker = EventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+
+        event = broker.publish("file.created", {"file_id": "1"})
+
+        self.assertEqual(first.get(1), event)
+        self.assertEqual(second.get(1), event)
+        broker.unsubscribe(second)
+        broker.publish("file.approved", {"file_id": "1"})
+        self.assertEqual(first.get(1).name, "file.approved")
+        self.assertIsNone(second.get(0.01))
+
+    def test_drop_subscribers_falling_behind(self) -> None:
+        """A full subscription is dropped, not blocked on."""
+        broker = EventBroker(queue_size=2, max_subscribers=1)
+        subscription = broker.subscribe()
+        self.assertIsNone(broker.subscribe())
+
+        for index in range(3):
+            broker.publish("report.created", {"index": index})
+
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_max_stream_count(self) -> None:
+        """Streams are kept to a quarter of the request threads."""
+        with patch.dict("os.environ", {"GUNICORN_THREADS": "16"}):
+            self.assertEqual(max_stream_count(), 4)
+        env = {"GUNICORN_THREADS": "16", "EVENTS_MAX_SUBSCRIBERS": "100"}
+        with patch.dict("os.environ", env):
+            self.assertEqual(max_stream_count(), 4)
+        env = {"GUNICORN_THREADS": "2", "EVENTS_MAX_SUBSCRIBERS": "1"}
+        with patch.dict("os.environ", env):
+            self.assertEqual(max_stream_count(), 1)
+
+    def test_socket_relay(self) -> None:
+        """Events published in one broker reach the others."""
+        with tempfile.TemporaryDirectory() as directory:
+            publisher = EventBroker(SocketRelay(directory, name="first"))
+            receiver = EventBroker(SocketRelay(directory, name="second"))
+            local = publisher.subscribe()
+            remote = receiver.subscribe()
+
+            event = publisher.publish("file.rejected", {"file_id": "2"})
+
+            self.assertEqual(local.get(1), event)
+            self.assertEqual(remote.get(1), event)
+
+    def test_to_sse(self) -> None:
+        """Events are formatted as Server-Sent Events messages."""
+        event = Event("abc", "file.created", {"file_id": "1"})
+        self.assertEqual(
+            event.to_sse(),
+            'id: abc\nevent: file.created\ndata: {"file_id": "1"}\n\n',
+        )
+        self.assertEqual(Event.from_json(event.to_json()), event)
+
+
+class TestEventsRoute(unittest.TestCase):
+    """
+    GET - /api/v1/events
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates and login an admin user before
+        execution of the test methods.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.client.post(
+            "/api/v1/register",
+            json={
+                "email": "streamed@gmail.com",
+                "password": "Test1234",
+                "is_admin": True
+            },
+        )
+
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={
+                "email": "streamed@gmail.com",
+                "password": "Test1234"
+            },
+        )
+        cls.user_id = response.get_json().get("user_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = session_cookie.split(
+                ";", 1)[0].split("=", 1)
+            cls.client.set_cookie(cookie_name, session_id)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user after executing the class.
+        """
+        cls.client.delete(f"/api/v1/users/{cls.user_id}")
+        if storage.count(User):
+            raise ValueError("Users deletion was not successful")
+
+    def test_stream_events(self) -> None:
+        """Events published are streamed to the admin."""
+        response = self.client.get("/api/v1/events", buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+
+        stream = response.response
+        self.assertTrue(next(stream).startswith(b"retry: "))
+        event = event_broker.publish("file.created", {"file_id": "3"})
+        self.assertEqual(next(stream), event.to_sse().encode("utf-8"))
+
+        response.close()
+        deadline = time.monotonic() + 1
+        while event_broker.subscriber_count() and (
+            time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        self.assertEqual(event_broker.subscriber_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
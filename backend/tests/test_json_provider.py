@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for the JSON provider.
+"""
+
+
+from datetime import datetime
+from flask import Flask
+from uuid import UUID
+import json
+import logging
+import unittest
+
+from api.v1.utils import json_provider
+from api.v1.utils.json_provider import JSONProvider
+from models.file import FileStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestJSONProvider(unittest.TestCase):
+    """
+    Tests that both encoders produce the same JSON.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a provider and data holding values json cannot encode.
+        """
+        self.app = Flask(__name__)
+        self.provider = JSONProvider(self.app)
+        self.data = {
+            "created_at": datetime(2025, 10, 1, 12, 30, 0, 1000),
+            "status": FileStatus.approved,
+            "id": UUID("12345678-1234-5678-1234-567812345678"),
+            "name": "ọmọ",
+        }
+        self.orjson = json_provider.orjson
+
+    def tearDown(self) -> None:
+        """
+        Restores orjson.
+        """
+        json_provider.orjson = self.orjson
+
+    def test_dumps(self):
+        """
+        Test that datetimes, enums and UUIDs are encoded the same way
+        with and without orjson.
+        """
+        expected = {
+            "created_at": "2025-10-01T12:30:00.001000",
+            "status": "approved",
+            "id": "12345678-1234-5678-1234-567812345678",
+            "name": "ọmọ",
+        }
+        encoded = self.provider.dumps_bytes(self.data)
+        self.assertEqual(json.loads(encoded), expected)
+
+        json_provider.orjson = None
+        self.assertEqual(
+            json.loads(self.provider.dumps_bytes(self.data)), expected
+        )
+
+    def test_response(self):
+        """
+        Test that jsonify responses are JSON with a trailing newline.
+        """
+        with self.app.app_context():
+            response = self.provider.response(self.data)
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertTrue(response.get_data().endswith(b"\n"))
+        self.assertEqual(
+            self.provider.loads(response.get_data())["status"], "approved"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -85,6 +85,19 @@ class TestLevelRoute(unittest.TestCase):
         if storage.count(User):
             raise ValueError("Users deletion was not successful")
 
+    def test_get_levels_with_invalid_date_filters(self):
+        """
+        Test that malformed date filters are rejected with 400,
+        naming the query parameter.
+        """
+        response = self.client.get("/api/v1/levels?date=bad")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("date must be", response.get_json()["error"])
+
+        response = self.client.get("/api/v1/levels?period=last_x")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("period must be", response.get_json()["error"])
+
     def test_add_level(self):
         """
         Test that level is created successfully.
@@ -123,6 +136,28 @@ class TestLevelRoute(unittest.TestCase):
         self.assertIn("no_of_users_in_level", response.get_json())
         self.assertNotIn("__class__", response.get_json())
 
+    def test_get_all_levels_conditionally(self):
+        """
+        Test that unchanged levels are answered with 304 and a changed
+        level table with the new levels.
+        """
+        response = self.client.get("/api/v1/levels")
+        etag = response.headers["ETag"]
+        self.assertIn("public", response.headers["Cache-Control"])
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self.client.get(
+            "/api/v1/levels", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.client.delete(f"/api/v1/levels/{self.level_ids.pop()}")
+        response = self.client.get(
+            "/api/v1/levels", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
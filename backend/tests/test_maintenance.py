@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for the maintenance tasks.
+"""
+
+
+from datetime import datetime, timedelta
+import logging
+import os
+import unittest
+
+from api.v1.utils.maintenance import run_maintenance
+from api.v1.utils.utility import UserDisplineHandler
+from models import storage
+from models.user import User, UserSuspension
+from models.user_session import UserSession
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestMaintenance(unittest.TestCase):
+    """
+    Tests the expired session and suspension sweeps.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a user to attach sessions and suspensions to.
+        """
+        self.user = User(email="sweep@gmail.com", password="x")
+        storage.save()
+        self.now = datetime.now()
+
+    def tearDown(self) -> None:
+        """
+        Deletes the user along with its sessions and suspensions.
+        """
+        storage.delete(storage.get_obj_by_id(User, self.user.id))
+        storage.save()
+        storage.close()
+
+    def test_delete_expired_sessions(self):
+        """
+        Test that only sessions older than SESSION_DURATION are deleted.
+        """
+        session_duration = int(os.getenv("SESSION_DURATION", 0))
+        expired = UserSession(user_id=self.user.id)
+        expired.created_at = (
+            self.now - timedelta(seconds=session_duration + 60)
+        )
+        current = UserSession(user_id=self.user.id)
+        storage.save()
+        expired_id, current_id = expired.id, current.id
+
+        processed = run_maintenance(batch_size=1)
+
+        self.assertGreaterEqual(processed["expired_sessions"], 1)
+        self.assertIsNone(storage.get_obj_by_id(UserSession, expired_id))
+        self.assertIsNotNone(storage.get_obj_by_id(UserSession, current_id))
+
+    def test_reactivate_suspended_users(self):
+        """
+        Test that users are reactivated once their suspension expired.
+        """
+        user = storage.get_obj_by_id(User, self.user.id)
+        user.is_active = False
+        suspension = UserSuspension(
+            user_id=user.id, expires_at=self.now + timedelta(days=1)
+        )
+        storage.save()
+
+        run_maintenance()
+        self.assertFalse(storage.get_obj_by_id(User, self.user.id).is_active)
+
+        suspension = storage.get_obj_by_id(UserSuspension, suspension.id)
+        suspension.expires_at = self.now - timedelta(days=1)
+        storage.save()
+        storage.close()
+
+        # checking the suspension at login writes nothing
+        user = storage.get_obj_by_id(User, self.user.id)
+        self.assertTrue(UserDisplineHandler().active_user(user))
+        storage.close()
+        self.assertFalse(storage.get_obj_by_id(User, self.user.id).is_active)
+
+        processed = run_maintenance()
+        self.assertEqual(processed["expired_suspensions"], 1)
+        self.assertTrue(storage.get_obj_by_id(User, self.user.id).is_active)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for the metrics route.
+"""
+
+
+from flask import Flask
+from flask.testing import FlaskClient
+from unittest.mock import patch
+import logging
+import unittest
+
+from api.v1.app import create_app
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestMetricsRoute(unittest.TestCase):
+    """
+    GET - /api/v1/metrics
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates the test client.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+    def test_get_metrics(self):
+        """
+        Test that request metrics are exposed in the Prometheus text format.
+        """
+        self.client.get("/api/v1/levels")
+
+        with patch.dict("os.environ", {"METRICS_TOKEN": "secret"}):
+            response = self.client.get(
+                "/api/v1/metrics",
+                headers={"Authorization": "Bearer secret"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE http_requests_total counter", body)
+        self.assertIn('route="/api/v1/levels"', body)
+        self.assertIn("http_request_duration_seconds_bucket", body)
+        self.assertIn("db_pool_connections", body)
+
+    def test_get_metrics_requires_token(self):
+        """
+        Test that metrics are not served without the configured token,
+        nor when no token is configured.
+        """
+        with patch.dict("os.environ", {"METRICS_TOKEN": "secret"}):
+            response = self.client.get("/api/v1/metrics")
+            self.assertEqual(response.status_code, 401)
+            response = self.client.get(
+                "/api/v1/metrics", headers={"Authorization": "Bearer bad"}
+            )
+            self.assertEqual(response.status_code, 401)
+
+        with patch.dict("os.environ", {"METRICS_TOKEN": ""}):
+            response = self.client.get("/api/v1/metrics")
+            self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
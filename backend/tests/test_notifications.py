@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Implements test cases for notifications routes.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+import logging
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils import outbox
+from api.v1.utils.outbox import (
+    record_notification,
+    run_outbox,
+    start_outbox_dispatcher,
+)
+from models import storage
+from models.notification import Notification
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestNotificationRoute(unittest.TestCase):
+    """
+    GET - /api/v1/notifications
+    PUT - /api/v1/notifications/read
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates and login an admin user before
+        execution of the test methods.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+        # the tests dispatch the notifications themselves
+        if outbox.outbox_dispatcher:
+            outbox.outbox_dispatcher.stop()
+            outbox.outbox_dispatcher.join()
+
+        cls.client.post(
+            "/api/v1/register",
+            json={
+                "email": "notified@gmail.com",
+                "password": "Test1234",
+                "is_admin": True
+            },
+        )
+
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={
+                "email": "notified@gmail.com",
+                "password": "Test1234"
+            },
+        )
+        cls.user_id = response.get_json().get("user_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = session_cookie.split(
+                ";", 1)[0].split("=", 1)
+            cls.client.set_cookie(cookie_name, session_id)
+
+    def setUp(self) -> None:
+        """
+        Notify admins before each test method.
+        """
+        messages = [f"notification {index}" for index in range(5)]
+        for message in messages:
+            record_notification(message, "notification")
+            storage.save()
+            run_outbox()
+        notifications = {
+            notification.message: notification.id
+            for notification in storage.get_by_values(
+                Notification, message=messages
+            )
+        }
+        self.notification_ids = [
+            notifications[message] for message in messages
+        ]
+
+    def tearDown(self) -> None:
+        """
+        Read and delete the notifications after each test method.
+        """
+        self.client.put("/api/v1/notifications/read", json={"all": True})
+        for notification_id in self.notification_ids:
+            notification = storage.get_obj_by_id(Notification, notification_id)
+            storage.delete(notification)
+        storage.save()
+        storage.close()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user after executing the class.
+        """
+        cls.client.delete(f"/api/v1/users/{cls.user_id}")
+        if storage.count(User):
+            raise ValueError("Users deletion was not successful")
+        start_outbox_dispatcher()
+
+    def test_get_notifications(self):
+        """
+        Test that notifications are paged latest first.
+        """
+        response = self.client.get("/api/v1/notifications?page_size=3")
+        self.assertEqual(response.status_code, 200)
+        first_page = response.get_json()
+        self.assertEqual(len(first_page["notifications"]), 3)
+        self.assertEqual(first_page["unread_count"], 5)
+        self.assertIsNotNone(first_page["next_cursor"])
+
+        response = self.client.get(
+            "/api/v1/notifications",
+            query_string={
+                "page_size": 3, "cursor": first_page["next_cursor"]
+            },
+        )
+        second_page = response.get_json()
+        self.assertEqual(len(second_page["notifications"]), 2)
+        self.assertIsNone(second_page["next_cursor"])
+
+        ids = [
+            notification["id"]
+            for page in (first_page, second_page)
+            for notification in page["notifications"]
+        ]
+        self.assertEqual(ids, self.notification_ids[::-1])
+
+    def test_mark_notifications_read(self):
+        """
+        Test that marking notifications read updates the unread count.
+        """
+        response = self.client.put(
+            "/api/v1/notifications/read",
+            json={"ids": self.notification_ids[:2]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["marked_read"], 2)
+        self.assertEqual(response.get_json()["unread_count"], 3)
+
+        response = self.client.get("/api/v1/notifications?unread=true")
+        self.assertEqual(len(response.get_json()["notifications"]), 3)
+
+        response = self.client.put(
+            "/api/v1/notifications/read", json={"all": True}
+        )
+        self.assertEqual(response.get_json()["marked_read"], 3)
+        self.assertEqual(response.get_json()["unread_count"], 0)
+
+    def test_delete_notifications(self):
+        """
+        Test that deleting notifications only uncounts the unread ones.
+        """
+        self.client.put(
+            "/api/v1/notifications/read",
+            json={"ids": self.notification_ids[:1]},
+        )
+        for notification_id in self.notification_ids[:2]:
+            notification = storage.get_obj_by_id(Notification, notification_id)
+            storage.delete(notification)
+        storage.save()
+        self.notification_ids = self.notification_ids[2:]
+
+        response = self.client.get("/api/v1/notifications")
+        self.assertEqual(response.get_json()["unread_count"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+Implements test cases for the outbox dispatcher.
+"""
+
+from datetime import datetime
+import logging
+import unittest
+
+from api.v1.utils import outbox
+from api.v1.utils.outbox import (
+    NOTIFY,
+    S3_DELETE,
+    S3_MOVE,
+    dispatch_outbox,
+    record,
+    record_notification,
+    run_outbox,
+    start_outbox_dispatcher,
+)
+from models import storage
+from models.admin import Admin
+from models.notification import Notification
+from models.outbox_event import OutboxEvent
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class TestOutbox(unittest.TestCase):
+    """
+    Tests dispatching the events recorded in the outbox.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Stops the dispatcher thread, so the tests dispatch the events,
+        and creates an admin.
+        """
+        if outbox.outbox_dispatcher:
+            outbox.outbox_dispatcher.stop()
+            outbox.outbox_dispatcher.join()
+
+        user = User(email="outbox@gmail.com", password="Test1234")
+        admin = Admin(user_id=user.id)
+        cls.user_id, cls.admin_id = user.id, admin.id
+        storage.save()
+        storage.close()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin and restarts the dispatcher thread.
+        """
+        storage.delete(storage.get_obj_by_id(User, cls.user_id))
+        storage.save()
+        storage.close()
+        start_outbox_dispatcher()
+
+    def tearDown(self) -> None:
+        """
+        Deletes the events and notifications left by a test.
+        """
+        for cls in (OutboxEvent, Notification):
+            for obj in storage.all(cls):
+                storage.delete(obj)
+        storage.save()
+        storage.close()
+
+    def test_dispatch_notifications(self) -> None:
+        """
+        Notifications are created, and counted unread, only once
+        the transaction recording them commits.
+        """
+        record_notification("first", "report.created")
+        storage.rollback()
+        self.assertEqual(run_outbox(), 0)
+
+        for message in ("first", "second"):
+            record_notification(message, "report.created")
+        storage.save()
+        self.assertEqual(run_outbox(), 2)
+
+        self.assertEqual(
+            sorted(n.message for n in storage.all(Notification)),
+            ["first", "second"],
+        )
+        self.assertEqual(storage.count(OutboxEvent), 0)
+        admin = storage.get_obj_by_id(Admin, self.admin_id)
+        self.assertEqual(admin.unread_notifications, 2)
+
+    def test_retry_failed_events(self) -> None:
+        """
+        Failed events are kept with their error and retried later.
+        """
+        event_id = record("unknown", value=1).id
+        storage.save()
+
+        self.assertEqual(run_outbox(), 1)
+        storage.close()
+
+        event = storage.get_obj_by_id(OutboxEvent, event_id)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("Unknown kind", event.last_error)
+        self.assertGreater(event.available_at, datetime.now())
+        # not due again yet
+        self.assertEqual(run_outbox(), 0)
+
+    def test_handler_raising(self) -> None:
+        """
+        The events of a handler that raises are retried with backoff
+        and its changes undone, while other kinds are carried out.
+        """
+        record_notification("first", "report.created")
+        event_id = record(NOTIFY, event="report.created").id
+        record(S3_MOVE, file_id="0" * 36, temp_filepath="temp/CSC/a.pdf")
+        storage.save()
+
+        self.assertEqual(dispatch_outbox(), 3)
+        storage.close()
+
+        event = storage.get_obj_by_id(OutboxEvent, event_id)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("KeyError", event.last_error)
+        self.assertGreater(event.available_at, datetime.now())
+        self.assertEqual(storage.count(Notification), 0)
+        self.assertEqual(
+            sorted(event.kind for event in storage.all(OutboxEvent)),
+            [NOTIFY, NOTIFY, S3_DELETE],
+        )
+
+    def test_move_deleted_file(self) -> None:
+        """
+        The move of a file deleted meanwhile records the deletion of
+        the permanent copy an earlier attempt may have made.
+        """
+        record(S3_MOVE, file_id="0" * 36, temp_filepath="temp/CSC/a.pdf")
+        storage.save()
+
+        self.assertEqual(dispatch_outbox(), 1)
+        events = storage.all(OutboxEvent)
+        self.assertEqual([event.kind for event in events], [S3_DELETE])
+        self.assertEqual(events[0].payload["paths"], ["/CSC/a.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
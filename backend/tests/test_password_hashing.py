@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for password hashing.
+"""
+
+
+import logging
+import threading
+import unittest
+
+from api.v1.auth.password_hashing import PasswordHasher
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """
+    Tests hashing, checking and rehash detection of passwords.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a hasher with a low cost to keep the tests fast.
+        """
+        self.hasher = PasswordHasher(rounds=4, pool_size=1)
+
+    def test_check_password_hash(self):
+        """
+        Test that a password matches its own hash only.
+        """
+        pw_hash = self.hasher.generate_password_hash("Test1234")
+        self.assertTrue(self.hasher.check_password_hash(pw_hash, "Test1234"))
+        self.assertFalse(self.hasher.check_password_hash(pw_hash, "Test12345"))
+
+    def test_generate_password_hashes(self):
+        """
+        Test that hashing many passwords keeps their order.
+        """
+        passwords = [f"Password{i}" for i in range(10)]
+        hashes = self.hasher.generate_password_hashes(passwords)
+        self.assertEqual(len(hashes), len(passwords))
+        for password, pw_hash in zip(passwords, hashes):
+            self.assertTrue(
+                self.hasher.check_password_hash(pw_hash, password)
+            )
+
+    def test_check_password_hash_during_bulk_hashing(self):
+        """
+        Test that a login does not wait behind a whole bulk batch.
+        """
+        hasher = PasswordHasher(rounds=8, pool_size=1, max_pending=2)
+        pw_hash = hasher.generate_password_hash("Test1234")
+        bulk_done = threading.Event()
+
+        def hash_batch():
+            hasher.generate_password_hashes(
+                [f"Password{i}" for i in range(40)]
+            )
+            bulk_done.set()
+
+        thread = threading.Thread(target=hash_batch)
+        thread.start()
+        self.assertTrue(hasher.check_password_hash(pw_hash, "Test1234"))
+        self.assertFalse(bulk_done.is_set())
+        thread.join()
+
+    def test_needs_rehash(self):
+        """
+        Test that hashes created with another cost need a rehash.
+        """
+        pw_hash = self.hasher.generate_password_hash("Test1234")
+        self.assertFalse(self.hasher.needs_rehash(pw_hash))
+
+        stronger_hasher = PasswordHasher(rounds=5, pool_size=0)
+        self.assertTrue(stronger_hasher.needs_rehash(pw_hash))
+        self.assertTrue(stronger_hasher.needs_rehash("not a hash"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for login rate limiting.
+"""
+
+
+from unittest.mock import patch
+from werkzeug.exceptions import TooManyRequests
+import logging
+import os
+import tempfile
+import unittest
+
+from api.v1.app import create_app
+from api.v1.auth.rate_limit import (
+    LoginRateLimiter,
+    MemoryBackend,
+    SharedBackend,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestRateLimitBackends(unittest.TestCase):
+    """
+    Tests the token buckets and remembered keys of both backends.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a memory backend and a shared backend on a temporary file.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.backends = [
+            MemoryBackend(),
+            SharedBackend(os.path.join(self.tmp_dir.name, "limits"), 128),
+        ]
+
+    def tearDown(self) -> None:
+        """
+        Removes the temporary file.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_consume(self):
+        """
+        Test that a bucket allows capacity attempts, then asks to wait.
+        """
+        for backend in self.backends:
+            for _ in range(3):
+                self.assertEqual(backend.consume("key", 3, 0.5), 0)
+            self.assertAlmostEqual(backend.consume("key", 3, 0.5), 2, 1)
+            self.assertEqual(backend.consume("other", 3, 0.5), 0)
+
+    def test_remember(self):
+        """
+        Test that keys are remembered until they expire or are forgotten.
+        """
+        for backend in self.backends:
+            backend.remember("email", 60)
+            backend.remember("expired", -1)
+            self.assertTrue(backend.recall("email"))
+            self.assertFalse(backend.recall("expired"))
+            self.assertFalse(backend.recall("unknown"))
+
+            backend.forget("email")
+            self.assertFalse(backend.recall("email"))
+
+
+class TestLoginRateLimiter(unittest.TestCase):
+    """
+    Tests that only failed login attempts are limited.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a limiter allowing two failures per email.
+        """
+        self.limiter = LoginRateLimiter(
+            MemoryBackend(), ip_rate="4/60", email_rate="2/60"
+        )
+
+    def test_check(self):
+        """
+        Test that checks alone never exhaust the buckets.
+        """
+        for _ in range(10):
+            self.limiter.check("127.0.0.1", "test@gmail.com")
+
+    def test_record_failure(self):
+        """
+        Test that failures are limited per email and per IP.
+        """
+        for _ in range(2):
+            self.limiter.check("127.0.0.1", "test@gmail.com")
+            self.limiter.record_failure("127.0.0.1", "test@gmail.com")
+
+        with self.assertRaises(TooManyRequests) as cm:
+            self.limiter.check("127.0.0.1", "TEST@gmail.com")
+        self.assertGreater(cm.exception.retry_after, 0)
+
+        for _ in range(2):
+            self.limiter.check("127.0.0.1", "other@gmail.com")
+            self.limiter.record_failure("127.0.0.1", "other@gmail.com")
+
+        with self.assertRaises(TooManyRequests):
+            self.limiter.check("127.0.0.1", "third@gmail.com")
+        self.limiter.check("10.0.0.1", "third@gmail.com")
+
+    def test_unknown_email(self):
+        """
+        Test that unknown emails are only cached by the shared backend,
+        and forgotten on register.
+        """
+        self.assertFalse(self.limiter.unknown_email_ttl)
+        self.limiter.remember_unknown_email("test@gmail.com")
+        self.assertFalse(self.limiter.is_unknown_email("test@gmail.com"))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            limiter = LoginRateLimiter(
+                SharedBackend(os.path.join(tmp_dir, "limits"), 128)
+            )
+            limiter.remember_unknown_email("test@gmail.com")
+            self.assertTrue(limiter.is_unknown_email("TEST@gmail.com"))
+            limiter.forget_unknown_email("test@gmail.com")
+            self.assertFalse(limiter.is_unknown_email("test@gmail.com"))
+
+
+class TestLoginRateLimitRoute(unittest.TestCase):
+    """
+    Tests that logins are limited per client behind the proxy.
+    """
+
+    def test_forwarded_client_ips(self):
+        """
+        Test that failures from one forwarded client IP do not limit
+        another client behind the same proxy.
+        """
+        client = create_app().test_client()
+        limiter = LoginRateLimiter(
+            MemoryBackend(), ip_rate="2/60", email_rate="5/60"
+        )
+
+        def login(ip: str, email: str) -> int:
+            return client.post(
+                "/api/v1/auth_session/login",
+                json={"email": email, "password": "Test1234"},
+                headers={"X-Forwarded-For": ip},
+            ).status_code
+
+        with patch("api.v1.auth.authentication.login_rate_limiter", limiter):
+            for index in range(2):
+                self.assertEqual(
+                    login("203.0.113.1", f"nobody{index}@gmail.com"), 404
+                )
+            self.assertEqual(login("203.0.113.1", "other@gmail.com"), 429)
+            self.assertEqual(login("203.0.113.2", "other@gmail.com"), 404)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
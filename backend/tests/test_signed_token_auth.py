@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for signed session tokens.
+"""
+
+
+from datetime import datetime, timedelta
+from flask import Flask, g
+from unittest import mock
+from werkzeug.exceptions import Forbidden
+import logging
+import os
+import unittest
+
+from api.v1.app import create_app
+from api.v1.auth.authorization import admin_only
+from api.v1.auth.signed_token_auth import SignedTokenAuth, TokenUser
+from models import storage
+from models.user import User, UserSuspension
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestSignedTokenAuth(unittest.TestCase):
+    """
+    Tests issuing, verifying and revoking signed session tokens.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates the app and a user to issue tokens for.
+        """
+        cls.app: Flask = create_app()
+        cls.user = User(
+            email="token_user@gmail.com", password="x", is_admin=True
+        )
+        storage.save()
+        cls.user_id = cls.user.id
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the user.
+        """
+        user = storage.get_obj_by_id(User, cls.user_id)
+        if user:
+            storage.delete(user)
+            storage.save()
+        storage.close()
+
+    def setUp(self) -> None:
+        """
+        Creates the auth backend with a test secret.
+        """
+        env = {"SECRET_KEY": "test-secret", "SESSION_DURATION": "3600"}
+        with mock.patch.dict(os.environ, env):
+            self.auth = SignedTokenAuth()
+        self.cookie_name = os.getenv("SESSION_NAME")
+
+    def current_user(self, token: str) -> User | None:
+        """
+        Returns the user authenticated by token.
+        """
+        headers = {"Cookie": f"{self.cookie_name}={token}"}
+        with self.app.test_request_context(headers=headers):
+            return self.auth.current_user()
+
+    def test_current_user_without_queries(self):
+        """
+        Test that a valid token is authenticated without SQL statements.
+        """
+        token = self.auth.create_session(self.user_id)
+        # load the deny-list up front, it is only refreshed periodically
+        self.auth.is_revoked("")
+
+        with storage.query_stats.scope() as scope:
+            user = self.current_user(token)
+
+        self.assertEqual(scope.count, 0)
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual(user.id, self.user_id)
+        self.assertTrue(user.is_admin)
+        self.assertEqual(user.email, "token_user@gmail.com")
+
+    def test_invalid_token(self):
+        """
+        Test that tampered tokens and tokens signed with
+        another secret are rejected.
+        """
+        token = self.auth.create_session(self.user_id)
+        self.assertIsNone(self.current_user(token[:-2] + "xx"))
+
+        with mock.patch.dict(os.environ, {"SECRET_KEY": "other-secret"}):
+            other_auth = SignedTokenAuth()
+        self.assertIsNone(self.current_user(other_auth.serializer.dumps(
+            {"uid": self.user_id, "adm": True, "jti": "x"}
+        )))
+
+    def test_destroy_session(self):
+        """
+        Test that a logged out token is rejected, also by
+        other workers once they reload the deny-list.
+        """
+        token = self.auth.create_session(self.user_id)
+        headers = {"Cookie": f"{self.cookie_name}={token}"}
+        with self.app.test_request_context(headers=headers):
+            self.assertTrue(self.auth.destroy_session())
+        self.assertIsNone(self.current_user(token))
+
+        with mock.patch.dict(os.environ, {"SECRET_KEY": "test-secret"}):
+            other_worker_auth = SignedTokenAuth()
+        headers = {"Cookie": f"{self.cookie_name}={token}"}
+        with self.app.test_request_context(headers=headers):
+            self.assertIsNone(other_worker_auth.current_user())
+
+    def test_admin_only_checks_database(self):
+        """
+        Test that a token issued to an admin loses its admin rights
+        once the user is demoted.
+        """
+        token = self.auth.create_session(self.user_id)
+        view = admin_only(lambda: "ok")
+        headers = {"Cookie": f"{self.cookie_name}={token}"}
+        with self.app.test_request_context(headers=headers):
+            g.current_user = self.auth.current_user()
+            self.assertEqual(view(), "ok")
+
+        user = storage.get_obj_by_id(User, self.user_id)
+        user.is_admin = False
+        storage.save()
+        try:
+            with self.app.test_request_context(headers=headers):
+                g.current_user = self.auth.current_user()
+                self.assertTrue(g.current_user.is_admin)
+                with self.assertRaises(Forbidden):
+                    view()
+        finally:
+            user = storage.get_obj_by_id(User, self.user_id)
+            user.is_admin = True
+            storage.save()
+
+    def test_writes_check_user(self):
+        """
+        Test that the token of a suspended or deleted user is refused
+        on writes.
+        """
+        user = User(email="token_writer@gmail.com", password="x")
+        suspension = UserSuspension(
+            user_id=user.id, expires_at=datetime.now() + timedelta(days=1)
+        )
+        storage.save()
+        user_id = user.id
+        token = self.auth.create_session(user_id)
+        client = self.app.test_client()
+        client.set_cookie(self.cookie_name, token)
+
+        with mock.patch("api.v1.app.auth", self.auth):
+            response = client.post("/api/v1/reports", json={})
+            self.assertEqual(response.status_code, 401)
+
+            storage.delete(
+                storage.get_obj_by_id(UserSuspension, suspension.id)
+            )
+            storage.save()
+            response = client.post("/api/v1/reports", json={})
+            self.assertNotEqual(response.status_code, 401)
+
+            storage.delete(storage.get_obj_by_id(User, user_id))
+            storage.save()
+            storage.close()
+            response = client.post("/api/v1/reports", json={})
+            self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+"""
+Implements unit test cases for issuing user warnings.
+"""
+
+
+from datetime import datetime
+from flask import Flask
+from flask.testing import FlaskClient
+import logging
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils.utility import DatabaseOp, UserDisplineHandler
+from models import storage
+from models.admin import Admin
+from models.user import User, UserWarning
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestUserDiscipline(unittest.TestCase):
+    """
+    Tests warnings, suspensions and terminations of users.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates an admin and a user to warn.
+        """
+        admin_user = User(email="warner@gmail.com", password="x")
+        admin = Admin(user_id=admin_user.id)
+        user = User(email="warned@gmail.com", password="x")
+        storage.save()
+        self.admin_user_id, self.admin_id = admin_user.id, admin.id
+        self.user_id = user.id
+        storage.close()
+
+    def tearDown(self) -> None:
+        """
+        Deletes the users along with their warnings and suspensions.
+        """
+        for user_id in (self.admin_user_id, self.user_id):
+            user = storage.get_obj_by_id(User, user_id)
+            if user:
+                storage.delete(user)
+        for warning in storage.all(UserWarning):
+            storage.delete(warning)
+        storage.save()
+        storage.close()
+
+    def issue_warning(self, handler: UserDisplineHandler) -> None:
+        """
+        Issues a warning as issue_user_warning does.
+        """
+        user = storage.get_obj_by_id(User, self.user_id)
+        admin = storage.get_obj_by_id(Admin, self.admin_id)
+        with DatabaseOp().unit_of_work():
+            handler.issue_warnings([user], admin, "Spam")
+        storage.close()
+
+    def test_suspend_user(self):
+        """
+        Test that every SUSPENSION_INTERVAL warnings suspend the user.
+        """
+        handler = UserDisplineHandler()
+        for _ in range(handler.SUSPENSION_INTERVAL):
+            self.issue_warning(handler)
+
+        user = storage.get_obj_by_id(User, self.user_id)
+        self.assertEqual(user.warnings_count, handler.SUSPENSION_INTERVAL)
+        self.assertEqual(user.suspensions_count, 1)
+        self.assertFalse(user.is_active)
+        self.assertIsNotNone(user.suspension)
+        self.assertGreater(user.suspension.expires_at, datetime.now())
+        self.assertFalse(handler.active_user(user))
+
+    def test_terminate_user(self):
+        """
+        Test that users reaching TERMINATION_LIMIT suspensions
+        are deleted.
+        """
+        handler = UserDisplineHandler()
+        for _ in range(
+            handler.SUSPENSION_INTERVAL * handler.TERMINATION_LIMIT
+        ):
+            self.issue_warning(handler)
+
+        self.assertIsNone(storage.get_obj_by_id(User, self.user_id))
+
+    def test_rollback_warning(self):
+        """
+        Test that nothing is committed when the unit of work fails.
+        """
+        handler = UserDisplineHandler()
+        user = storage.get_obj_by_id(User, self.user_id)
+        admin = storage.get_obj_by_id(Admin, self.admin_id)
+
+        with self.assertRaises(RuntimeError):
+            with storage.unit_of_work():
+                handler.issue_warnings([user], admin, "Spam")
+                raise RuntimeError("warning interrupted")
+        storage.close()
+
+        user = storage.get_obj_by_id(User, self.user_id)
+        self.assertEqual(user.warnings_count, 0)
+        self.assertEqual(user.warnings, [])
+
+
+class TestUserWarningRoute(unittest.TestCase):
+    """
+    POST - /api/v1/users/warnings
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Creates and login an admin user before
+        execution of the test methods.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.client.post(
+            "/api/v1/register",
+            json={
+                "email": "moderator@gmail.com",
+                "password": "Test1234",
+                "is_admin": True
+            },
+        )
+
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={
+                "email": "moderator@gmail.com",
+                "password": "Test1234"
+            },
+        )
+        cls.user_id = response.get_json().get("user_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = session_cookie.split(
+                ";", 1)[0].split("=", 1)
+            cls.client.set_cookie(cookie_name, session_id)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user after executing the class.
+        """
+        cls.client.delete(f"/api/v1/users/{cls.user_id}")
+        for warning in storage.all(UserWarning):
+            storage.delete(warning)
+        storage.save()
+        if storage.count(User):
+            raise ValueError("Users deletion was not successful")
+
+    def test_warn_users_in_bulk(self):
+        """
+        Test that every listed user is warned once, and unknown ids
+        are reported.
+        """
+        users = [
+            User(email=f"bulk{index}@gmail.com", password="x")
+            for index in range(3)
+        ]
+        storage.save()
+        user_ids = [user.id for user in users]
+        unknown_id = "0" * 36
+
+        response = self.client.post(
+            "/api/v1/users/warnings",
+            json={
+                "user_ids": user_ids + user_ids[:1] + [unknown_id],
+                "reason": "Spam",
+            },
+        )
+        data = response.get_json()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            sorted(warning["user_id"] for warning in data["warnings"]),
+            sorted(user_ids),
+        )
+        self.assertEqual(data["not_found"], [unknown_id])
+        self.assertEqual(data["suspended"], [])
+        storage.close()
+        for user_id in user_ids:
+            user = storage.get_obj_by_id(User, user_id)
+            self.assertEqual(user.warnings_count, 1)
+            storage.delete(user)
+        storage.save()
+
+
+if __name__ == "__main__":
+    unittest.main()
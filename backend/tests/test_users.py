@@ -8,10 +8,15 @@ from datetime import datetime
 from flask import Flask
 from flask.testing import FlaskClient
 from typing import Any, cast
+from unittest.mock import patch
 import logging
 import unittest
 
 from api.v1.app import create_app
+from api.v1.utils import user_provisioning
+from api.v1.utils.user_provisioning import (
+    MAX_BULK_USERS, BulkUserRegistration
+)
 from models import storage
 from models.user import User
 from models.department import Department
@@ -26,6 +31,7 @@ logger = logging.getLogger(__name__)
 class TestUserRoute(unittest.TestCase):
     """
     POST - /api/v1/register
+    POST - /api/v1/users/bulk
     GET - /api/v1/users/<department_id>/<level_id>
     GET - /api/v1/users/<user_id>
     UPDATE - /api/v1/users/<user_id>
@@ -269,6 +275,90 @@ class TestUserRoute(unittest.TestCase):
             update_user_response.get_json().get("is_admin")
         )
 
+    def test_register_users_in_bulk(self):
+        """
+        Test that valid records are registered and the others are
+        reported with their errors.
+        """
+        response = self.client.post(
+            "/api/v1/users/bulk",
+            json=[
+                {
+                    "email": "bulkuser@gmail.com",
+                    "password": "Bulkuser1234",
+                    "department_id": self.dept_ids[0],
+                    "level_id": self.level_ids[0],
+                },
+                {"email": "seconduser@gmail.com", "password": "Second1234"},
+                {"email": "BulkUser@gmail.com", "password": "Bulkuser1234"},
+                {"email": "shortpassword@gmail.com", "password": "short"},
+            ],
+        )
+        result = response.get_json()
+        self.user_ids.extend(
+            record["id"] for record in result["results"] if "id" in record
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual(
+            [record["status"] for record in result["results"]],
+            ["created", "error", "error", "error"],
+        )
+
+        user = storage.get_obj_by_id(User, result["results"][0]["id"])
+        self.assertEqual(user.department_id, self.dept_ids[0])
+        self.assertNotEqual(user.password, "Bulkuser1234")
+
+    def test_register_users_in_bulk_chunks(self):
+        """
+        Test that records spanning several chunks are all inserted,
+        one chunk at a time.
+        """
+        records = [
+            {"email": f"chunkuser{index}@gmail.com", "password": "User12345"}
+            for index in range(5)
+        ]
+        with patch.object(user_provisioning, "BULK_INSERT_CHUNK_SIZE", 2), \
+                patch.object(
+                    BulkUserRegistration, "insert_chunk",
+                    autospec=True,
+                    side_effect=BulkUserRegistration.insert_chunk,
+                ) as insert_chunk:
+            response = self.client.post("/api/v1/users/bulk", json=records)
+        result = response.get_json()
+        self.user_ids.extend(
+            record["id"] for record in result["results"] if "id" in record
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(result["created"], 5)
+        self.assertEqual(
+            [len(call.args[1]) for call in insert_chunk.call_args_list],
+            [2, 2, 1],
+        )
+        self.assertEqual(
+            len(storage.get_by_values(
+                User, email=[record["email"] for record in records]
+            )),
+            5,
+        )
+
+    def test_register_too_many_users_in_bulk(self):
+        """
+        Test that requests above MAX_BULK_USERS are rejected before
+        any password is hashed.
+        """
+        response = self.client.post(
+            "/api/v1/users/bulk",
+            json=[
+                {"email": f"user{index}@gmail.com", "password": "User12345"}
+                for index in range(MAX_BULK_USERS + 1)
+            ],
+        )
+        self.assertEqual(response.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)